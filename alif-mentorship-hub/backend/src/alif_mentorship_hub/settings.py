@@ -33,6 +33,7 @@ VERSION = secrets_manager.get_secret('VERSION', '1.0.0')
 
 # Installed apps
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver, so WebSockets work in development too
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -166,6 +167,22 @@ CACHE_MIDDLEWARE_KEY_PREFIX = 'alif'
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
 
+# WebSocket push (Django Channels). Production fans out through Redis so every
+# ASGI worker reaches every socket; set CHANNEL_LAYER_BACKEND to
+# channels.layers.InMemoryChannelLayer for a single process without Redis
+# (local development, CI).
+ASGI_APPLICATION = 'alif_mentorship_hub.asgi.application'
+CHANNEL_LAYER_BACKEND = secrets_manager.get_secret('CHANNEL_LAYER_BACKEND', 'channels_redis.core.RedisChannelLayer')
+CHANNEL_LAYERS = {'default': {'BACKEND': CHANNEL_LAYER_BACKEND}}
+if CHANNEL_LAYER_BACKEND == 'channels_redis.core.RedisChannelLayer':
+    CHANNEL_LAYERS['default']['CONFIG'] = {
+        'hosts': [secrets_manager.get_secret(
+            'CHANNEL_REDIS_URL', secrets_manager.get_redis_config()['LOCATION']
+        )],
+        'capacity': 1500,
+        'expiry': 10,
+    }
+
 # Enhanced Logging with Security and Enterprise Features
 LOGGING = {
     'version': 1,
@@ -292,6 +309,39 @@ LOGGING = {
 # Log message settings
 LOG_MESSAGE_MAX_LENGTH = 10000
 
+# Per-client request limits (api.middleware.RateLimitingMiddleware), shared by
+# every worker through the default cache; False turns the middleware off
+RATE_LIMIT_ENABLED = secrets_manager.get_secret('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+
+# Queued logging: handlers above run on a background thread fed by a bounded
+# queue (records are dropped and counted when it is full), and only a share of
+# successful GETs is written to the request log
+LOG_QUEUE_ENABLED = secrets_manager.get_secret('LOG_QUEUE_ENABLED', 'True').lower() == 'true'
+LOG_QUEUE_MAX_SIZE = int(secrets_manager.get_secret('LOG_QUEUE_MAX_SIZE', '10000'))
+API_LOG_GET_SAMPLE_RATE = float(secrets_manager.get_secret('API_LOG_GET_SAMPLE_RATE', '1.0'))
+
+# Response compression: bodies from this size up are sent as zstd, brotli or
+# gzip (whichever the client prefers and is installed) at these levels
+RESPONSE_COMPRESSION_MIN_SIZE = int(secrets_manager.get_secret('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+RESPONSE_COMPRESSION_LEVELS = {
+    'gzip': int(secrets_manager.get_secret('RESPONSE_COMPRESSION_GZIP_LEVEL', '6')),
+    'br': int(secrets_manager.get_secret('RESPONSE_COMPRESSION_BROTLI_QUALITY', '4')),
+    'zstd': int(secrets_manager.get_secret('RESPONSE_COMPRESSION_ZSTD_LEVEL', '3')),
+}
+# BREACH: endpoints that return tokens are never compressed, and every other
+# compressed body gets up to this many random bytes of padding (0 disables it)
+RESPONSE_COMPRESSION_EXCLUDED_PATHS = [
+    path.strip() for path in secrets_manager.get_secret(
+        'RESPONSE_COMPRESSION_EXCLUDED_PATHS', '/api/auth/,/api/v1/auth/'
+    ).split(',') if path.strip()
+]
+RESPONSE_COMPRESSION_MAX_RANDOM_BYTES = int(secrets_manager.get_secret('RESPONSE_COMPRESSION_MAX_RANDOM_BYTES', '100'))
+
+# Anonymous GETs of the mentor, review and resource listings are served from a
+# shared response cache for up to this many seconds (0 disables it); model
+# signals retire entries as soon as the content behind them changes
+ANONYMOUS_RESPONSE_CACHE_TIMEOUT = int(secrets_manager.get_secret('ANONYMOUS_RESPONSE_CACHE_TIMEOUT', '300'))
+
 # JWT - Using secrets manager
 SIMPLE_JWT = secrets_manager.get_jwt_config()
 
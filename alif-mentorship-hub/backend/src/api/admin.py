@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, MentorProfile, Session, Review, Resource
+from .models import User, MentorProfile, Session, Review, Resource, EmailOutbox
 
 
 @admin.register(User)
@@ -45,3 +45,11 @@ class ResourceAdmin(admin.ModelAdmin):
     list_display  = ('title', 'category', 'author', 'published_at')
     list_filter   = ('category',)
     search_fields = ('title', 'author__username')
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display  = ('pk', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter   = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
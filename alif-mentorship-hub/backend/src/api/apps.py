@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Logging is configured by now; move formatting and file I/O off the request thread
+        if getattr(settings, 'LOG_QUEUE_ENABLED', False):
+            from .secure_logging import enable_queued_logging
+            enable_queued_logging(getattr(settings, 'LOG_QUEUE_MAX_SIZE', 10000))
@@ -0,0 +1,413 @@
+"""
+Availability Engine
+Recurring mentor availability compiled once: slot expansion, point lookups
+and the UTC-normalised weekly bitmap used for SQL filtering
+"""
+import time as _time
+from bisect import bisect_right
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES          # 48 bits per day
+MINUTES_PER_WEEK = 7 * 24 * 60
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+# One BigIntegerField per UTC weekday (0 = Monday): 7 x 48 = 336 half-hour bits
+BITMAP_FIELDS = tuple(f'availability_bits_{day}' for day in range(7))
+
+# Free-slot endpoint
+DEFAULT_SESSION_MINUTES = 60
+ALLOWED_SLOT_MINUTES = (15, 30, 45, 60, 90, 120)
+MAX_RANGE_DAYS = 90
+MAX_BATCH_MENTORS = 50
+BOOKED_STATUSES = ('pending', 'accepted')
+AVAILABILITY_CACHE_TIMEOUT = 300  # seconds
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def parse_minutes(value):
+    """'HH:MM' → minutes after midnight ('24:00' is allowed as an end bound)"""
+    hours, minutes = value.split(':')
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time: {value}")
+    return hours * 60 + minutes
+
+
+def utc_offset_minutes(tz_name, at=None):
+    """Current UTC offset of ``tz_name`` in minutes (DST-aware)"""
+    at = at or datetime.now(dt_timezone.utc)
+    offset = at.astimezone(pytz.timezone(tz_name)).utcoffset()
+    return int(offset.total_seconds() // 60)
+
+
+def day_mask(start_minute, end_minute, cover=False):
+    """
+    Bits for the half-hour slots fully inside [start_minute, end_minute) of one
+    day, or with ``cover=True`` every slot the window touches.
+    """
+    if cover:
+        first = start_minute // SLOT_MINUTES
+        last = -(-end_minute // SLOT_MINUTES)
+    else:
+        first = -(-start_minute // SLOT_MINUTES)
+        last = end_minute // SLOT_MINUTES
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def parse_windows(availability):
+    """
+    ``[{'day', 'start_time', 'end_time'}, ...]`` → sorted ``(day, start, end)``
+    minute triples; malformed or empty windows are dropped.
+    """
+    windows = []
+    for slot in availability or []:
+        try:
+            day = int(slot['day'])
+            start = parse_minutes(slot.get('start_time', '09:00'))
+            end = parse_minutes(slot.get('end_time', '17:00'))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        if 0 <= day <= 6 and start < end:
+            windows.append((day, start, end))
+    windows.sort()
+    return windows
+
+
+def compile_weekly_bitmap(availability, offset_minutes):
+    """
+    Compile ``[{'day', 'start_time', 'end_time'}, ...]`` in the mentor's local
+    time into seven UTC day masks, one per UTC weekday.
+    """
+    week = [0] * 7
+    for day, start, end in parse_windows(availability):
+        # Shift the local window to UTC minutes-of-week; it may wrap the week
+        # and straddle a UTC midnight, so split it at day boundaries.
+        utc_start = (day * 1440 + start - offset_minutes) % MINUTES_PER_WEEK
+        remaining = end - start
+        while remaining > 0:
+            utc_day, minute = divmod(utc_start, 1440)
+            span = min(remaining, 1440 - minute)
+            week[utc_day] |= day_mask(minute, minute + span)
+            utc_start = (utc_start + span) % MINUTES_PER_WEEK
+            remaining -= span
+    return week
+
+
+# ─────────────────────────────────────────────
+# Compiled slot expansion
+# ─────────────────────────────────────────────
+class OffsetTimeline:
+    """
+    UTC offsets of one zone across a date range, resolved once.
+
+    The range is probed daily and every offset change is bisected to the
+    second, so localising a wall-clock time afterwards is a bisect over a
+    handful of segments instead of a pytz ``localize`` call. Ambiguous and
+    non-existent wall times resolve like ``localize(is_dst=False)``.
+    """
+
+    def __init__(self, tz, first_day, last_day):
+        self.tz = tz
+        start = int(datetime.combine(first_day - timedelta(days=2), time(), dt_timezone.utc).timestamp())
+        end = int(datetime.combine(last_day + timedelta(days=2), time(), dt_timezone.utc).timestamp())
+
+        # segments: (utc_start_epoch, offset, is_dst)
+        segments = [(start, *self._info(start))]
+        probe = start
+        while probe < end:
+            following = probe + 86400
+            info = self._info(following)
+            if info != segments[-1][1:]:
+                low, high = probe, following
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if self._info(middle) == segments[-1][1:]:
+                        low = middle
+                    else:
+                        high = middle
+                segments.append((high, *info))
+            probe = following
+
+        epoch = datetime(1970, 1, 1)
+        self.offsets = [offset for _, offset, _ in segments]
+        self.is_dst = [dst for _, _, dst in segments]
+        self.tzinfos = [dt_timezone(offset) for offset in self.offsets]
+        # Wall-clock span covered by each segment, as naive local datetimes
+        self.local_starts = [epoch + timedelta(seconds=utc) + offset for utc, offset, _ in segments]
+        self.local_ends = [
+            epoch + timedelta(seconds=segments[i + 1][0]) + segments[i][1]
+            for i in range(len(segments) - 1)
+        ] + [datetime.max]
+
+    def _info(self, epoch_seconds):
+        local = datetime.fromtimestamp(epoch_seconds, dt_timezone.utc).astimezone(self.tz)
+        return local.utcoffset(), bool(local.dst())
+
+    def localize(self, naive):
+        """Attach the zone's offset to a naive wall-clock datetime"""
+        index = max(bisect_right(self.local_starts, naive) - 1, 0)
+        candidates = [
+            i for i in (index - 1, index)
+            if i >= 0 and self.local_starts[i] <= naive < self.local_ends[i]
+        ]
+        if not candidates:
+            # Skipped by a forward jump: consider the segments either side
+            candidates = [i for i in (index, index + 1) if i < len(self.offsets)]
+        if len(candidates) > 1:
+            standard = [i for i in candidates if not self.is_dst[i]]
+            candidates = standard or candidates
+        return naive.replace(tzinfo=self.tzinfos[candidates[0]])
+
+
+class CompiledAvailability:
+    """
+    A mentor's recurring availability parsed once into per-weekday
+    ``(start_minute, end_minute)`` windows in the mentor's local time.
+    """
+
+    def __init__(self, tz_name, windows):
+        self.tz_name = tz_name
+        self.tz = pytz.timezone(tz_name)
+        self.by_weekday = tuple(
+            tuple((start, end) for day, start, end in windows if day == weekday)
+            for weekday in range(7)
+        )
+
+    def __bool__(self):
+        return any(self.by_weekday)
+
+    def is_available_at(self, moment):
+        """True if ``moment`` falls inside a window (both bounds inclusive)"""
+        local = moment.astimezone(self.tz)
+        minute = local.hour * 60 + local.minute
+        return any(start <= minute <= end for start, end in self.by_weekday[local.weekday()])
+
+    def windows(self, start_date, end_date):
+        """
+        Chronological ``(start, end, date, weekday)`` windows, with aware
+        bounds, for each date from ``start_date`` to ``end_date`` inclusive.
+        """
+        first, last = start_date.date(), end_date.date()
+        if not self or last < first:
+            return
+
+        timeline = OffsetTimeline(self.tz, first, last)
+        day, weekday = first, first.weekday()
+        while day <= last:
+            if self.by_weekday[weekday]:
+                midnight = datetime(day.year, day.month, day.day)
+                for start, end in self.by_weekday[weekday]:
+                    yield (
+                        timeline.localize(midnight + timedelta(minutes=start)),
+                        timeline.localize(midnight + timedelta(minutes=end)),
+                        day,
+                        weekday,
+                    )
+            day += timedelta(days=1)
+            weekday = (weekday + 1) % 7
+
+    def slots(self, start_date, end_date, now=None):
+        """
+        Future availability windows for each date from ``start_date`` to
+        ``end_date`` inclusive, in O(days + slots).
+        """
+        now = now or datetime.now(dt_timezone.utc)
+        return [
+            {
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'day_name': DAY_NAMES[weekday],
+                'date': day.isoformat(),
+            }
+            for start, end, day, weekday in self.windows(start_date, end_date)
+            if start > now
+        ]
+
+    def free_slots(self, start_date, end_date, booked_times, slot_minutes, session_minutes, now=None):
+        """
+        Fixed-length future slots inside the availability windows that do not
+        overlap a booked session (each ``session_minutes`` long).
+
+        Windows and bookings are both merged into sorted interval lists and
+        swept together once, so the cost is O(windows + bookings + slots).
+        """
+        now = now or datetime.now(dt_timezone.utc)
+        step = timedelta(minutes=slot_minutes)
+        busy = merge_intervals(
+            (booked, booked + timedelta(minutes=session_minutes)) for booked in sorted(booked_times)
+        )
+
+        # Union overlapping/adjacent windows, keeping the first window's date
+        windows = []
+        for start, end, day, weekday in self.windows(start_date, end_date):
+            if windows and start <= windows[-1][1]:
+                if end > windows[-1][1]:
+                    windows[-1][1] = end
+            else:
+                windows.append([start, end, day, weekday])
+
+        slots, b = [], 0
+        for start, end, day, weekday in windows:
+            # Slots stay on a grid anchored at the window start
+            cursor = start
+            if cursor <= now:
+                cursor = start + step * ((now - start) // step + 1)
+            relabel = start.utcoffset() != end.utcoffset()
+            date_iso, day_name = day.isoformat(), DAY_NAMES[weekday]
+            while cursor + step <= end:
+                while b < len(busy) and busy[b][1] <= cursor:
+                    b += 1
+                if b < len(busy) and busy[b][0] < cursor + step:
+                    # Jump past the booking to the next grid point
+                    cursor = start + step * -(-(busy[b][1] - start) // step)
+                    continue
+                slot_start, slot_end = cursor, cursor + step
+                if relabel:
+                    # The window crosses a DST change: give each bound its own offset
+                    slot_start, slot_end = slot_start.astimezone(self.tz), slot_end.astimezone(self.tz)
+                slots.append({
+                    'start': slot_start.isoformat(),
+                    'end': slot_end.isoformat(),
+                    'day_name': day_name,
+                    'date': date_iso,
+                })
+                cursor += step
+        return slots
+
+
+def merge_intervals(intervals):
+    """Merge overlapping ``(start, end)`` intervals, given sorted by start"""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@lru_cache(maxsize=4096)
+def _compile(tz_name, windows):
+    return CompiledAvailability(tz_name, windows)
+
+
+def get_compiled_availability(availability, tz_name):
+    """Compiled availability, shared by every profile with the same windows and zone"""
+    return _compile(tz_name, tuple(parse_windows(availability)))
+
+
+# ─────────────────────────────────────────────
+# Free slots — shared by the single and batch availability endpoints
+# ─────────────────────────────────────────────
+def get_session_minutes():
+    """Length of a booked session, used to block out time around each booking"""
+    return getattr(settings, 'SESSION_DURATION_MINUTES', DEFAULT_SESSION_MINUTES)
+
+
+def booking_query_bounds(start_date, end_date):
+    """
+    UTC ``[from, to)`` bounds for the bookings that can overlap any window
+    between the two dates, whatever the mentor's UTC offset.
+    """
+    start = datetime.combine(start_date.date() - timedelta(days=1), time(), dt_timezone.utc)
+    end = datetime.combine(end_date.date() + timedelta(days=2), time(), dt_timezone.utc)
+    return start - timedelta(minutes=get_session_minutes()), end
+
+
+def build_free_slot_payload(profile, start_date, end_date, slot_minutes, booked_times):
+    """Response body for one mentor, given that mentor's booked session times"""
+    slots = []
+    if profile.availability:
+        slots = profile.compiled_availability.free_slots(
+            start_date, end_date, booked_times, slot_minutes, get_session_minutes()
+        )
+    # Whole UTC dates, so the payload only depends on its cache key
+    range_start = datetime.combine(start_date.date(), time(), dt_timezone.utc)
+    range_end = datetime.combine(end_date.date() + timedelta(days=1), time(), dt_timezone.utc)
+    return {
+        'mentor_id': profile.id,
+        'mentor_username': profile.user.username,
+        'timezone': profile.timezone,
+        'slot_minutes': slot_minutes,
+        'available_slots': slots,
+        'booked_times': [
+            booked.isoformat() for booked in sorted(booked_times)
+            if range_start <= booked < range_end
+        ],
+        'total_slots': len(slots),
+    }
+
+
+def _version_key(mentor_user_id):
+    return f'mentor_availability_version_{mentor_user_id}'
+
+
+def availability_cache_keys(mentor_user_ids, start_date, end_date, slot_minutes):
+    """
+    Per-mentor, per-range cache keys, keyed by mentor user id. Each key
+    embeds the mentor's version, so it changes whenever they are invalidated.
+    """
+    version_keys = {user_id: _version_key(user_id) for user_id in mentor_user_ids}
+    versions = cache.get_many(version_keys.values())
+    missing = {key: _time.time_ns() for key in version_keys.values() if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    span = f'{start_date.date().isoformat()}_{end_date.date().isoformat()}_{slot_minutes}'
+    return {
+        user_id: f'mentor_availability_{user_id}_{versions[key]}_{span}'
+        for user_id, key in version_keys.items()
+    }
+
+
+def availability_cache_key(mentor_user_id, start_date, end_date, slot_minutes):
+    """Cache key for a single mentor; see ``availability_cache_keys``"""
+    return availability_cache_keys([mentor_user_id], start_date, end_date, slot_minutes)[mentor_user_id]
+
+
+def invalidate_mentor_availability(mentor_user_id):
+    """Orphan every cached availability response for this mentor"""
+    cache.set(_version_key(mentor_user_id), _time.time_ns(), None)
+
+
+# ─────────────────────────────────────────────
+# Bitmap filters
+# ─────────────────────────────────────────────
+def filter_available_at(qs, moment):
+    """Profiles whose compiled availability covers the half-hour containing ``moment``"""
+    moment = moment.astimezone(dt_timezone.utc)
+    slot = (moment.hour * 60 + moment.minute) // SLOT_MINUTES
+    return _filter_mask(qs, moment.weekday(), 1 << slot)
+
+
+def filter_available_window(qs, day, start_minute=None, end_minute=None):
+    """
+    Profiles free for the whole UTC window [start, end) on ``day``; with no
+    window, profiles with any availability that UTC day.
+    """
+    if start_minute is None and end_minute is None:
+        return qs.filter(**{f'{BITMAP_FIELDS[day]}__gt': 0})
+    start_minute = 0 if start_minute is None else start_minute
+    end_minute = 24 * 60 if end_minute is None else end_minute
+    mask = day_mask(start_minute, end_minute, cover=True)
+    if not mask:
+        return qs.none()
+    return _filter_mask(qs, day, mask)
+
+
+def _filter_mask(qs, day, mask):
+    field = BITMAP_FIELDS[day]
+    alias = f'{field}_masked'
+    return qs.alias(**{alias: F(field).bitand(mask)}).filter(**{alias: mask})
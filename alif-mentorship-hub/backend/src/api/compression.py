@@ -0,0 +1,134 @@
+"""
+Response Compression
+Content-encoding negotiation and codecs for ResponseCompressionMiddleware.
+gzip is always available; brotli and zstd are offered when their packages
+are installed. Levels come from the RESPONSE_COMPRESSION_LEVELS setting.
+
+Every compressed body can carry a random amount of padding in a part of the
+format decoders skip (the gzip file name, a zstd skippable frame, a brotli
+metadata block), so its length does not reveal how well a secret compressed
+against attacker-chosen text (BREACH).
+"""
+import gzip
+import secrets
+import struct
+from typing import Dict, Optional
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional in development
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional in development
+    zstandard = None
+
+
+# Defaults tuned for small, dynamic JSON: most of the size win at a fraction
+# of the CPU of the maximum levels
+DEFAULT_LEVELS = {
+    'zstd': 3,
+    'br': 4,
+    'gzip': 6,
+}
+
+# Server preference when the client accepts several codings equally
+PREFERENCE = ('zstd', 'br', 'gzip')
+
+# Largest padding every codec can hold (a two-byte brotli MSKIPLEN)
+MAX_PADDING = 65536
+
+
+def _gzip(data: bytes, level: int, padding: int) -> bytes:
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    if not padding:
+        return compressed
+    # Same trick as django.utils.text.compress_string: a random FNAME field
+    header = bytearray(compressed[:10])
+    header[3] |= gzip.FNAME
+    return bytes(header) + secrets.token_hex(padding)[:padding].encode() + b'\0' + compressed[10:]
+
+
+def _brotli(data: bytes, level: int, padding: int) -> bytes:
+    if not padding:
+        return brotli.compress(data, quality=level)
+    # flush() leaves the stream byte-aligned, so a metadata meta-block can go
+    # in before the last one: ISLAST=0, MNIBBLES=0 (0b11), reserved bit,
+    # MSKIPBYTES, MSKIPLEN-1, zero bits up to the byte boundary
+    compressor = brotli.Compressor(quality=level)
+    head = compressor.process(data) + compressor.flush()
+    skip_bytes = 1 if padding <= 256 else 2
+    bits = 0b0110 | skip_bytes << 4 | (padding - 1) << 6
+    metadata = bits.to_bytes(skip_bytes + 1, 'little') + secrets.token_bytes(padding)
+    return head + metadata + compressor.finish()
+
+
+def _zstd(data: bytes, level: int, padding: int) -> bytes:
+    # Compressor objects are not safe to share between threads; they are cheap to build
+    compressed = zstandard.ZstdCompressor(level=level).compress(data)
+    if not padding:
+        return compressed
+    # Decoders skip frames with a 0x184D2A5? magic number
+    return compressed + struct.pack('<II', 0x184D2A50, padding) + secrets.token_bytes(padding)
+
+
+CODECS = {'gzip': _gzip}
+if brotli is not None:
+    CODECS['br'] = _brotli
+if zstandard is not None:
+    CODECS['zstd'] = _zstd
+
+
+def compression_level(encoding: str) -> int:
+    levels = getattr(settings, 'RESPONSE_COMPRESSION_LEVELS', {})
+    return levels.get(encoding, DEFAULT_LEVELS[encoding])
+
+
+def compress(data: bytes, encoding: str, max_random_bytes: int = 0) -> bytes:
+    """Compress ``data``, padded with 1 to ``max_random_bytes`` random bytes when that is set"""
+    padding = secrets.randbelow(min(max_random_bytes, MAX_PADDING)) + 1 if max_random_bytes > 0 else 0
+    return CODECS[encoding](data, compression_level(encoding), padding)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """``'gzip;q=0.8, br'`` → ``{'gzip': 0.8, 'br': 1.0}``; malformed q-values count as 0"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding == 'x-gzip':
+            coding = 'gzip'
+        accepted[coding] = max(quality, accepted.get(coding, 0.0))
+    return accepted
+
+
+def negotiate_encoding(header: str) -> Optional[str]:
+    """
+    The coding to use for a response, or None to send it as is. Highest
+    client q-value wins; ties go to the server's preference.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in PREFERENCE:
+        if encoding not in CODECS:
+            continue
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
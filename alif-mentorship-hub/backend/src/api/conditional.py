@@ -0,0 +1,151 @@
+"""
+Conditional GET
+Version-based ETags for the public read endpoints. Every content scope
+('mentors', 'mentor:<profile id>', 'reviews:<profile id>', 'resources',
+'user:<id>') has a version in the shared cache that writes bump. A response's
+ETag digests the versions it depends on plus the request parts that shape the
+body, so it is known before any query runs: a matching If-None-Match is
+answered with 304 and nothing is serialised.
+"""
+import hashlib
+import time as _time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from .response_cache import get_cached_response, response_cache_key, response_cache_timeout, store_response
+
+
+def _version_key(scope):
+    return f'content_version:{scope}'
+
+
+def content_versions(scopes):
+    """Current version of each scope, in order; unknown scopes start at now"""
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: _time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_content_versions(*scopes):
+    """
+    Move these scopes to a new version once the current transaction commits.
+    Bumping earlier would let a concurrent reader pair the new version with
+    the old rows and keep that stale ETag until the next write.
+    """
+    scopes = set(scopes)
+    if not scopes:
+        return
+
+    def bump():
+        now = _time.time_ns()
+        cache.set_many({_version_key(scope): now for scope in scopes}, None)
+
+    transaction.on_commit(bump)
+
+
+def mentor_scopes(profile_ids):
+    """Scopes a change to these mentor profiles (or their users) invalidates"""
+    return ['mentors', *(f'mentor:{profile_id}' for profile_id in profile_ids)]
+
+
+def content_etag(request, scopes, *parts):
+    """
+    Strong ETag for a response built from ``scopes`` for this request: path
+    and query string, Accept (JSON vs browsable API) and API version, plus
+    any view-specific ``parts``.
+    """
+    return versioned_etag(request, content_versions(scopes), *parts)
+
+
+def versioned_etag(request, versions, *parts):
+    """``content_etag`` for scope versions the caller already holds"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+        *versions, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+        getattr(request, 'api_version', ''), *parts,
+    ):
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+def not_modified(request, etag):
+    """A 304 when If-None-Match matches ``etag`` (weakly, as RFC 9110 asks), else None"""
+    return get_conditional_response(request, etag=etag)
+
+
+def apply_cache_policy(request, response, etag, max_age):
+    """
+    ETag and Cache-Control for a 200 or 304. Anonymous responses may be
+    stored by shared caches; anything for a signed-in user stays private.
+    ``max_age=0`` means revalidate on every use.
+    """
+    if response.status_code not in (200, 304):
+        return response
+    response['ETag'] = etag
+    directives = {'max_age': max_age}
+    if max_age == 0:
+        directives['must_revalidate'] = True
+    if request.user.is_authenticated:
+        directives['private'] = True
+    else:
+        directives['public'] = True
+    patch_cache_control(response, **directives)
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for generic views. Subclasses return the scopes their body
+    depends on from ``get_content_scopes``; ``vary_on_user`` adds the caller's
+    own scope for bodies with per-user fields (e.g. ``is_favorited``), and
+    ``shared_cache`` serves anonymous GETs from the response cache, tagged
+    with the same scopes.
+    """
+    cache_max_age = 0
+    vary_on_user = False
+    shared_cache = False
+
+    _response_cache_pending = None
+
+    def get_content_scopes(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        scopes = list(self.get_content_scopes())
+        user_id = None
+        if self.vary_on_user and request.user.is_authenticated:
+            user_id = request.user.pk
+            scopes.append(f'user:{user_id}')
+        versions = content_versions(scopes)
+        etag = versioned_etag(request, versions, user_id)
+        response = not_modified(request, etag)
+        if response is None:
+            response = self.get_shared_response(request, versions, *args, **kwargs)
+        return apply_cache_policy(request, response, etag, self.cache_max_age)
+
+    def get_shared_response(self, request, versions, *args, **kwargs):
+        if not self.shared_cache or request.user.is_authenticated or response_cache_timeout() <= 0:
+            return super().get(request, *args, **kwargs)
+        key = response_cache_key(request)
+        response, outcome = get_cached_response(key, versions, type(self).__name__)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            # Stored once finalize_response has picked the renderer
+            self._response_cache_pending = (key, versions)
+        response['X-Cache'] = outcome.upper()
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._response_cache_pending is not None:
+            store_response(*self._response_cache_pending, response)
+            self._response_cache_pending = None
+        return response
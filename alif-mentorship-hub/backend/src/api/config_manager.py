@@ -117,8 +117,8 @@ class ConfigManager:
     """Enterprise configuration manager"""
     
     def __init__(self, config_file: Optional[str] = None):
-        self.config_file = config_file or self._get_default_config_path()
         self.environment = os.getenv('DJANGO_ENV', 'development')
+        self.config_file = config_file or self._get_default_config_path()
         self._config_cache = {}
         self._load_config()
     
@@ -8,10 +8,15 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
 from .config_manager import config_manager
+from .conditional import apply_cache_policy, content_etag, not_modified
+import json
 import logging
 
 logger = logging.getLogger('api')
 
+# Config only changes on deploy; the ETag lets clients revalidate it cheaply after that
+FRONTEND_CONFIG_MAX_AGE = 600
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_frontend_config(request):
@@ -38,10 +43,14 @@ def get_frontend_config(request):
         
         logger.info(f"Frontend configuration requested from {request.META.get('REMOTE_ADDR')}")
         
-        return Response({
-            "success": True,
-            "config": frontend_config
-        })
+        etag = content_etag(request, (), json.dumps(frontend_config, sort_keys=True, default=str))
+        response = not_modified(request, etag)
+        if response is None:
+            response = Response({
+                "success": True,
+                "config": frontend_config
+            })
+        return apply_cache_policy(request, response, etag, FRONTEND_CONFIG_MAX_AGE)
         
     except Exception as e:
         logger.error(f"Error getting frontend config: {str(e)}")
@@ -0,0 +1,97 @@
+"""
+WebSocket consumers for live messaging.
+
+Browsers cannot set an Authorization header on a WebSocket handshake, so the
+access token travels in the query string (``/ws/messages/?token=<access>``)
+and is checked with the same simplejwt settings as the REST API.
+"""
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .models import Message
+from .realtime import user_group
+
+
+# ─────────────────────────────────────────────
+# Authentication
+# ─────────────────────────────────────────────
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTQueryAuthMiddleware:
+    """Populate scope['user'] from a ``token`` query-string parameter"""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        token = query.get('token', [None])[0]
+        scope = dict(scope, user=await get_user_for_token(token) if token else AnonymousUser())
+        return await self.inner(scope, receive, send)
+
+
+# ─────────────────────────────────────────────
+# Messaging
+# ─────────────────────────────────────────────
+class MessagingConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Server push for the chat page. Outbound frames:
+
+    - ``{"type": "message", "message": {...}}`` for new messages, sent or received
+    - ``{"type": "read", "reader_id", "message_ids", "up_to_message_id", "read_at"}``
+      read receipts; ``message_ids`` is null when a whole conversation was read
+    - ``{"type": "unread_count", "unread_count": n}`` on connect and on change
+
+    Sending and reading still go through the REST endpoints.
+    """
+
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated or self.channel_layer is None:
+            await self.close()
+            return
+
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        # Clients may have missed changes while disconnected
+        unread_count = await database_sync_to_async(Message.unread_count_for)(user.id)
+        await self.send_json({'type': 'unread_count', 'unread_count': unread_count})
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if isinstance(content, dict) and content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
+
+    async def chat_read(self, event):
+        await self.send_json({
+            'type': 'read',
+            'reader_id': event['reader_id'],
+            'message_ids': event['message_ids'],
+            'up_to_message_id': event['up_to_message_id'],
+            'read_at': event['read_at'],
+        })
+
+    async def unread_count(self, event):
+        await self.send_json({'type': 'unread_count', 'unread_count': event['unread_count']})
@@ -2,10 +2,11 @@
 Enterprise Database Optimization System
 Provides indexes, connection pooling, query optimization, and monitoring
 """
+import re
 import time
 import logging
 from typing import Any, Dict, List, Optional, Type
-from django.db import models, connection
+from django.db import models, connection, connections
 from django.db.models import QuerySet, Prefetch
 from django.core.cache import cache
 from django.conf import settings
@@ -230,21 +231,30 @@ class QueryOptimizer:
     @staticmethod
     def optimize_mentor_list_query():
         """Optimized query for mentor listings"""
-        from api.models import MentorProfile, Review
-        
-        # Prefetch reviews to avoid N+1 queries
-        reviews_prefetch = Prefetch(
-            'user__sessions_as_mentor__review',
-            queryset=Review.objects.select_related('session__student')
-        )
-        
+        from api.models import MentorProfile
+
+        # review_count/average_rating are denormalised on MentorProfile,
+        # so no review joins or prefetches are needed here
         return MentorProfile.objects.filter(
             is_verified=True
         ).select_related(
             'user'
-        ).prefetch_related(
-            reviews_prefetch
         ).order_by('-average_rating', '-id')
+
+    @staticmethod
+    def get_favorited_mentor_ids(user, mentor_user_ids) -> set:
+        """Single lookup of which of the given mentors the student has favorited"""
+        from api.models import MentorFavorite
+
+        if not user or not user.is_authenticated or getattr(user, 'role', None) != 'student':
+            return set()
+
+        return set(
+            MentorFavorite.objects.filter(
+                student=user,
+                mentor_id__in=list(mentor_user_ids),
+            ).values_list('mentor_id', flat=True)
+        )
     
     @staticmethod
     def optimize_session_list_query(user):
@@ -316,6 +326,109 @@ class QueryOptimizer:
         }
 
 
+class FullTextMatch(models.Func):
+    """
+    MySQL ``MATCH (columns) AGAINST (query IN BOOLEAN MODE)`` relevance score.
+
+    Other backends score with ``icontains`` instead: the number of columns
+    holding each word of the query, multiplied across words, so a row only
+    scores above 0 when every word appears somewhere (like ``+word*``).
+    """
+    output_field = models.FloatField()
+
+    def __init__(self, *fields, query):
+        super().__init__(*(models.F(field) for field in fields), models.Value(query))
+        self.fields = fields
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        *columns, against = self.get_source_expressions()
+        column_sql, params = [], []
+        for column in columns:
+            sql, column_params = compiler.compile(column)
+            column_sql.append(sql)
+            params.extend(column_params)
+        against_sql, against_params = compiler.compile(against)
+        return (
+            f"MATCH ({', '.join(column_sql)}) AGAINST ({against_sql} IN BOOLEAN MODE)",
+            (*params, *against_params),
+        )
+
+    def as_sql(self, compiler, connection, **extra_context):
+        *_, against = self.get_source_expressions()
+        terms = re.findall(r'\w+', str(against.value).lower())
+        score = models.Value(1.0 if terms else 0.0)
+        for term in terms:
+            hits = models.Value(0.0)
+            for field in self.fields:
+                hits = hits + models.Case(
+                    models.When(models.Q(**{f'{field}__icontains': term}), then=models.Value(1.0)),
+                    default=models.Value(0.0),
+                    output_field=models.FloatField(),
+                )
+            score = score * hits
+        fallback = models.ExpressionWrapper(score, output_field=models.FloatField())
+        return compiler.compile(fallback.resolve_expression(compiler.query))
+
+
+class MentorSearch:
+    """
+    Relevance-ranked text search over mentor bio, field of study and university.
+
+    On MySQL this is a ``MATCH ... AGAINST`` over the FULLTEXT index created by
+    migration 0014, every term required and prefix-matched. Other backends
+    (SQLite in tests) get the same semantics from a weighted ``icontains``
+    score: each term must appear in at least one column, and hits in
+    field_of_study/university count for more than hits in the bio.
+    """
+    FIELDS = ('bio', 'field_of_study', 'university')
+    FALLBACK_WEIGHTS = {'field_of_study': 3.0, 'university': 2.0, 'bio': 1.0}
+    MAX_TERMS = 8
+    # InnoDB ignores tokens shorter than innodb_ft_min_token_size (default 3)
+    MYSQL_MIN_TOKEN_SIZE = 3
+
+    @classmethod
+    def tokenize(cls, query: str) -> List[str]:
+        """Split a user query into lowercase word terms, dropping operators"""
+        terms = []
+        for term in re.findall(r'\w+', query.lower()):
+            if term not in terms:
+                terms.append(term)
+        return terms[:cls.MAX_TERMS]
+
+    @classmethod
+    def apply(cls, qs: QuerySet, query: str) -> QuerySet:
+        """Filter ``qs`` to matching profiles and annotate ``search_rank``"""
+        terms = cls.tokenize(query)
+        if not terms:
+            return qs.none()
+
+        if connections[qs.db].vendor == 'mysql' and all(
+            len(term) >= cls.MYSQL_MIN_TOKEN_SIZE for term in terms
+        ):
+            against = ' '.join(f'+{term}*' for term in terms)
+            return qs.annotate(
+                search_rank=FullTextMatch(*cls.FIELDS, query=against)
+            ).filter(search_rank__gt=0)
+
+        return cls._apply_fallback(qs, terms)
+
+    @classmethod
+    def _apply_fallback(cls, qs: QuerySet, terms: List[str]) -> QuerySet:
+        rank = models.Value(0.0)
+        for term in terms:
+            term_matches = models.Q()
+            for field, weight in cls.FALLBACK_WEIGHTS.items():
+                hit = models.Q(**{f'{field}__icontains': term})
+                term_matches |= hit
+                rank = rank + models.Case(
+                    models.When(hit, then=models.Value(weight)),
+                    default=models.Value(0.0),
+                    output_field=models.FloatField(),
+                )
+            qs = qs.filter(term_matches)
+        return qs.annotate(search_rank=models.ExpressionWrapper(rank, output_field=models.FloatField()))
+
+
 class DatabaseConnectionPool:
     """Database connection pool management"""
     
@@ -1,7 +1,100 @@
-from django.core.mail import send_mail
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
+from .models import EmailOutbox
+
+
+# ─────────────────────────────────────────────
+# Outbox — notifications are rows written in the caller's transaction;
+# send_queued_emails delivers them in batches
+# ─────────────────────────────────────────────
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE = timedelta(seconds=30)
+OUTBOX_RETRY_MAX = timedelta(hours=1)
+# A claimed batch is hidden from other senders this long; if the sender dies
+# mid-batch the messages become due again afterwards
+OUTBOX_CLAIM_LEASE = timedelta(minutes=5)
+
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """Add an email to the outbox; it commits or rolls back with the caller's transaction"""
+    return EmailOutbox.objects.create(
+        subject=subject[:255],
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts"""
+    return min(OUTBOX_RETRY_BASE * 2 ** (attempts - 1), OUTBOX_RETRY_MAX)
+
+
+def deliver_queued_emails(batch_size=100, max_attempts=OUTBOX_MAX_ATTEMPTS):
+    """
+    Claim one batch of due outbox messages and send it over a single mail
+    connection. Returns ``{'sent': n, 'retried': n, 'failed': n}``; all
+    zero when nothing is due.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[m.pk for m in batch]).update(
+                next_attempt_at=now + OUTBOX_CLAIM_LEASE
+            )
+
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    if not batch:
+        return stats
+
+    sent, failures = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+        for queued in batch:
+            try:
+                connection.send_messages([
+                    EmailMessage(queued.subject, queued.body, queued.from_email, queued.recipients)
+                ])
+                sent.append(queued.pk)
+            except Exception as e:
+                failures.append((queued, e))
+    except Exception as e:
+        # Could not even connect: every unsent message in the batch failed
+        done = set(sent) | {queued.pk for queued, _ in failures}
+        failures += [(queued, e) for queued in batch if queued.pk not in done]
+    finally:
+        connection.close()
+
+    if sent:
+        EmailOutbox.objects.filter(pk__in=sent).update(status='sent', sent_at=timezone.now(), last_error='')
+    for queued, error in failures:
+        queued.attempts += 1
+        queued.last_error = str(error)[:1000]
+        if queued.attempts >= max_attempts:
+            queued.status = 'failed'
+            stats['failed'] += 1
+        else:
+            queued.next_attempt_at = timezone.now() + retry_delay(queued.attempts)
+            stats['retried'] += 1
+    if failures:
+        EmailOutbox.objects.bulk_update(
+            [queued for queued, _ in failures], ['attempts', 'last_error', 'status', 'next_attempt_at']
+        )
+
+    stats['sent'] = len(sent)
+    return stats
+
 
 def send_session_request_notification(session):
     """Notify mentor when student requests a session"""
@@ -24,12 +117,10 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[session.mentor.email],
-        fail_silently=True,
     )
 
 
@@ -55,12 +146,10 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[session.student.email],
-        fail_silently=True,
     )
 
 
@@ -85,12 +174,10 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[session.student.email],
-        fail_silently=True,
     )
 
 
@@ -113,31 +200,28 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[session.student.email],
-        fail_silently=True,
     )
 
 
-def send_session_reminder(session):
-    """Send reminder 24 hours before session"""
-    hours_until = (session.requested_time - timezone.now()).total_seconds() / 3600
-    if not (23 <= hours_until <= 25):  # Only send if 23-25 hours away
-        return
+def build_session_reminder_messages(session):
+    """Reminder emails for both participants, unsent, so callers can batch them on one connection"""
+    when = session.requested_time.strftime('%B %d, %Y at %I:%M %p')
+    messages = []
     
     # Notify student
     if session.student.email:
-        subject = f'Reminder: Session with {session.mentor.username} tomorrow'
+        subject = f'Reminder: Session with {session.mentor.username} on {when}'
         message = f"""
 Hello {session.student.username},
 
-This is a reminder that you have a mentorship session scheduled for tomorrow.
+This is a reminder that you have an upcoming mentorship session.
 
 Session Details:
-- Time: {session.requested_time.strftime('%B %d, %Y at %I:%M %p')}
+- Time: {when}
 - Mentor: {session.mentor.username}
 - Meeting Link: {session.meet_link or 'Check your dashboard'}
 
@@ -146,25 +230,18 @@ See you there!
 Best regards,
 Alif Mentorship Hub
         """.strip()
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[session.student.email],
-            fail_silently=True,
-        )
+        messages.append(EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [session.student.email]))
     
     # Notify mentor
     if session.mentor.email:
-        subject = f'Reminder: Session with {session.student.username} tomorrow'
+        subject = f'Reminder: Session with {session.student.username} on {when}'
         message = f"""
 Hello {session.mentor.username},
 
-This is a reminder that you have a mentorship session scheduled for tomorrow.
+This is a reminder that you have an upcoming mentorship session.
 
 Session Details:
-- Time: {session.requested_time.strftime('%B %d, %Y at %I:%M %p')}
+- Time: {when}
 - Student: {session.student.username}
 - Goal: {session.goal}
 
@@ -173,14 +250,20 @@ See you there!
 Best regards,
 Alif Mentorship Hub
         """.strip()
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[session.mentor.email],
-            fail_silently=True,
-        )
+        messages.append(EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [session.mentor.email]))
+    
+    return messages
+
+
+def send_session_reminder(session):
+    """Send reminder 24 hours before session"""
+    hours_until = (session.requested_time - timezone.now()).total_seconds() / 3600
+    if not (23 <= hours_until <= 25):  # Only send if 23-25 hours away
+        return
+    
+    messages = build_session_reminder_messages(session)
+    if messages:
+        get_connection(fail_silently=True).send_messages(messages)
 
 
 def send_mentor_verified_notification(mentor_profile):
@@ -207,12 +290,10 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[mentor_profile.user.email],
-        fail_silently=True,
     )
 
 
@@ -239,12 +320,10 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[report.reporter.email],
-        fail_silently=True,
     )
 
 
@@ -279,10 +358,8 @@ Best regards,
 Alif Mentorship Hub
     """.strip()
     
-    send_mail(
+    queue_email(
         subject=subject,
         message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[recipient.email],
-        fail_silently=True,
     )
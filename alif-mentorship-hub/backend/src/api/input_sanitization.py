@@ -5,6 +5,7 @@ Prevents SQL injection, XSS, and other input-based attacks
 import re
 import html
 import bleach
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 from django.core.exceptions import ValidationError
 from django.utils.html import strip_tags
@@ -50,6 +51,29 @@ class InputSanitizer:
         re.compile(r'[\\/]%2e%2e', re.IGNORECASE),
     ]
     
+    # Screen for the SQL, command and path patterns above. In ASCII text every
+    # match needs one of these characters or sequences, or one of these whole
+    # words (OR / AND only alongside an '='), so one character scan and a set
+    # lookup clear most values; the patterns themselves run only on a hit
+    THREAT_CHARS = re.compile(r'[;&|`$(){}\[\]<>#]|--|/\*|\*/|\.\.|%2e%2e', re.IGNORECASE)
+    THREAT_WORDS = frozenset({
+        'select', 'insert', 'update', 'delete', 'drop', 'create', 'alter', 'exec', 'execute', 'union',
+        'cat', 'ls', 'pwd', 'whoami', 'id', 'uname', 'ps', 'netstat', 'ifconfig', 'ping', 'wget', 'curl',
+        'nc', 'telnet', 'ssh', 'ftp',
+    })
+    CONDITION_WORDS = frozenset({'or', 'and'})
+    WORD = re.compile(r'\w+')
+
+    # Characters tag stripping, escaping or the XSS patterns act on; text
+    # without any is left as is by all three
+    MARKUP_CHARS = re.compile(r'[<>&"\':=]')
+
+    # The XSS patterns that can match without a '<' in the value
+    XSS_TEXT_PATTERNS = [pattern for pattern in XSS_PATTERNS if not pattern.pattern.startswith('<')]
+
+    # Values up to this length are memoized; longer ones are rarely repeated
+    MEMO_MAX_LENGTH = 256
+
     # Allowed HTML tags for rich text (very restrictive)
     ALLOWED_HTML_TAGS = [
         'p', 'br', 'strong', 'em', 'u', 'ol', 'ul', 'li', 'blockquote', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'
@@ -62,25 +86,39 @@ class InputSanitizer:
     }
     
     @classmethod
-    def sanitize_string(cls, value: str, allow_html: bool = False, max_length: Optional[int] = None) -> str:
-        """Sanitize string input for security"""
+    def sanitize_string(cls, value: str, allow_html: bool = False, max_length: Optional[int] = None,
+                        memoize: bool = True) -> str:
+        """
+        Sanitize string input for security. Results for short values are
+        kept in a bounded LRU; pass ``memoize=False`` for credentials so
+        they are never retained.
+        """
         if not isinstance(value, str):
             value = str(value)
-        
+        if memoize and len(value) <= cls.MEMO_MAX_LENGTH:
+            return _memoized_sanitize(cls, value, allow_html, max_length)
+        return cls._sanitize(value, allow_html, max_length)
+
+    @classmethod
+    def _sanitize(cls, value: str, allow_html: bool, max_length: Optional[int]) -> str:
         # Remove null bytes
         value = value.replace('\x00', '')
         
-        # Detect and prevent SQL injection
-        if cls.contains_sql_injection(value):
-            raise ValidationError("Input contains potentially malicious SQL patterns")
-        
-        # Detect and prevent command injection
-        if cls.contains_command_injection(value):
-            raise ValidationError("Input contains potentially malicious command patterns")
+        if cls.may_contain_threat(value):
+            # Detect and prevent SQL injection
+            if cls.contains_sql_injection(value):
+                raise ValidationError("Input contains potentially malicious SQL patterns")
+            
+            # Detect and prevent command injection
+            if cls.contains_command_injection(value):
+                raise ValidationError("Input contains potentially malicious command patterns")
+            
+            # Detect and prevent path traversal
+            if cls.contains_path_traversal(value):
+                raise ValidationError("Input contains path traversal patterns")
         
-        # Detect and prevent path traversal
-        if cls.contains_path_traversal(value):
-            raise ValidationError("Input contains path traversal patterns")
+        # Plain text: nothing for tag stripping, escaping or the XSS patterns to change
+        plain = not allow_html and not cls.MARKUP_CHARS.search(value)
         
         # Handle HTML content
         if allow_html:
@@ -91,15 +129,16 @@ class InputSanitizer:
                 attributes=cls.ALLOWED_HTML_ATTRIBUTES,
                 strip=True
             )
-        else:
+        elif not plain:
             # Remove all HTML tags
             value = strip_tags(value)
             # Escape any remaining HTML entities
             value = html.escape(value)
         
-        # Prevent XSS
-        for pattern in cls.XSS_PATTERNS:
-            value = pattern.sub('', value)
+        # Prevent XSS (the tag patterns cannot match without a '<')
+        if not plain:
+            for pattern in cls.XSS_PATTERNS if '<' in value else cls.XSS_TEXT_PATTERNS:
+                value = pattern.sub('', value)
         
         # Normalize whitespace
         value = ' '.join(value.split())
@@ -110,6 +149,16 @@ class InputSanitizer:
         
         return value
     
+    @classmethod
+    def may_contain_threat(cls, value: str) -> bool:
+        """False only when no SQL, command or path pattern can match; non-ASCII text is always checked in full"""
+        if not value.isascii() or cls.THREAT_CHARS.search(value):
+            return True
+        words = cls.WORD.findall(value.lower())
+        if not cls.THREAT_WORDS.isdisjoint(words):
+            return True
+        return '=' in value and not cls.CONDITION_WORDS.isdisjoint(words)
+    
     @classmethod
     def contains_sql_injection(cls, value: str) -> bool:
         """Check if string contains SQL injection patterns"""
@@ -252,40 +301,61 @@ class SecureValidationMixin:
             raise serializers.ValidationError({field_name: str(e)})
 
 
-def sanitize_dict(data: Dict[str, Any], allowed_keys: Optional[List[str]] = None) -> Dict[str, Any]:
-    """Sanitize dictionary data"""
-    sanitized = {}
-    
-    for key, value in data.items():
-        # Skip keys not in allowed list
-        if allowed_keys and key not in allowed_keys:
-            continue
-        
-        # Sanitize key
-        safe_key = InputSanitizer.sanitize_string(str(key), allow_html=False, max_length=100)
-        
-        # Sanitize value based on type
-        if isinstance(value, str):
-            safe_value = InputSanitizer.sanitize_string(value, allow_html=False, max_length=1000)
-        elif isinstance(value, dict):
-            safe_value = sanitize_dict(value)
-        elif isinstance(value, list):
-            safe_value = [
-                InputSanitizer.sanitize_string(str(item), allow_html=False, max_length=500)
-                if isinstance(item, str) else item
-                for item in value[:100]  # Limit list size
-            ]
-        else:
-            safe_value = value
+@lru_cache(maxsize=4096)
+def _memoized_sanitize(sanitizer, value: str, allow_html: bool, max_length: Optional[int]) -> str:
+    """Recently sanitized values; rejected ones raise and are not cached"""
+    return sanitizer._sanitize(value, allow_html, max_length)
+
+
+def is_credential_field(key: Any) -> bool:
+    """Fields whose values must not be kept in the sanitizer's memo"""
+    key = str(key).lower()
+    return any(word in key for word in ('password', 'token', 'secret'))
+
+
+def sanitize_dict(data: Dict[str, Any], allowed_keys: Optional[List[str]] = None, max_depth: int = 10) -> Dict[str, Any]:
+    """Sanitize dictionary data, walking nested dictionaries iteratively up to ``max_depth``"""
+    root = {}
+    # (source, destination, depth, allowed keys); only the top level is filtered
+    pending = [(data, root, 0, allowed_keys)]
+    while pending:
+        source, sanitized, depth, allowed = pending.pop()
+        if depth > max_depth:
+            raise ValidationError("JSON structure too deep")
         
-        sanitized[safe_key] = safe_value
+        for key, value in source.items():
+            # Skip keys not in allowed list
+            if allowed and key not in allowed:
+                continue
+            
+            # Sanitize key
+            safe_key = InputSanitizer.sanitize_string(str(key), allow_html=False, max_length=100)
+            memoize = not is_credential_field(key)
+            
+            # Sanitize value based on type
+            if isinstance(value, str):
+                safe_value = InputSanitizer.sanitize_string(value, allow_html=False, max_length=1000, memoize=memoize)
+            elif isinstance(value, dict):
+                safe_value = {}
+                pending.append((value, safe_value, depth + 1, None))
+            elif isinstance(value, list):
+                safe_value = [
+                    InputSanitizer.sanitize_string(str(item), allow_html=False, max_length=500, memoize=memoize)
+                    if isinstance(item, str) else item
+                    for item in value[:100]  # Limit list size
+                ]
+            else:
+                safe_value = value
+            
+            sanitized[safe_key] = safe_value
     
-    return sanitized
+    return root
 
 
 def validate_json_field(value: Any, max_depth: int = 3, max_keys: int = 100) -> Any:
-    """Validate JSON field for security"""
-    def validate_recursive(obj, depth=0):
+    """Validate JSON field for security, iteratively so payload shape cannot exhaust the stack"""
+    def validate(obj, depth):
+        """Validated scalar, or an empty container whose children are queued"""
         if depth > max_depth:
             raise ValidationError("JSON structure too deep")
         
@@ -294,16 +364,22 @@ def validate_json_field(value: Any, max_depth: int = 3, max_keys: int = 100) ->
                 raise ValidationError("Too many keys in JSON object")
             
             validated = {}
+            children = []
             for k, v in obj.items():
                 safe_key = InputSanitizer.sanitize_string(str(k), max_length=100)
-                validated[safe_key] = validate_recursive(v, depth + 1)
+                validated[safe_key] = None
+                children.append((v, depth + 1, validated, safe_key))
+            # Reversed so children are popped in order: on a key collision the last one wins
+            pending.extend(reversed(children))
             return validated
         
         elif isinstance(obj, list):
             if len(obj) > max_keys:
                 raise ValidationError("JSON array too large")
             
-            return [validate_recursive(item, depth + 1) for item in obj]
+            validated = [None] * len(obj)
+            pending.extend((item, depth + 1, validated, index) for index, item in reversed(list(enumerate(obj))))
+            return validated
         
         elif isinstance(obj, str):
             return InputSanitizer.sanitize_string(obj, max_length=1000)
@@ -311,7 +387,12 @@ def validate_json_field(value: Any, max_depth: int = 3, max_keys: int = 100) ->
         else:
             return obj
     
-    return validate_recursive(value)
+    pending = []
+    result = validate(value, 0)
+    while pending:
+        obj, depth, parent, slot = pending.pop()
+        parent[slot] = validate(obj, depth)
+    return result
 
 
 # Decorator for view methods to sanitize request data
@@ -0,0 +1,106 @@
+import time as timer
+from datetime import datetime, timedelta
+
+import pytz
+from django.core.management.base import BaseCommand
+from api.availability import _compile, get_compiled_availability
+
+
+TIMEZONES = ['America/New_York', 'Europe/London', 'Australia/Sydney', 'America/Santiago', 'Africa/Mogadishu']
+
+AVAILABILITY = [
+    {'day': day, 'start_time': start, 'end_time': end}
+    for day in range(7)
+    for start, end in (('01:30', '03:00'), ('09:00', '12:00'), ('13:00', '17:00'), ('19:00', '21:30'))
+]
+
+
+def legacy_available_slots(availability, tz_name, start_date, end_date):
+    """The pre-compilation MentorProfile.get_available_slots, kept as the baseline"""
+    slots = []
+    mentor_tz = pytz.timezone(tz_name)
+    current_date = start_date.date()
+    end = end_date.date()
+    while current_date <= end:
+        weekday = current_date.weekday()
+        for slot in availability:
+            if slot.get('day') == weekday:
+                start_hour, start_min = map(int, slot.get('start_time', '09:00').split(':'))
+                end_hour, end_min = map(int, slot.get('end_time', '17:00').split(':'))
+                slot_start = mentor_tz.localize(
+                    datetime.combine(current_date, datetime.min.time().replace(hour=start_hour, minute=start_min))
+                )
+                slot_end = mentor_tz.localize(
+                    datetime.combine(current_date, datetime.min.time().replace(hour=end_hour, minute=end_min))
+                )
+                if slot_start > datetime.now(mentor_tz):
+                    slots.append({
+                        'start': slot_start.isoformat(),
+                        'end': slot_end.isoformat(),
+                        'day_name': current_date.strftime('%A'),
+                        'date': current_date.isoformat(),
+                    })
+        current_date += timedelta(days=1)
+    return slots
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark availability slot expansion over 90-day ranges in DST-observing timezones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Length of each expanded date range (default: 90)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Timed expansions per timezone (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        days, repeat = options['days'], options['repeat']
+        self.stdout.write(self.style.SUCCESS(
+            f'Expanding {len(AVAILABILITY)} weekly windows over {days} days, {repeat} runs per zone...'
+        ))
+
+        # Ranges start next year and straddle both DST switches of each hemisphere
+        year = datetime.now(pytz.UTC).year + 1
+        ranges = [
+            datetime(year, 2, 15, tzinfo=pytz.UTC),
+            datetime(year, 9, 1, tzinfo=pytz.UTC),
+        ]
+
+        for tz_name in TIMEZONES:
+            for start in ranges:
+                end = start + timedelta(days=days)
+                legacy = legacy_available_slots(AVAILABILITY, tz_name, start, end)
+
+                _compile.cache_clear()
+                started = timer.perf_counter()
+                compiled = get_compiled_availability(AVAILABILITY, tz_name).slots(start, end)
+                cold_ms = (timer.perf_counter() - started) * 1000
+
+                if compiled != legacy:
+                    self.stdout.write(self.style.ERROR(f'  {tz_name}: compiled slots differ from legacy output'))
+                    continue
+
+                legacy_ms = self._time(lambda: legacy_available_slots(AVAILABILITY, tz_name, start, end), repeat)
+                warm_ms = self._time(
+                    lambda: get_compiled_availability(AVAILABILITY, tz_name).slots(start, end), repeat
+                )
+                self.stdout.write(
+                    f'  {tz_name:20} from {start:%Y-%m-%d}  {len(compiled):4} slots  '
+                    f'legacy {legacy_ms:7.2f}ms  compiled {warm_ms:6.2f}ms (cold {cold_ms:6.2f}ms)  '
+                    f'x{legacy_ms / warm_ms:.1f}'
+                )
+
+    @staticmethod
+    def _time(func, repeat):
+        started = timer.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (timer.perf_counter() - started) * 1000 / repeat
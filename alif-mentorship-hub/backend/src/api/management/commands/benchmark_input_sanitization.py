@@ -0,0 +1,198 @@
+import html
+import random
+import time as timer
+
+import bleach
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.utils.html import strip_tags
+from api.input_sanitization import InputSanitizer, _memoized_sanitize, sanitize_dict, validate_json_field
+
+
+class LegacyInputSanitizer(InputSanitizer):
+    """The unscreened sanitizer (every pattern on every value, no memo), kept as the baseline"""
+
+    @classmethod
+    def sanitize_string(cls, value, allow_html=False, max_length=None, memoize=True):
+        if not isinstance(value, str):
+            value = str(value)
+        value = value.replace('\x00', '')
+        if cls.contains_sql_injection(value):
+            raise ValidationError("Input contains potentially malicious SQL patterns")
+        if cls.contains_command_injection(value):
+            raise ValidationError("Input contains potentially malicious command patterns")
+        if cls.contains_path_traversal(value):
+            raise ValidationError("Input contains path traversal patterns")
+        if allow_html:
+            value = bleach.clean(value, tags=cls.ALLOWED_HTML_TAGS, attributes=cls.ALLOWED_HTML_ATTRIBUTES, strip=True)
+        else:
+            value = strip_tags(value)
+            value = html.escape(value)
+        for pattern in cls.XSS_PATTERNS:
+            value = pattern.sub('', value)
+        value = ' '.join(value.split())
+        if max_length and len(value) > max_length:
+            value = value[:max_length].rstrip()
+        return value
+
+
+def legacy_sanitize_dict(data, allowed_keys=None):
+    sanitized = {}
+    for key, value in data.items():
+        if allowed_keys and key not in allowed_keys:
+            continue
+        safe_key = LegacyInputSanitizer.sanitize_string(str(key), allow_html=False, max_length=100)
+        if isinstance(value, str):
+            safe_value = LegacyInputSanitizer.sanitize_string(value, allow_html=False, max_length=1000)
+        elif isinstance(value, dict):
+            safe_value = legacy_sanitize_dict(value)
+        elif isinstance(value, list):
+            safe_value = [
+                LegacyInputSanitizer.sanitize_string(str(item), allow_html=False, max_length=500)
+                if isinstance(item, str) else item
+                for item in value[:100]
+            ]
+        else:
+            safe_value = value
+        sanitized[safe_key] = safe_value
+    return sanitized
+
+
+def legacy_validate_json_field(value, max_depth=3, max_keys=100):
+    def validate_recursive(obj, depth=0):
+        if depth > max_depth:
+            raise ValidationError("JSON structure too deep")
+        if isinstance(obj, dict):
+            if len(obj) > max_keys:
+                raise ValidationError("Too many keys in JSON object")
+            return {
+                LegacyInputSanitizer.sanitize_string(str(k), max_length=100): validate_recursive(v, depth + 1)
+                for k, v in obj.items()
+            }
+        elif isinstance(obj, list):
+            if len(obj) > max_keys:
+                raise ValidationError("JSON array too large")
+            return [validate_recursive(item, depth + 1) for item in obj]
+        elif isinstance(obj, str):
+            return LegacyInputSanitizer.sanitize_string(obj, max_length=1000)
+        return obj
+    return validate_recursive(value)
+
+
+FIRST_NAMES = ['Amina', 'Hodan', 'Abdi', 'Farah', 'Ifrah', 'Mohamed', 'Sahra', 'Yusuf']
+FIELDS = ['Computer Science', 'Public Health', 'Civil Engineering', 'Economics', 'Data Science', 'Nursing']
+UNIVERSITIES = ['SIMAD University', 'University of Mogadishu', 'Amoud University', 'Benadir University']
+SENTENCES = [
+    "I'm a final-year student looking for guidance on scholarships abroad.",
+    'Happy to help with CVs, interviews & applications (especially for masters).',
+    'Worked 3 years at a hospital in Hargeisa; now researching "community health".',
+    'Can we move our session to Thursday at 14:30?',
+    'Thanks, that was really helpful!',
+]
+MALICIOUS = [
+    "'; DROP TABLE users; --", "1' OR '1'='1", '<script>alert(1)</script>', '../../etc/passwd',
+    'test; cat /etc/passwd', '<img src=x onerror=alert(1)>', 'javascript:alert(1)', 'a onclick = b',
+]
+
+
+def build_payloads(count, seed=11):
+    """(kind, payload) pairs in a rough production mix: forms, JSON fields, chat text, a few attacks"""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        roll = rng.random()
+        name = rng.choice(FIRST_NAMES)
+        if roll < 0.3:
+            payloads.append(('register', {
+                'username': f'{name.lower()}_{rng.randint(1, 999)}', 'password': f'Pass.{rng.getrandbits(32):x}!',
+                'role': rng.choice(['student', 'mentor']), 'phone': f'+2526{rng.randint(10000000, 99999999)}',
+                'first_name': name, 'last_name': rng.choice(FIRST_NAMES),
+            }))
+        elif roll < 0.55:
+            payloads.append(('availability', [
+                {'day': day, 'start_time': f'{rng.choice([8, 9, 10]):02d}:00', 'end_time': f'{rng.choice([15, 17]):02d}:30'}
+                for day in sorted(rng.sample(range(7), rng.randint(1, 5)))
+            ]))
+        elif roll < 0.75:
+            payloads.append(('filters', {
+                'field_of_study': rng.choice(FIELDS), 'university': rng.choice(UNIVERSITIES),
+                'min_rating': rng.choice([3, 4, 4.5]), 'languages': rng.sample(['Somali', 'English', 'Arabic'], 2),
+                'nested': {'verified_only': True, 'sort': rng.choice(['rating', 'newest'])},
+            }))
+        elif roll < 0.97:
+            payloads.append(('text', ' '.join(rng.sample(SENTENCES, rng.randint(1, 3)))))
+        else:
+            payloads.append(('text', rng.choice(MALICIOUS)))
+    return payloads
+
+
+def run(payloads, sanitize_string, sanitize_dict_fn, validate_json_fn):
+    """Outcome per payload (result or error message) and seconds per kind"""
+    outcomes, timings = [], {}
+    for kind, payload in payloads:
+        started = timer.perf_counter()
+        try:
+            if kind == 'register':
+                result = sanitize_dict_fn(payload, ['username', 'password', 'role', 'phone', 'first_name', 'last_name'])
+            elif kind == 'filters':
+                result = sanitize_dict_fn(payload)
+            elif kind == 'availability':
+                result = validate_json_fn(payload)
+            else:
+                result = sanitize_string(payload, max_length=1000)
+        except ValidationError as e:
+            result = f'error: {e}'
+        timings[kind] = timings.get(kind, 0) + timer.perf_counter() - started
+        outcomes.append(result)
+    return outcomes, timings
+
+
+class Command(BaseCommand):
+    help = 'Benchmark InputSanitizer on typical payloads against the pass-per-pattern baseline and check outcomes match'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payloads',
+            type=int,
+            default=20000,
+            help='Number of payloads (default: 20000)',
+        )
+
+    def handle(self, *args, **options):
+        payloads = build_payloads(options['payloads'])
+        counts = {}
+        for kind, _ in payloads:
+            counts[kind] = counts.get(kind, 0) + 1
+        self.stdout.write(self.style.SUCCESS(f'Sanitizing {len(payloads)} payloads {counts}...'))
+
+        legacy_outcomes, legacy_timings = run(
+            payloads, LegacyInputSanitizer.sanitize_string, legacy_sanitize_dict, legacy_validate_json_field
+        )
+        _memoized_sanitize.cache_clear()
+        results = [('legacy', legacy_timings)]
+        mismatches = 0
+        for name in ('screened, cold memo', 'screened, warm memo'):
+            outcomes, timings = run(payloads, InputSanitizer.sanitize_string, sanitize_dict, validate_json_field)
+            results.append((name, timings))
+            for payload, expected, actual in zip(payloads, legacy_outcomes, outcomes):
+                if expected != actual:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        self.stdout.write(self.style.ERROR(f'  Mismatch for {payload!r}:\n    {expected!r}\n    {actual!r}'))
+
+        for name, timings in results:
+            per_kind = '  '.join(
+                f'{kind} {timings[kind] / counts[kind] * 1e6:6.1f}' for kind in sorted(timings)
+            )
+            total = sum(timings.values())
+            self.stdout.write(
+                f'  {name:<24} {per_kind}  µs/payload   '
+                f'overall {total / len(payloads) * 1e6:6.1f} ({sum(legacy_timings.values()) / total:4.1f}x)'
+            )
+        info = _memoized_sanitize.cache_info()
+        self.stdout.write(f'  memo: {info.currsize}/{info.maxsize} entries, {info.hits} hits, {info.misses} misses')
+
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} outcome(s) differ from the baseline.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Every outcome matches the baseline.'))
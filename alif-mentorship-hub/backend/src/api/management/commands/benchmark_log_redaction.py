@@ -0,0 +1,154 @@
+import copy
+import json
+import logging
+import random
+import time as timer
+
+from django.core.management.base import BaseCommand
+from api.secure_logging import RedactionEngine, SecureLogFormatter
+
+
+class LegacySecureLogFormatter(SecureLogFormatter):
+    """The pre-engine formatter (one regex pass per pattern, serialise twice to truncate), kept as the baseline"""
+
+    def format(self, record):
+        if hasattr(record, 'msg') and record.msg:
+            record.msg = self.sanitize_message(str(record.msg))
+        if hasattr(record, 'args') and record.args:
+            record.args = tuple(self.sanitize_message(str(arg)) for arg in record.args)
+        log_entry = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+        }
+        if hasattr(record, 'user_id'):
+            log_entry['user_id'] = record.user_id
+        if hasattr(record, 'request_id'):
+            log_entry['request_id'] = record.request_id
+        if hasattr(record, 'ip_address'):
+            log_entry['ip_address'] = record.ip_address
+        if hasattr(record, 'user_agent'):
+            log_entry['user_agent'] = self.sanitize_message(record.user_agent)
+        if record.exc_info:
+            log_entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry['exception'] = record.exc_text
+        message = json.dumps(log_entry, default=str, ensure_ascii=False)
+        if len(message) > self.max_length:
+            log_entry['message'] = log_entry['message'][:self.max_length - 100] + '... [TRUNCATED]'
+            message = json.dumps(log_entry, default=str, ensure_ascii=False)
+        return message
+
+    def sanitize_message(self, message):
+        if not isinstance(message, str):
+            message = str(message)
+        for pattern in self.INJECTION_PATTERNS:
+            message = pattern.sub('[FILTERED]', message)
+        for pattern, data_type in self.SENSITIVE_PATTERNS:
+            message = pattern.sub(f'[{data_type.upper()}_REDACTED]', message)
+        if len(message) > self.max_length:
+            message = message[:self.max_length] + '... [TRUNCATED]'
+        return message
+
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148',
+    'python-requests/2.32.3',
+]
+
+CLEAN_FRAGMENTS = [
+    'Session {n} accepted by mentor {m}', 'User {n} logged in', 'Cache miss for mentor_list',
+    'API Request', 'Data access', 'Rate limit exceeded for ip:203.0.113.{m}',
+    'GET /api/mentors/{n}/availability/?start=2026-10-{m:02d}', 'Mentor profile {n} updated',
+    'Keyset page {n} served in {m} ms', 'Unread counter rebuilt for user {n}',
+]
+
+DIRTY_FRAGMENTS = [
+    'Sending reminder to student{n}@example.com', 'login failed password={word}',
+    'Invalid bearer token: {word}', 'Authorization: Bearer {word}', 'api_key="{word}"',
+    'card 4111 1111 1111 {n:04d} declined', 'ssn 123-45-{n:04d}', 'secret: {word}, retrying',
+    'payload <script>alert({n})</script> rejected', 'javascript:void({n})', 'img onerror = x{n}',
+    'line one\r\nline two', 'tab\there\x07bell',
+]
+
+
+def build_corpus(size, seed=7, dirty_share=0.2):
+    """Realistic log text: mostly clean and repetitive, with secrets and injection attempts mixed in"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        text = ' '.join(
+            rng.choice(DIRTY_FRAGMENTS if rng.random() < dirty_share else CLEAN_FRAGMENTS).format(
+                n=rng.randint(1, 9999), m=rng.randint(1, 31), word=f'tok{rng.getrandbits(40):x}'
+            )
+            for _ in range(rng.randint(1, 3))
+        )
+        corpus.append(text)
+    # A few oversized messages to exercise truncation
+    corpus.extend('x' * 12000 + f' token={i}' for i in range(5))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = 'Benchmark SecureLogFormatter redaction against the sequential baseline and check the output is identical'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=20000,
+            help='Corpus size (default: 20000)',
+        )
+
+    def handle(self, *args, **options):
+        corpus = build_corpus(options['messages'])
+        legacy, current = LegacySecureLogFormatter(), SecureLogFormatter()
+        # A fresh engine so the clean cache starts cold
+        current.redactor = RedactionEngine(current.INJECTION_PATTERNS, current.SENSITIVE_PATTERNS, current.max_length)
+        self.stdout.write(self.style.SUCCESS(f'Sanitising and formatting {len(corpus)} messages...'))
+
+        records = []
+        for i, text in enumerate(corpus):
+            record = logging.LogRecord('api', logging.INFO, __file__, i, text, None, None)
+            record.user_agent = USER_AGENTS[i % len(USER_AGENTS)]
+            record.ip_address = '203.0.113.7'
+            records.append(record)
+
+        mismatches = 0
+        timings = {}
+        for name, formatter in (('sequential (legacy)', legacy), ('compiled engine', current)):
+            started = timer.perf_counter()
+            sanitized = [formatter.sanitize_message(text) for text in corpus]
+            sanitize_time = timer.perf_counter() - started
+
+            batch = [copy.copy(record) for record in records]
+            started = timer.perf_counter()
+            formatted = [formatter.format(record) for record in batch]
+            format_time = timer.perf_counter() - started
+            timings[name] = (sanitize_time, format_time, sanitized, formatted)
+
+        _, _, legacy_sanitized, legacy_formatted = timings['sequential (legacy)']
+        _, _, sanitized, formatted = timings['compiled engine']
+        for expected, actual in zip(legacy_sanitized + legacy_formatted, sanitized + formatted):
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    self.stdout.write(self.style.ERROR(f'  Mismatch:\n    {expected[:200]!r}\n    {actual[:200]!r}'))
+
+        base_sanitize, base_format = timings['sequential (legacy)'][:2]
+        for name, (sanitize_time, format_time, _, _) in timings.items():
+            self.stdout.write(
+                f'  {name:<20} sanitize {sanitize_time / len(corpus) * 1e6:6.1f} µs/msg '
+                f'({base_sanitize / sanitize_time:4.1f}x)   '
+                f'format {format_time / len(corpus) * 1e6:6.1f} µs/record ({base_format / format_time:4.1f}x)'
+            )
+
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} output(s) differ from the baseline.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Output identical to the baseline for every message.'))
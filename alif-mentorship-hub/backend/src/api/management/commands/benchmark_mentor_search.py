@@ -0,0 +1,151 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from api.database_optimization import MentorSearch, QueryOptimizer
+from api.models import MentorProfile, User
+
+
+BENCH_PREFIX = 'bench_search_'
+
+FIELDS = [
+    'Computer Science', 'Software Engineering', 'Medicine', 'Civil Engineering',
+    'Economics', 'Public Health', 'Data Science', 'Business Administration',
+    'Electrical Engineering', 'Nursing', 'Law', 'Architecture',
+]
+UNIVERSITIES = [
+    'University of Mogadishu', 'SIMAD University', 'Benadir University',
+    'Amoud University', 'University of Hargeisa', 'Jamhuriya University',
+    'Kampala International University', 'University of Nairobi',
+]
+BIO_WORDS = (
+    'experienced mentor helping students career growth research software '
+    'startup hospital clinical design construction finance banking policy '
+    'teaching scholarship internship python machine learning cloud networks '
+    'leadership entrepreneurship community volunteer abroad masters phd'
+).split()
+
+QUERIES = [
+    'computer science',
+    'mogadishu',
+    'machine learning',
+    'public health scholarship',
+    'software startup python',
+    'civil engineering hargeisa',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark mentor q= search against the legacy icontains filters on synthetic profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles',
+            type=int,
+            default=100000,
+            help='Number of synthetic mentor profiles to benchmark against (default: 100000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Timed runs per query (default: 20)',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the synthetic profiles for later runs instead of deleting them',
+        )
+        parser.add_argument(
+            '--allow-production',
+            action='store_true',
+            help='Run even though DEBUG is off (seeds and deletes rows in the configured database)',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['allow_production']:
+            raise CommandError(
+                'Refusing to seed synthetic profiles with DEBUG off; pass --allow-production to run anyway.'
+            )
+
+        target = options['profiles']
+        repeat = options['repeat']
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Benchmarking mentor search on {connection.vendor} with {target} synthetic profiles...'
+        ))
+
+        try:
+            # Inside the try so a partly seeded run is cleaned up as well
+            self._seed(target)
+            base = QueryOptimizer.optimize_mentor_list_query()
+            for query in QUERIES:
+                ranked = MentorSearch.apply(base, query).order_by('-search_rank', '-average_rating', '-id')
+                legacy = base.filter(
+                    Q(field_of_study__icontains=query) | Q(university__icontains=query)
+                )
+                ranked_stats = self._time(ranked, repeat)
+                legacy_stats = self._time(legacy, repeat)
+                self.stdout.write(
+                    f'  q={query!r:32} search p50={ranked_stats[0]:7.2f}ms p95={ranked_stats[1]:7.2f}ms'
+                    f' | icontains p50={legacy_stats[0]:7.2f}ms p95={legacy_stats[1]:7.2f}ms'
+                )
+        finally:
+            if not options['keep']:
+                self._cleanup()
+
+    def _seed(self, target):
+        existing = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        if existing >= target:
+            self.stdout.write(f'  Reusing {existing} existing synthetic profiles')
+            return
+
+        rng = random.Random(42)
+        started = time.perf_counter()
+        batch_size = 5000
+        for start in range(existing, target, batch_size):
+            stop = min(start + batch_size, target)
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=f'{BENCH_PREFIX}{i}', role='mentor', password='!')
+                    for i in range(start, stop)
+                ])
+                if not all(user.pk for user in users):
+                    users = list(User.objects.filter(
+                        username__in=[user.username for user in users]
+                    ))
+                MentorProfile.objects.bulk_create([
+                    MentorProfile(
+                        user=user,
+                        university=rng.choice(UNIVERSITIES),
+                        graduation_year=rng.randint(2005, 2024),
+                        field_of_study=rng.choice(FIELDS),
+                        bio=' '.join(rng.choice(BIO_WORDS) for _ in range(rng.randint(15, 40))),
+                        is_verified=True,
+                        average_rating=round(rng.uniform(1, 5), 2),
+                    )
+                    for user in users
+                ])
+        self.stdout.write(f'  Seeded {target - existing} profiles in {time.perf_counter() - started:.1f}s')
+
+    def _time(self, qs, repeat):
+        """Return (p50, p95) in milliseconds for fetching the first page"""
+        list(qs[:20])  # warm-up
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(qs[:20])
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return statistics.median(samples), p95
+
+    def _cleanup(self):
+        with transaction.atomic():
+            MentorProfile.objects.filter(user__username__startswith=BENCH_PREFIX).delete()
+            deleted, _ = User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        self.stdout.write(f'  Removed {deleted} synthetic rows')
@@ -1,62 +1,108 @@
-from django.core.management.base import BaseCommand
+import time as timer
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
-from api.models import Session
+from api.availability import invalidate_mentor_availability
+from api.models import Session, User
+
+
+NO_SHOW_NOTE = 'Automatically cancelled due to no-show (session not marked as completed)'
 
 
 class Command(BaseCommand):
     help = 'Detect no-shows and apply penalties (run this daily via cron)'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report overdue sessions and penalties without writing any changes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Sessions cancelled per transaction (default: 1000)',
+        )
+
     def handle(self, *args, **options):
+        dry_run, batch_size = options['dry_run'], options['batch_size']
+        if batch_size < 1:
+            # Zero would stop before the first batch; a negative slice is an error
+            raise CommandError('--batch-size must be a positive integer.')
         self.stdout.write(self.style.SUCCESS('Checking for no-shows...'))
-        
+
         # Find accepted sessions where:
         # 1. Session time has passed (more than 2 hours ago to give grace period)
         # 2. Status is still 'accepted' (not marked as completed)
         cutoff_time = timezone.now() - timedelta(hours=2)
-        no_show_sessions = Session.objects.filter(
-            status='accepted',
-            requested_time__lt=cutoff_time
-        ).select_related('student', 'mentor')
-        
-        no_show_count = 0
-        
-        for session in no_show_sessions:
-            # Mark session as cancelled
-            session.status = 'cancelled'
-            session.mentor_notes = 'Automatically cancelled due to no-show (session not marked as completed)'
-            session.save(update_fields=['status', 'mentor_notes'])
-            
-            # Apply penalty to student (assuming student is responsible for no-show)
-            # In a more sophisticated system, you'd determine who was responsible
-            session.student.apply_no_show_penalty()
-            
-            no_show_count += 1
-            
-            self.stdout.write(
-                self.style.WARNING(
-                    f'No-show detected: Session #{session.id} ({session.student.username} → {session.mentor.username})'
+        overdue = Session.objects.filter(status='accepted', requested_time__lt=cutoff_time)
+
+        started = timer.perf_counter()
+        sessions_total = batches = 0
+        students = set()
+        last_pk = 0
+
+        while True:
+            with transaction.atomic():
+                # Lock one chunk so the counts below match exactly what the UPDATE cancels
+                chunk = overdue.filter(pk__gt=last_pk).order_by('pk')
+                if not dry_run:
+                    chunk = chunk.select_for_update()
+                rows = list(chunk.values_list('pk', 'mentor_id')[:batch_size])
+                if not rows:
+                    break
+                ids = [pk for pk, _ in rows]
+                last_pk = ids[-1]
+
+                # No-shows per student for this chunk, totalled by the database
+                penalties = dict(
+                    overdue.filter(pk__in=ids)
+                    .order_by()
+                    .values_list('student_id')
+                    .annotate(total=Count('id'))
                 )
-            )
+
+                if not dry_run:
+                    overdue.filter(pk__in=ids).update(status='cancelled', mentor_notes=NO_SHOW_NOTE)
+                    User.apply_no_show_penalties(penalties)
+
+            if not dry_run:
+                for mentor_id in {mentor_id for _, mentor_id in rows}:
+                    invalidate_mentor_availability(mentor_id)
+
+            batches += 1
+            sessions_total += len(ids)
+            students.update(penalties)
             self.stdout.write(
-                f'  Student reliability score: {session.student.reliability_score:.0f}/100'
+                f'  Batch {batches}: {len(ids)} no-show(s) across {len(penalties)} student(s)'
             )
-            if session.student.is_restricted():
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'  Student restricted until: {session.student.restriction_until}'
-                    )
-                )
-        
-        if no_show_count == 0:
+
+        elapsed = timer.perf_counter() - started
+
+        if sessions_total == 0:
             self.stdout.write(self.style.SUCCESS('No no-shows detected.'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(
+                f'\n{sessions_total} no-show(s) across {len(students)} student(s). Dry run — nothing written.'
+            ))
         else:
+            restricted = User.objects.filter(pk__in=students, restriction_until__gt=timezone.now()).count()
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'\nProcessed {no_show_count} no-show(s). Penalties applied.'
+                    f'\nProcessed {sessions_total} no-show(s) for {len(students)} student(s) '
+                    f'in {batches} batch(es). Penalties applied; {restricted} student(s) now restricted.'
                 )
             )
-        
+
+        if sessions_total:
+            self.stdout.write(
+                f'Elapsed {elapsed:.2f}s ({sessions_total / elapsed if elapsed else 0:.0f} sessions/s)'
+            )
+
         self.stdout.write(
             self.style.WARNING(
                 '\nNote: Schedule this command to run daily via cron:\n'
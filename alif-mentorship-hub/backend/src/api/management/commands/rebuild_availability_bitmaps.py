@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.availability import BITMAP_FIELDS
+from api.conditional import bump_content_versions
+from api.models import MentorProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompile mentor availability bitmaps. Run daily (e.g. from cron) so '
+        'profiles in DST-observing timezones pick up offset changes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report stale bitmaps without writing any changes',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write(self.style.SUCCESS('Recompiling mentor availability bitmaps...'))
+
+        fields = [*BITMAP_FIELDS, 'availability_utc_offset']
+        stale = []
+        for profile in MentorProfile.objects.only('id', 'availability', 'timezone', *fields).iterator():
+            if profile.compile_availability_bitmap():
+                stale.append(profile)
+
+        if not stale:
+            self.stdout.write(self.style.SUCCESS('All bitmaps are up to date.'))
+            return
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{len(stale)} stale bitmap(s). Dry run — nothing written.'))
+            return
+
+        with transaction.atomic():
+            MentorProfile.objects.bulk_update(stale, fields, batch_size=500)
+            # Bitmaps are not serialised, but they decide which mentors the list's availability filters return
+            bump_content_versions('mentors')
+
+        self.stdout.write(self.style.SUCCESS(f'Recompiled {len(stale)} bitmap(s).'))
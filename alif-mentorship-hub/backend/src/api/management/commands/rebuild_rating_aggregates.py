@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from api.conditional import bump_content_versions, mentor_scopes
+from api.models import MentorProfile, Review, RATING_AGGREGATE_FIELDS, RATING_HISTOGRAM_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalised mentor rating aggregates from the Review table and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without writing any changes',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write(self.style.SUCCESS('Rebuilding mentor rating aggregates...'))
+
+        # One GROUP BY pass over all reviews, keyed by mentor user id
+        histogram_aggregates = {
+            field: Count('id', filter=Q(rating=rating))
+            for rating, field in RATING_HISTOGRAM_FIELDS.items()
+        }
+        rows = (
+            Review.objects
+            .values('session__mentor_id')
+            .annotate(review_count=Count('id'), rating_sum=Sum('rating'), **histogram_aggregates)
+            .order_by()
+        )
+        expected_by_mentor = {row.pop('session__mentor_id'): row for row in rows}
+
+        empty = {field: 0 for field in RATING_AGGREGATE_FIELDS}
+        drifted = []
+        for profile in MentorProfile.objects.only('id', 'user_id', *RATING_AGGREGATE_FIELDS).iterator():
+            expected = dict(empty, **expected_by_mentor.get(profile.user_id, {}))
+            expected['rating_sum'] = expected['rating_sum'] or 0
+            expected['average_rating'] = (
+                round(expected['rating_sum'] / expected['review_count'], 2)
+                if expected['review_count'] else 0.0
+            )
+
+            changes = {
+                field: (getattr(profile, field), value)
+                for field, value in expected.items()
+                if getattr(profile, field) != value
+            }
+            if not changes:
+                continue
+
+            for field, (_, value) in changes.items():
+                setattr(profile, field, value)
+            drifted.append(profile)
+
+            summary = ', '.join(f'{field}: {old} → {new}' for field, (old, new) in changes.items())
+            self.stdout.write(self.style.WARNING(f'Drift on mentor profile #{profile.id}: {summary}'))
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('No drift detected.'))
+            return
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'\n{len(drifted)} profile(s) drifted. Dry run — nothing written.'))
+            return
+
+        with transaction.atomic():
+            MentorProfile.objects.bulk_update(drifted, list(RATING_AGGREGATE_FIELDS), batch_size=500)
+            # bulk_update sends no signals
+            bump_content_versions(*mentor_scopes(profile.pk for profile in drifted))
+
+        self.stdout.write(self.style.SUCCESS(f'\nRepaired {len(drifted)} drifted profile(s).'))
@@ -0,0 +1,72 @@
+import time as timer
+
+from django.core.management.base import BaseCommand
+from api.email import OUTBOX_MAX_ATTEMPTS, deliver_queued_emails
+from api.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver queued notification emails from the outbox in batches. '
+        'Run from cron, or as a long-lived worker with --loop. Several '
+        'senders may run at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Messages sent per mail connection (default: 100)',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=OUTBOX_MAX_ATTEMPTS,
+            help=f'Attempts before a message is marked failed (default: {OUTBOX_MAX_ATTEMPTS})',
+        )
+        parser.add_argument(
+            '--loop',
+            type=float,
+            metavar='SECONDS',
+            help='Keep running, polling for due messages at this interval',
+        )
+        parser.add_argument(
+            '--depth',
+            action='store_true',
+            help='Only report the queue depth',
+        )
+
+    def handle(self, *args, **options):
+        if options['depth']:
+            self._report_depth()
+            return
+
+        while True:
+            self._drain(options['batch_size'], options['max_attempts'])
+            if not options['loop']:
+                break
+            timer.sleep(options['loop'])
+
+    def _drain(self, batch_size, max_attempts):
+        started = timer.perf_counter()
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            stats = deliver_queued_emails(batch_size, max_attempts)
+            for key, value in stats.items():
+                totals[key] += value
+            # A short batch means nothing else is due right now
+            if sum(stats.values()) < batch_size:
+                break
+
+        if not any(totals.values()):
+            return
+        elapsed = timer.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']} email(s) in {elapsed:.2f}s; "
+            f"{totals['retried']} scheduled for retry, {totals['failed']} failed permanently."
+        ))
+        self._report_depth()
+
+    def _report_depth(self):
+        self.stdout.write(f'Queue depth: {EmailOutbox.queue_depth()} pending')
@@ -0,0 +1,131 @@
+import time as timer
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from api.email import build_session_reminder_messages, queue_email
+from api.models import Session
+
+
+class Command(BaseCommand):
+    help = (
+        'Email reminders for accepted sessions starting within the lead time. '
+        'Safe to run every minute (e.g. from cron) on several nodes at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lead-hours',
+            type=int,
+            default=24,
+            help='Remind sessions starting within this many hours (default: 24)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Sessions claimed and emailed per batch (default: 200)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report due reminders without claiming or sending anything',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        # One range scan on session_reminder_due_idx (status, reminder_sent_at, requested_time)
+        due = Session.objects.filter(
+            status='accepted',
+            reminder_sent_at__isnull=True,
+            requested_time__gt=now,
+            requested_time__lte=now + timedelta(hours=options['lead_hours']),
+        )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{due.count()} reminder(s) due. Dry run — nothing sent.'))
+            return
+
+        started = timer.perf_counter()
+        sent = failed = queued = batches = 0
+        while True:
+            sessions = self._claim(due, batch_size, now)
+            if not sessions:
+                break
+            batches += 1
+            batch_sent, released, batch_queued = self._send(sessions)
+            sent += batch_sent
+            failed += len(released)
+            queued += batch_queued
+            if released:
+                # Give failed reminders back so the next run retries them
+                Session.objects.filter(pk__in=released, reminder_sent_at=now).update(reminder_sent_at=None)
+                break
+
+        elapsed = timer.perf_counter() - started
+        if not batches:
+            self.stdout.write(self.style.SUCCESS('No reminders due.'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {sent} reminder email(s) in {batches} batch(es), {elapsed:.2f}s.'
+        ))
+        if queued:
+            self.stdout.write(self.style.WARNING(f'{queued} reminder email(s) failed and were queued for retry.'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'{failed} session(s) failed and were released for retry.'))
+
+    def _claim(self, due, batch_size, now):
+        """
+        Lock a batch (skipping rows another node holds), stamp it and commit,
+        so each session is claimed by exactly one run.
+        """
+        with transaction.atomic():
+            ids = list(
+                due.select_for_update(skip_locked=True)
+                .order_by('requested_time', 'pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return []
+            due.filter(pk__in=ids).update(reminder_sent_at=now)
+        return list(Session.objects.select_related('student', 'mentor').filter(pk__in=ids).order_by('pk'))
+
+    def _send(self, sessions):
+        """
+        Send the batch over one SMTP connection, one message per recipient.
+        Returns (emails sent, ids to release, emails queued).
+
+        A session is released only when none of its emails went out. Once one
+        participant has been reminded the claim stands, and the emails that
+        failed go to the outbox, so a retry never reaches the same person twice.
+        """
+        sent, released, queued = 0, [], 0
+        try:
+            connection = get_connection()
+            connection.open()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Could not open mail connection: {e}'))
+            return 0, [session.pk for session in sessions], 0
+
+        try:
+            for session in sessions:
+                failures = []
+                messages = build_session_reminder_messages(session)
+                for message in messages:
+                    try:
+                        sent += connection.send_messages([message]) or 0
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(f'  Session #{session.pk} to {message.to[0]}: {e}'))
+                        failures.append(message)
+                if failures and len(failures) == len(messages):
+                    released.append(session.pk)
+                    continue
+                for message in failures:
+                    queue_email(message.subject, message.body, message.to, message.from_email)
+                    queued += 1
+        finally:
+            connection.close()
+        return sent, released, queued
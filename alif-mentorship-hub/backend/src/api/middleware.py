@@ -12,9 +12,12 @@ from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.contrib.auth.models import AnonymousUser
 from .secure_logging import api_logger, security_logger
 from .error_handling import ErrorCode, ErrorResponseBuilder
+from .rate_limiting import rate_limiter, retry_after_header
+from .compression import compress, negotiate_encoding
 
 
 class RequestTrackingMiddleware(MiddlewareMixin):
@@ -86,13 +89,19 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
 
 
 class RateLimitingMiddleware(MiddlewareMixin):
-    """Advanced rate limiting middleware"""
+    """
+    Advanced rate limiting middleware
+
+    Buckets are per client and route template (``api/mentors/<int:pk>/``), not
+    per concrete path, and all windows are checked in one atomic GCRA call.
+    Runs in process_view so the URL has already been resolved.
+    """
     
     def __init__(self, get_response: Callable):
         super().__init__(get_response)
         self.logger = logging.getLogger('api.rate_limiting')
     
-    def process_request(self, request: HttpRequest) -> Optional[HttpResponse]:
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs) -> Optional[HttpResponse]:
         """Check rate limits"""
         
         # Skip rate limiting for certain paths
@@ -102,31 +111,38 @@ class RateLimitingMiddleware(MiddlewareMixin):
         # Get client identifier
         client_id = self._get_client_identifier(request)
         
-        # Check different rate limit tiers
-        if self._is_rate_limited(request, client_id):
+        # Check every rate limit tier at once
+        retry_after = self._check_rate_limit(request, client_id)
+        if retry_after:
             self.logger.warning(
                 f"Rate limit exceeded for {client_id}",
                 extra={
                     'client_id': client_id,
                     'path': request.path,
+                    'route': self._get_route(request),
                     'method': request.method,
                     'ip_address': request.client_ip if hasattr(request, 'client_ip') else 'unknown'
                 }
             )
             
-            return JsonResponse({
+            retry_after = retry_after_header(retry_after)
+            response = JsonResponse({
                 'success': False,
                 'error': {
                     'code': ErrorCode.RATE_LIMIT_EXCEEDED,
                     'message': 'Rate limit exceeded. Please try again later.',
-                    'retry_after': 60
+                    'retry_after': int(retry_after)
                 }
             }, status=429)
+            response['Retry-After'] = retry_after
+            return response
         
         return None
     
     def _should_skip_rate_limiting(self, request: HttpRequest) -> bool:
         """Check if rate limiting should be skipped"""
+        if not getattr(settings, 'RATE_LIMIT_ENABLED', True):
+            return True
         skip_paths = ['/health/', '/ready/', '/alive/', '/api/v1/config/']
         return any(request.path.startswith(path) for path in skip_paths)
     
@@ -137,23 +153,18 @@ class RateLimitingMiddleware(MiddlewareMixin):
         
         return f"ip:{getattr(request, 'client_ip', 'unknown')}"
     
-    def _is_rate_limited(self, request: HttpRequest, client_id: str) -> bool:
-        """Check if client is rate limited"""
+    def _get_route(self, request: HttpRequest) -> str:
+        """URL pattern the request resolved to, so detail URLs share one bucket"""
+        match = getattr(request, 'resolver_match', None)
+        return match.route if match and match.route else request.path
+    
+    def _check_rate_limit(self, request: HttpRequest, client_id: str) -> float:
+        """Seconds until the client may retry, or 0 if the request is allowed"""
         
         # Different limits for different endpoints
         limits = self._get_rate_limits(request)
-        
-        for window, max_requests in limits.items():
-            cache_key = f"rate_limit:{client_id}:{request.path}:{window}"
-            current_requests = cache.get(cache_key, 0)
-            
-            if current_requests >= max_requests:
-                return True
-            
-            # Increment counter
-            cache.set(cache_key, current_requests + 1, window)
-        
-        return False
+        bucket = f"{client_id}:{request.method}:{self._get_route(request)}"
+        return rate_limiter.hit(bucket, limits)
     
     def _get_rate_limits(self, request: HttpRequest) -> dict:
         """Get rate limits for the request"""
@@ -223,7 +234,8 @@ class MaintenanceModeMiddleware(MiddlewareMixin):
         # Check maintenance mode setting
         try:
             from api.models import PlatformSettings
-            settings_obj = PlatformSettings.get_solo()
+            # Process-local snapshot: no database query on the hot path
+            settings_obj = PlatformSettings.get_cached()
             
             if settings_obj.maintenance_mode:
                 return JsonResponse({
@@ -339,22 +351,64 @@ class RequestValidationMiddleware(MiddlewareMixin):
 
 
 class ResponseCompressionMiddleware(MiddlewareMixin):
-    """Middleware to handle response compression"""
+    """
+    Compresses responses with the best coding the client accepts (zstd,
+    brotli or gzip). Streaming responses, bodies below the minimum size,
+    content that is already compressed and token-bearing endpoints
+    (RESPONSE_COMPRESSION_EXCLUDED_PATHS) are sent as is; everything else is
+    padded with random bytes to mask its compressed length.
+    """
+    
+    # Formats that are compressed already; another pass only costs CPU
+    PRECOMPRESSED_TYPES = ('image/', 'video/', 'audio/', 'font/woff', 'application/zip', 'application/gzip',
+                           'application/pdf', 'application/octet-stream')
     
     def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
-        """Add compression headers"""
-        
-        # Check if client accepts compression
-        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
-        
-        if 'gzip' in accept_encoding.lower():
-            response['X-Compression-Available'] = 'gzip'
-        
-        # Add content length if not present
-        if not response.get('Content-Length') and hasattr(response, 'content'):
-            response['Content-Length'] = str(len(response.content))
-        
+        """Negotiate a content coding and compress the body"""
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        
+        if self.is_compressible(response) and not self.is_excluded(request):
+            # The body depends on Accept-Encoding whether or not this client gets it compressed
+            patch_vary_headers(response, ('Accept-Encoding',))
+            encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if encoding:
+                self.compress_response(response, encoding)
+        
+        response['Content-Length'] = str(len(response.content))
         return response
+    
+    def is_compressible(self, response: HttpResponse) -> bool:
+        content_type = response.get('Content-Type', '').lower()
+        return (
+            len(response.content) >= getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+            and not content_type.startswith(self.PRECOMPRESSED_TYPES)
+            and 'no-transform' not in response.get('Cache-Control', '')
+        )
+    
+    def is_excluded(self, request: HttpRequest) -> bool:
+        # Credentials next to reflected input are what BREACH recovers; never compress them
+        excluded = getattr(settings, 'RESPONSE_COMPRESSION_EXCLUDED_PATHS', ('/api/auth/', '/api/v1/auth/'))
+        return request.path.startswith(tuple(excluded))
+    
+    def compress_response(self, response: HttpResponse, encoding: str) -> None:
+        original = response.content
+        cpu_started = time.thread_time()
+        compressed = compress(original, encoding, getattr(settings, 'RESPONSE_COMPRESSION_MAX_RANDOM_BYTES', 100))
+        cpu_time = time.thread_time() - cpu_started
+        if len(compressed) >= len(original):
+            return
+        
+        response.content = compressed
+        response['Content-Encoding'] = encoding
+        # The bytes now differ per coding, so a strong validator no longer holds
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        
+        # Reported next to X-Response-Time
+        response['X-Compression-Ratio'] = f"{len(original) / len(compressed):.2f}"
+        response['X-Compression-Time'] = f"{cpu_time * 1000:.3f}ms"
 
 
 class DatabaseConnectionMiddleware(MiddlewareMixin):
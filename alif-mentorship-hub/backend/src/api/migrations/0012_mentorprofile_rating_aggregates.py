@@ -0,0 +1,84 @@
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+RATING_HISTOGRAM_FIELDS = {
+    1: 'rating_1_count',
+    2: 'rating_2_count',
+    3: 'rating_3_count',
+    4: 'rating_4_count',
+    5: 'rating_5_count',
+}
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    """Populate the new counters with one GROUP BY pass over api_review"""
+    MentorProfile = apps.get_model('api', 'MentorProfile')
+    Review = apps.get_model('api', 'Review')
+
+    rows = (
+        Review.objects
+        .values('session__mentor_id')
+        .annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{
+                field: Count('id', filter=Q(rating=rating))
+                for rating, field in RATING_HISTOGRAM_FIELDS.items()
+            }
+        )
+        .order_by()
+    )
+    for row in rows:
+        mentor_id = row.pop('session__mentor_id')
+        row['average_rating'] = round(row['rating_sum'] / row['review_count'], 2)
+        MentorProfile.objects.filter(user_id=mentor_id).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_add_soft_delete_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_rating_aggregates,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,54 @@
+# FULLTEXT index backing the mentor `q=` search (MySQL only)
+
+from django.db import migrations
+
+
+INDEX_NAME = 'idx_mentorprofile_fulltext'
+TABLE_NAME = 'api_mentorprofile'
+COLUMNS = 'bio, field_of_study, university'
+
+
+def _index_exists(cursor):
+    cursor.execute("""
+        SELECT 1
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, [TABLE_NAME, INDEX_NAME])
+    return cursor.fetchone() is not None
+
+
+def create_fulltext_index(apps, schema_editor):
+    """Create the FULLTEXT index; other backends use the portable search fallback"""
+    if schema_editor.connection.vendor != 'mysql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if _index_exists(cursor):
+            print(f"Index {INDEX_NAME} already exists, skipping")
+            return
+        cursor.execute(f"CREATE FULLTEXT INDEX {INDEX_NAME} ON {TABLE_NAME} ({COLUMNS});")
+        print(f"Created fulltext index: {INDEX_NAME}")
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if _index_exists(cursor):
+            cursor.execute(f"DROP INDEX {INDEX_NAME} ON {TABLE_NAME};")
+            print(f"Dropped index: {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_fulltext_index,
+            reverse_code=drop_fulltext_index,
+        ),
+    ]
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone as dt_timezone
+
+import pytz
+from django.db import migrations, models
+
+
+# Frozen copy of the api.availability bitmap compiler as of this migration:
+# 30-minute slots, one 48-bit mask per UTC weekday
+SLOT_MINUTES = 30
+MINUTES_PER_WEEK = 7 * 24 * 60
+BITMAP_FIELDS = tuple(f'availability_bits_{day}' for day in range(7))
+
+
+def utc_offset_minutes(tz_name):
+    """Current UTC offset of ``tz_name`` in minutes (DST-aware)"""
+    offset = datetime.now(dt_timezone.utc).astimezone(pytz.timezone(tz_name)).utcoffset()
+    return int(offset.total_seconds() // 60)
+
+
+def parse_minutes(value):
+    """'HH:MM' → minutes after midnight ('24:00' is allowed as an end bound)"""
+    hours, minutes = value.split(':')
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time: {value}")
+    return hours * 60 + minutes
+
+
+def day_mask(start_minute, end_minute):
+    """Bits for the half-hour slots fully inside [start_minute, end_minute) of one day"""
+    first = -(-start_minute // SLOT_MINUTES)
+    last = end_minute // SLOT_MINUTES
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def compile_weekly_bitmap(availability, offset_minutes):
+    """Local ``[{'day', 'start_time', 'end_time'}, ...]`` → seven UTC day masks"""
+    week = [0] * 7
+    for slot in availability or []:
+        try:
+            day = int(slot['day'])
+            start = parse_minutes(slot.get('start_time', '09:00'))
+            end = parse_minutes(slot.get('end_time', '17:00'))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        if not (0 <= day <= 6 and start < end):
+            continue
+        utc_start = (day * 1440 + start - offset_minutes) % MINUTES_PER_WEEK
+        remaining = end - start
+        while remaining > 0:
+            utc_day, minute = divmod(utc_start, 1440)
+            span = min(remaining, 1440 - minute)
+            week[utc_day] |= day_mask(minute, minute + span)
+            utc_start = (utc_start + span) % MINUTES_PER_WEEK
+            remaining -= span
+    return week
+
+
+def backfill_availability_bitmaps(apps, schema_editor):
+    """Compile the bitmap for every profile that has availability set"""
+    MentorProfile = apps.get_model('api', 'MentorProfile')
+
+    profiles = []
+    for profile in MentorProfile.objects.exclude(availability=[]).only('id', 'availability', 'timezone'):
+        try:
+            offset = utc_offset_minutes(profile.timezone)
+        except pytz.exceptions.UnknownTimeZoneError:
+            offset = 0
+        profile.availability_utc_offset = offset
+        for field, mask in zip(BITMAP_FIELDS, compile_weekly_bitmap(profile.availability, offset)):
+            setattr(profile, field, mask)
+        profiles.append(profile)
+
+    MentorProfile.objects.bulk_update(
+        profiles, [*BITMAP_FIELDS, 'availability_utc_offset'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_mentorprofile_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_0',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_1',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_2',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_3',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_4',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_5',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_bits_6',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='availability_utc_offset',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_availability_bitmaps,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
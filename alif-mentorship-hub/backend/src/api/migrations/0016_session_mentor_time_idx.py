@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_mentorprofile_availability_bitmap'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['mentor', 'requested_time', 'status'], name='session_mentor_time_idx'),
+        ),
+    ]
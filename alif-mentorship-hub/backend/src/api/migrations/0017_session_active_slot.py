@@ -0,0 +1,65 @@
+from django.db import migrations, models
+from django.db.models import Case, Count, IntegerField, Value, When
+
+
+# Frozen copy of api.availability.BOOKED_STATUSES as of this migration
+BOOKED_STATUSES = ('pending', 'accepted')
+
+
+def release_double_bookings(apps, schema_editor):
+    """
+    The unique slot constraint cannot be created while a mentor has two
+    active sessions at the same time: keep the accepted session (else the
+    earliest request) and decline the rest
+    """
+    Session = apps.get_model('api', 'Session')
+
+    duplicates = (
+        Session.objects.filter(status__in=BOOKED_STATUSES)
+        .values('mentor_id', 'requested_time')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates:
+        clashing = Session.objects.filter(
+            mentor_id=duplicate['mentor_id'],
+            requested_time=duplicate['requested_time'],
+            status__in=BOOKED_STATUSES,
+        )
+        keep = (
+            clashing.annotate(accepted_first=Case(
+                When(status='accepted', then=Value(0)), default=Value(1), output_field=IntegerField(),
+            ))
+            .order_by('accepted_first', 'id')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        clashing.exclude(pk=keep).update(status='declined')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_session_mentor_time_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(release_double_bookings, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='session',
+            name='active_slot',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(status__in=BOOKED_STATUSES, then=models.F('requested_time')),
+                    default=models.Value(None),
+                ),
+                output_field=models.DateTimeField(null=True),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='session',
+            constraint=models.UniqueConstraint(fields=('mentor', 'active_slot'), name='session_active_slot_uniq'),
+        ),
+    ]
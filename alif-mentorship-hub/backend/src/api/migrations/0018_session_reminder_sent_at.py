@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_session_active_slot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(
+                fields=['status', 'reminder_sent_at', 'requested_time'], name='session_reminder_due_idx'
+            ),
+        ),
+    ]
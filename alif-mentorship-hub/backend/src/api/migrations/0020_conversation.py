@@ -0,0 +1,76 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_conversations(apps, schema_editor):
+    """One row per (owner, partner) from the existing messages, both directions merged"""
+    Message = apps.get_model('api', 'Message')
+    Conversation = apps.get_model('api', 'Conversation')
+
+    rows = {}
+    directions = Message.objects.order_by().values('sender_id', 'recipient_id').annotate(
+        last_id=Max('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+    )
+    for direction in directions.iterator():
+        sender_id, recipient_id = direction['sender_id'], direction['recipient_id']
+        for owner_id, partner_id in ((sender_id, recipient_id), (recipient_id, sender_id)):
+            row = rows.setdefault((owner_id, partner_id), {'last_id': 0, 'unread': 0})
+            row['last_id'] = max(row['last_id'], direction['last_id'])
+        rows[(recipient_id, sender_id)]['unread'] += direction['unread']
+
+    created_at = dict(
+        Message.objects.filter(pk__in={row['last_id'] for row in rows.values()}).values_list('id', 'created_at')
+    )
+    Conversation.objects.bulk_create([
+        Conversation(
+            owner_id=owner_id,
+            partner_id=partner_id,
+            last_message_id=row['last_id'],
+            last_message_at=created_at[row['last_id']],
+            unread_count=row['unread'],
+        )
+        for (owner_id, partner_id), row in rows.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_message', models.ForeignKey(
+                    blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='+', to='api.message',
+                )),
+                ('owner', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='conversations', to=settings.AUTH_USER_MODEL,
+                )),
+                ('partner', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+', to=settings.AUTH_USER_MODEL,
+                )),
+            ],
+            options={
+                'ordering': ['-last_message_at', '-id'],
+                'constraints': [
+                    models.UniqueConstraint(fields=('owner', 'partner'), name='conversation_owner_partner_uniq'),
+                ],
+                'indexes': [
+                    models.Index(fields=['owner', '-last_message_at', '-id'], name='conversation_inbox_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,18 @@
+import time
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models.signals import post_save
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Round
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from .availability import BOOKED_STATUSES
+from .conditional import bump_content_versions, mentor_scopes
+from .unread import get_cached_unread_count, increment_unread_count, store_unread_count
 
 
 # ─────────────────────────────────────────────
@@ -73,6 +83,43 @@ class User(AbstractUser):
         
         self.save(update_fields=['no_show_count', 'reliability_score', 'restriction_until'])
 
+    @classmethod
+    def apply_no_show_penalties(cls, penalties):
+        """
+        Set-based ``apply_no_show_penalty``: ``penalties`` maps user id → number
+        of no-shows to record. One UPDATE per distinct count, with the score
+        and restriction computed in SQL from the pre-update counters.
+        Returns the number of users updated.
+        """
+        from django.utils import timezone
+        from datetime import timedelta
+        restriction_until = timezone.now() + timedelta(hours=48)
+
+        by_count = {}
+        for user_id, count in penalties.items():
+            by_count.setdefault(count, []).append(user_id)
+
+        updated = 0
+        for count, user_ids in by_count.items():
+            no_show_count = F('no_show_count') + count
+            # no_show_count is assigned last: MySQL evaluates SET clauses left
+            # to right, so earlier expressions must still see the old value
+            updated += cls.objects.filter(pk__in=user_ids).update(
+                reliability_score=Greatest(
+                    Value(0.0),
+                    Value(100.0) - F('cancellation_count') * 10 - no_show_count * 20,
+                    output_field=FloatField(),
+                ),
+                restriction_until=Case(
+                    When(no_show_count__gte=2 - count, then=Value(restriction_until)),
+                    default=F('restriction_until'),
+                ),
+                no_show_count=no_show_count,
+            )
+        # .update() sends no signals; reliability_score is public on mentor profiles
+        bump_mentor_versions(penalties)
+        return updated
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
@@ -100,8 +147,27 @@ class MentorProfile(models.Model):
     timezone         = models.CharField(max_length=50, default='Africa/Mogadishu')
     # Set to True by admin only — controls whether profile is visible to students
     is_verified      = models.BooleanField(default=False)
-    # Denormalised average — recalculated by signal every time a Review is saved
+    # `availability` compiled on save to 48 half-hour bits per UTC weekday
+    # (see api.availability); refreshed for DST by `rebuild_availability_bitmaps`
+    availability_bits_0 = models.BigIntegerField(default=0)
+    availability_bits_1 = models.BigIntegerField(default=0)
+    availability_bits_2 = models.BigIntegerField(default=0)
+    availability_bits_3 = models.BigIntegerField(default=0)
+    availability_bits_4 = models.BigIntegerField(default=0)
+    availability_bits_5 = models.BigIntegerField(default=0)
+    availability_bits_6 = models.BigIntegerField(default=0)
+    # UTC offset (minutes) the bitmap was compiled with
+    availability_utc_offset = models.SmallIntegerField(default=0)
+    # Denormalised rating aggregates — maintained incrementally by the Review
+    # signals below; rebuild with `manage.py rebuild_rating_aggregates`
     average_rating   = models.FloatField(default=0.0)
+    review_count     = models.PositiveIntegerField(default=0)
+    rating_sum       = models.PositiveIntegerField(default=0)
+    rating_1_count   = models.PositiveIntegerField(default=0)
+    rating_2_count   = models.PositiveIntegerField(default=0)
+    rating_3_count   = models.PositiveIntegerField(default=0)
+    rating_4_count   = models.PositiveIntegerField(default=0)
+    rating_5_count   = models.PositiveIntegerField(default=0)
     
     # Profile completeness tracking
     profile_completeness = models.IntegerField(default=0)
@@ -127,83 +193,84 @@ class MentorProfile(models.Model):
             score += 10
         return score
     
+    @property
+    def compiled_availability(self):
+        """Parsed availability windows, cached per (availability, timezone) version"""
+        from .availability import get_compiled_availability
+        return get_compiled_availability(self.availability, self.timezone)
+
     def get_available_slots(self, start_date, end_date):
         """Generate list of available time slots between start_date and end_date"""
-        from datetime import datetime, timedelta
-        import pytz
-        
         if not self.availability:
             return []
-        
-        slots = []
-        mentor_tz = pytz.timezone(self.timezone)
-        current_date = start_date.date()
-        end = end_date.date()
-        
-        while current_date <= end:
-            weekday = current_date.weekday()  # 0=Monday, 6=Sunday
-            
-            # Check if mentor has availability on this weekday
-            for slot in self.availability:
-                if slot.get('day') == weekday:
-                    # Parse start and end times
-                    start_time_str = slot.get('start_time', '09:00')
-                    end_time_str = slot.get('end_time', '17:00')
-                    
-                    # Create datetime objects in mentor's timezone
-                    start_hour, start_min = map(int, start_time_str.split(':'))
-                    end_hour, end_min = map(int, end_time_str.split(':'))
-                    
-                    slot_start = mentor_tz.localize(
-                        datetime.combine(current_date, datetime.min.time().replace(hour=start_hour, minute=start_min))
-                    )
-                    slot_end = mentor_tz.localize(
-                        datetime.combine(current_date, datetime.min.time().replace(hour=end_hour, minute=end_min))
-                    )
-                    
-                    # Only include future slots
-                    if slot_start > datetime.now(mentor_tz):
-                        slots.append({
-                            'start': slot_start.isoformat(),
-                            'end': slot_end.isoformat(),
-                            'day_name': current_date.strftime('%A'),
-                            'date': current_date.isoformat(),
-                        })
-            
-            current_date += timedelta(days=1)
-        
-        return slots
+        return self.compiled_availability.slots(start_date, end_date)
     
     def is_available_at(self, requested_datetime):
         """Check if mentor is available at a specific datetime"""
-        import pytz
-        
         if not self.availability:
             return False
-        
-        mentor_tz = pytz.timezone(self.timezone)
-        requested_time = requested_datetime.astimezone(mentor_tz)
-        weekday = requested_time.weekday()
-        requested_time_str = requested_time.strftime('%H:%M')
-        
-        for slot in self.availability:
-            if slot.get('day') == weekday:
-                start_time = slot.get('start_time', '09:00')
-                end_time = slot.get('end_time', '17:00')
-                
-                if start_time <= requested_time_str <= end_time:
-                    return True
-        
-        return False
+        return self.compiled_availability.is_available_at(requested_datetime)
     
+    @property
+    def rating_histogram(self):
+        """Review counts per star rating, e.g. {1: 0, 2: 1, 3: 0, 4: 3, 5: 7}"""
+        return {
+            rating: getattr(self, field)
+            for rating, field in RATING_HISTOGRAM_FIELDS.items()
+        }
+
+    def compile_availability_bitmap(self, at=None):
+        """Recompile the UTC weekly bitmap; returns True if anything changed"""
+        import pytz
+        from .availability import BITMAP_FIELDS, compile_weekly_bitmap, utc_offset_minutes
+
+        try:
+            offset = utc_offset_minutes(self.timezone, at)
+        except pytz.exceptions.UnknownTimeZoneError:
+            offset = 0
+        week = compile_weekly_bitmap(self.availability, offset)
+
+        changed = self.availability_utc_offset != offset
+        self.availability_utc_offset = offset
+        for field, mask in zip(BITMAP_FIELDS, week):
+            changed = changed or getattr(self, field) != mask
+            setattr(self, field, mask)
+        return changed
+
     def save(self, *args, **kwargs):
+        from .availability import BITMAP_FIELDS
+
         self.profile_completeness = self.calculate_completeness()
+        self.compile_availability_bitmap()
+        update_fields = kwargs.get('update_fields')
+        if update_fields and {'availability', 'timezone'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | set(BITMAP_FIELDS) | {'availability_utc_offset'}
+        # Rating aggregates are only ever written with F() updates by the Review
+        # signals; a full save must not write back a stale in-memory copy.
+        if not self._state.adding and not kwargs.get('update_fields') and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in RATING_AGGREGATE_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.get_full_name()} — {self.field_of_study} ({self.university})"
 
 
+RATING_HISTOGRAM_FIELDS = {
+    1: 'rating_1_count',
+    2: 'rating_2_count',
+    3: 'rating_3_count',
+    4: 'rating_4_count',
+    5: 'rating_5_count',
+}
+
+RATING_AGGREGATE_FIELDS = (
+    'average_rating', 'review_count', 'rating_sum',
+) + tuple(RATING_HISTOGRAM_FIELDS.values())
+
+
 # ─────────────────────────────────────────────
 # Session
 # ─────────────────────────────────────────────
@@ -236,9 +303,33 @@ class Session(models.Model):
     # Added by mentor after the session is completed
     mentor_notes   = models.TextField(blank=True, null=True)
     created_at     = models.DateTimeField(auto_now_add=True)
+    # Claimed by send_session_reminders before the emails go out
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+    # requested_time while the session holds its slot (pending/accepted), NULL
+    # otherwise; the unique constraint below makes double booking an INSERT error
+    active_slot    = models.GeneratedField(
+        expression=Case(
+            When(status__in=BOOKED_STATUSES, then=F('requested_time')),
+            default=Value(None),
+        ),
+        output_field=models.DateTimeField(null=True),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['mentor', 'active_slot'], name='session_active_slot_uniq'),
+        ]
+        indexes = [
+            # Keyset pagination of a participant's session list
+            models.Index(fields=['student', '-created_at', '-id'], name='session_student_created_idx'),
+            models.Index(fields=['mentor', '-created_at', '-id'], name='session_mentor_created_idx'),
+            # Booked-slot lookups for the availability endpoints
+            models.Index(fields=['mentor', 'requested_time', 'status'], name='session_mentor_time_idx'),
+            # Reminder dispatch: unsent accepted sessions by start time
+            models.Index(fields=['status', 'reminder_sent_at', 'requested_time'], name='session_reminder_due_idx'),
+        ]
 
     def __str__(self):
         return (
@@ -264,6 +355,11 @@ class Review(models.Model):
     comment    = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='review_created_idx'),
+        ]
+
     # NOTE: "student only" write rule is enforced in the serializer/view (Phase 2),
     # not here — the model stores data, business rules live in the API layer.
 
@@ -429,30 +525,102 @@ class Resource(models.Model):
 
 
 # ─────────────────────────────────────────────
-# Signal — recompute MentorProfile.average_rating
-# whenever a Review is created or updated
+# Signals — keep MentorProfile rating aggregates in step with
+# Review inserts, updates and deletes (O(1) per change)
 # ─────────────────────────────────────────────
+def apply_rating_delta(mentor_user_id, count_delta, histogram_delta):
+    """
+    Apply a review change to the mentor's aggregates in a single UPDATE.
+
+    histogram_delta maps star rating -> +1/-1. Everything is expressed with
+    F() so concurrent reviews never overwrite each other's counts.
+    """
+    sum_delta = sum(rating * delta for rating, delta in histogram_delta.items())
+    new_count = F('review_count') + count_delta
+    updates = {
+        # Listed first: MySQL evaluates SET assignments left to right, so the
+        # average must be computed before review_count/rating_sum change.
+        'average_rating': Case(
+            When(review_count__lte=-count_delta, then=Value(0.0)),
+            default=Round(
+                Cast(F('rating_sum') + sum_delta, FloatField()) / new_count,
+                2,
+            ),
+            output_field=FloatField(),
+        ),
+        'review_count': new_count,
+        'rating_sum': F('rating_sum') + sum_delta,
+    }
+    for rating, delta in histogram_delta.items():
+        field = RATING_HISTOGRAM_FIELDS.get(rating)
+        if field and delta:
+            updates[field] = F(field) + delta
+    MentorProfile.objects.filter(user_id=mentor_user_id).update(**updates)
+
+
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    instance._original_rating = instance.rating
+
+
 @receiver(post_save, sender=Review)
-def update_mentor_average_rating(sender, instance, **kwargs):
-    mentor_user = instance.session.mentor
-    try:
-        profile = mentor_user.mentor_profile
-    except MentorProfile.DoesNotExist:
-        return
+def update_mentor_rating_on_save(sender, instance, created, **kwargs):
+    original_rating = getattr(instance, '_original_rating', None)
+    if created:
+        apply_rating_delta(instance.session.mentor_id, 1, {instance.rating: 1})
+    elif original_rating is not None and original_rating != instance.rating:
+        apply_rating_delta(
+            instance.session.mentor_id, 0,
+            {original_rating: -1, instance.rating: 1},
+        )
+    instance._original_rating = instance.rating
 
-    reviews = Review.objects.filter(session__mentor=mentor_user)
-    count = reviews.count()
-    if count == 0:
-        profile.average_rating = 0.0
-    else:
-        total = sum(r.rating for r in reviews)
-        profile.average_rating = round(total / count, 2)
-    profile.save(update_fields=['average_rating'])
+
+@receiver(post_delete, sender=Review)
+def update_mentor_rating_on_delete(sender, instance, **kwargs):
+    rating = getattr(instance, '_original_rating', instance.rating)
+    apply_rating_delta(instance.session.mentor_id, -1, {rating: -1})
+
+
+# ─────────────────────────────────────────────
+# Signals — drop cached availability when a mentor's bookings or
+# recurring windows change
+# ─────────────────────────────────────────────
+@receiver(post_init, sender=Session)
+def remember_session_booking(sender, instance, **kwargs):
+    instance._original_booking = (instance.status, instance.requested_time)
+
+
+@receiver(post_save, sender=Session)
+def invalidate_availability_on_session_save(sender, instance, created, **kwargs):
+    from .availability import invalidate_mentor_availability
+
+    booking = (instance.status, instance.requested_time)
+    if created or booking != getattr(instance, '_original_booking', None):
+        invalidate_mentor_availability(instance.mentor_id)
+    instance._original_booking = booking
+
+
+@receiver(post_delete, sender=Session)
+def invalidate_availability_on_session_delete(sender, instance, **kwargs):
+    from .availability import invalidate_mentor_availability
+    invalidate_mentor_availability(instance.mentor_id)
+
+
+@receiver(post_save, sender=MentorProfile)
+def invalidate_availability_on_profile_save(sender, instance, **kwargs):
+    from .availability import invalidate_mentor_availability
+    invalidate_mentor_availability(instance.user_id)
 
 
 # ─────────────────────────────────────────────
 # Platform Settings — singleton
 # ─────────────────────────────────────────────
+PLATFORM_SETTINGS_VERSION_KEY = 'platform_settings:version'
+PLATFORM_SETTINGS_CHECK_INTERVAL = 1.0  # seconds between shared version checks
+PLATFORM_SETTINGS_MAX_AGE = 300  # seconds before a reload even without a bump
+
+
 class PlatformSettings(models.Model):
     platform_name    = models.CharField(max_length=200, default='Alif Mentorship')
     contact_email    = models.EmailField(blank=True, default='')
@@ -464,11 +632,49 @@ class PlatformSettings(models.Model):
     def __str__(self):
         return self.platform_name
 
+    # Process-local snapshot: (settings, version, checked_at, loaded_at)
+    _snapshot = None
+    _clock = staticmethod(time.monotonic)
+
     @classmethod
     def get_solo(cls):
         obj, _ = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def get_cached(cls):
+        """
+        ``get_solo()`` for the hot path. Each worker keeps its own copy and
+        compares it with the shared version key at most once per
+        PLATFORM_SETTINGS_CHECK_INTERVAL, reloading when ``bump_version`` has
+        moved it (or after PLATFORM_SETTINGS_MAX_AGE regardless). Treat the
+        result as read-only.
+        """
+        now = cls._clock()
+        snapshot = cls._snapshot
+        if snapshot and now - snapshot[2] < PLATFORM_SETTINGS_CHECK_INTERVAL:
+            return snapshot[0]
+
+        try:
+            version = cache.get(PLATFORM_SETTINGS_VERSION_KEY)
+        except Exception:
+            # Shared cache down: keep serving the snapshot until it ages out
+            version = snapshot[1] if snapshot else None
+        if snapshot and version == snapshot[1] and now - snapshot[3] < PLATFORM_SETTINGS_MAX_AGE:
+            cls._snapshot = (snapshot[0], version, now, snapshot[3])
+            return snapshot[0]
+
+        # Version read before the row, so a concurrent bump always forces another reload
+        obj = cls.get_solo()
+        cls._snapshot = (obj, version, now, now)
+        return obj
+
+    @classmethod
+    def bump_version(cls):
+        """Make every worker reload its snapshot on its next check"""
+        cls._snapshot = None
+        cache.set(PLATFORM_SETTINGS_VERSION_KEY, time.time_ns(), None)
+
 
 # ─────────────────────────────────────────────
 # Admin Notification Settings — per admin user
@@ -571,6 +777,113 @@ class Message(models.Model):
     def __str__(self):
         return f"Message from {self.sender.username} to {self.recipient.username}"
 
+    @classmethod
+    def unread_count_for(cls, user_id):
+        """Total unread messages addressed to a user, from the cached counter when present"""
+        count = get_cached_unread_count(user_id)
+        if count is None:
+            count = cls.count_unread(user_id)
+            store_unread_count(user_id, count)
+        return count
+
+    @classmethod
+    def count_unread(cls, user_id):
+        """Authoritative unread total, counted on the (is_read, recipient) index"""
+        return cls.objects.filter(is_read=False, recipient_id=user_id).count()
+
+
+# ─────────────────────────────────────────────
+# Conversation — one row per participant and partner, kept in step with
+# Message writes so the inbox is a single indexed query
+# ─────────────────────────────────────────────
+class Conversation(models.Model):
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='conversations',
+    )
+    partner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    last_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Messages from partner to owner not yet read by owner
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-last_message_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'partner'], name='conversation_owner_partner_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-last_message_at', '-id'], name='conversation_inbox_idx'),
+        ]
+
+    @classmethod
+    def record_message(cls, message):
+        """Move both participants' rows to ``message``; the recipient gains one unread"""
+        sides = (
+            (message.sender_id, message.recipient_id, 0),
+            (message.recipient_id, message.sender_id, 1),
+        )
+        for owner_id, partner_id, unread in sides:
+            # last_message is assigned before last_message_at: MySQL evaluates
+            # SET clauses left to right. A message that commits late never
+            # replaces a newer one.
+            is_newer = Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.created_at)
+            fields = {
+                'last_message': Case(
+                    When(is_newer, then=Value(message.pk)),
+                    default=F('last_message'),
+                    output_field=models.BigIntegerField(),
+                ),
+                'last_message_at': Case(When(is_newer, then=Value(message.created_at)), default=F('last_message_at')),
+                'unread_count': F('unread_count') + unread,
+            }
+            if cls.objects.filter(owner_id=owner_id, partner_id=partner_id).update(**fields):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        owner_id=owner_id, partner_id=partner_id, last_message=message,
+                        last_message_at=message.created_at, unread_count=unread,
+                    )
+            except IntegrityError:
+                # A concurrent first message created the row; apply ours on top
+                cls.objects.filter(owner_id=owner_id, partner_id=partner_id).update(**fields)
+
+    @classmethod
+    def mark_read(cls, owner_id, partner_id, count):
+        """Take ``count`` newly read messages off the owner's unread counter"""
+        if count:
+            # CASE rather than GREATEST(x - n, 0): the column is unsigned on MySQL
+            cls.objects.filter(owner_id=owner_id, partner_id=partner_id).update(
+                unread_count=Case(
+                    When(unread_count__gt=count, then=F('unread_count') - count),
+                    default=Value(0),
+                )
+            )
+
+    def __str__(self):
+        return f"Conversation of {self.owner_id} with {self.partner_id}"
+
+
+@receiver(post_save, sender=Message)
+def update_conversations_on_message(sender, instance, created, **kwargs):
+    if created:
+        Conversation.record_message(instance)
+        if not instance.is_read:
+            recipient_id = instance.recipient_id
+            transaction.on_commit(lambda: increment_unread_count(recipient_id))
+
 
 # ─────────────────────────────────────────────
 # Session Analytics
@@ -621,3 +934,126 @@ class SessionAnalytics(models.Model):
 
     def __str__(self):
         return f"Analytics for Session #{self.session_id}"
+
+
+# ─────────────────────────────────────────────
+# Email Outbox — written in the request transaction,
+# delivered by the send_queued_emails worker
+# ─────────────────────────────────────────────
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent',    'Sent'),
+        ('failed',  'Failed'),
+    ]
+
+    subject         = models.CharField(max_length=255)
+    body            = models.TextField()
+    from_email      = models.CharField(max_length=254)
+    recipients      = models.JSONField(default=list)
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error      = models.TextField(blank=True)
+    created_at      = models.DateTimeField(auto_now_add=True)
+    sent_at         = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Due-message scan of the sender
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    @classmethod
+    def queue_depth(cls):
+        """Messages still waiting to be delivered"""
+        return cls.objects.filter(status='pending').count()
+
+    def __str__(self):
+        return f"Email #{self.pk} to {', '.join(self.recipients)} | {self.status}"
+
+
+# ─────────────────────────────────────────────
+# Signals — bump the content versions behind the conditional-GET
+# ETags of the public read endpoints
+# ─────────────────────────────────────────────
+# User fields that appear in mentor, review or resource payloads, or decide
+# the per-user parts of them (role → is_favorited)
+PUBLIC_USER_FIELDS = frozenset({'username', 'first_name', 'last_name', 'reliability_score', 'role'})
+
+
+def mentor_profile_ids(user_ids):
+    return list(MentorProfile.objects.filter(user_id__in=list(user_ids)).values_list('pk', flat=True))
+
+
+def bump_mentor_versions(mentor_user_ids, reviews=False):
+    """
+    ``bump_content_versions`` for mentors known by user id. Their profile ids
+    are looked up after commit, keeping the query out of the write transaction.
+    """
+    mentor_user_ids = list(mentor_user_ids)
+
+    def bump():
+        profile_ids = mentor_profile_ids(mentor_user_ids)
+        if profile_ids:
+            review_scopes = [f'reviews:{profile_id}' for profile_id in profile_ids] if reviews else []
+            bump_content_versions(*mentor_scopes(profile_ids), *review_scopes)
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=MentorProfile)
+def bump_versions_on_profile_save(sender, instance, **kwargs):
+    bump_content_versions(*mentor_scopes([instance.pk]))
+
+
+@receiver(post_delete, sender=MentorProfile)
+def bump_versions_on_profile_delete(sender, instance, **kwargs):
+    bump_content_versions(*mentor_scopes([instance.pk]), f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def bump_versions_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    # New users appear nowhere public until they own a profile, review or resource
+    if created or (update_fields is not None and not PUBLIC_USER_FIELDS.intersection(update_fields)):
+        return
+    bump_content_versions(f'user:{instance.pk}')
+    if instance.role == 'mentor':
+        bump_mentor_versions([instance.pk])
+    if update_fields is None or 'username' in update_fields:
+        # Usernames are shown on the user's reviews and resources
+        user_id = instance.pk
+
+        def bump_authored():
+            reviewed = (
+                Review.objects
+                .filter(session__student_id=user_id, session__mentor__mentor_profile__isnull=False)
+                .values_list('session__mentor__mentor_profile__id', flat=True)
+                .distinct()
+            )
+            scopes = [f'reviews:{profile_id}' for profile_id in reviewed]
+            if Resource.objects.filter(author_id=user_id).exists():
+                scopes.append('resources')
+            bump_content_versions(*scopes)
+
+        transaction.on_commit(bump_authored)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_versions_on_review_change(sender, instance, **kwargs):
+    # Reviews also move the mentor's rating aggregates
+    bump_mentor_versions([instance.session.mentor_id], reviews=True)
+
+
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def bump_versions_on_resource_change(sender, instance, **kwargs):
+    bump_content_versions('resources')
+
+
+@receiver(post_save, sender=MentorFavorite)
+@receiver(post_delete, sender=MentorFavorite)
+def bump_versions_on_favorite_change(sender, instance, **kwargs):
+    bump_content_versions(f'user:{instance.student_id}')
@@ -0,0 +1,204 @@
+"""
+Pagination
+Page-number pagination by default, with an opt-in keyset (cursor) mode
+"""
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorValueEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder without the millisecond truncation of datetimes"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPageNumberPagination(PageNumberPagination):
+    """
+    Backward-compatible page-number pagination with an opt-in keyset mode.
+
+    Clients that send ``?cursor=`` (an empty value starts from the top) get
+    keyset pagination on the queryset's own ordering: each page is a single
+    indexed ``WHERE (a, b) < (x, y) ORDER BY a, b LIMIT n+1`` query with no
+    COUNT and no OFFSET, so page 1000 costs the same as page 1. Responses
+    carry opaque ``next``/``previous`` cursor links and no ``count``.
+
+    The queryset must be ordered on non-null fields; the primary key is
+    appended as a tie-breaker when the ordering does not already end in it.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            ordering = [self._flip(field) for field in self.ordering]
+        else:
+            ordering = self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Moving forwards, a previous page exists iff we came from a cursor;
+        # moving backwards, a next page always exists (the one we came from).
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.first_position = self._position(results[0]) if results else position
+        self.last_position = self._position(results[-1]) if results else position
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self._cursor_url(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._cursor_url(self.first_position, reverse=True)
+
+    # ─────────────────────────────────────────────
+    # Ordering and cursor encoding
+    # ─────────────────────────────────────────────
+    def get_ordering(self, queryset):
+        """Return the queryset's ordering as a total order (pk tie-breaker)"""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        for field in ordering:
+            if not isinstance(field, str) or field.lstrip('-') == '?':
+                raise ValueError(
+                    'Keyset pagination requires ordering on plain field names, '
+                    f'got {field!r}'
+                )
+
+        pk_name = queryset.model._meta.pk.name
+        if not ordering or ordering[-1].lstrip('-') not in ('pk', pk_name):
+            direction = '-' if ordering and ordering[-1].startswith('-') else ''
+            ordering.append(f'{direction}{pk_name}')
+        return ordering
+
+    def decode_cursor(self, request):
+        """Return (position, reverse) for the current request's cursor"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+            # A cursor is only valid for the ordering it was issued for
+            if payload['o'] != self.ordering or not isinstance(position, list) \
+                    or len(position) != len(self.ordering):
+                raise ValueError('Cursor does not match the ordering')
+            # Tampered values fail here instead of in the database
+            position = [
+                self._ordering_field(field).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+            if None in position:
+                raise ValueError('Cursor values cannot be null')
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _ordering_field(self, field):
+        """The field an ordering entry such as '-mentor__date_joined' or an annotation sorts on"""
+        path = field.lstrip('-')
+        if path in self.annotations:
+            return self.annotations[path].output_field
+        model, model_field = self.model, None
+        for name in path.split('__'):
+            if model_field is not None:
+                model = model_field.related_model
+            model_field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        return model_field
+
+    def encode_cursor(self, position, reverse):
+        payload = {'o': self.ordering, 'p': position}
+        if reverse:
+            payload['r'] = True
+        raw = json.dumps(payload, cls=CursorValueEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _cursor_url(self, position, reverse):
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def _position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = instance
+            for attr in field.lstrip('-').split('__'):
+                value = getattr(value, attr)
+            values.append(value)
+        # Round-trip through JSON so cursors compare like the stored values
+        return json.loads(json.dumps(values, cls=CursorValueEncoder))
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        """
+        Row-value comparison ``(a, b, c) > (x, y, z)`` expanded for mixed
+        directions: (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        return condition
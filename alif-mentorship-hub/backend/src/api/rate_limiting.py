@@ -0,0 +1,190 @@
+"""
+Rate Limiting
+GCRA (generic cell rate algorithm) limiter: one theoretical-arrival-time
+value per bucket and window, checked and advanced atomically for every
+window in a single round trip. Redis runs it as a Lua script; other cache
+backends hold the same values under a short ``cache.add`` lock, so every
+worker still shares one limit. Only while the cache itself errors does an
+in-process limiter with the same semantics take over.
+
+A limit of N requests per P seconds admits a burst of N, then one request
+every P / N seconds.
+"""
+import logging
+import math
+import threading
+import time
+
+from django.core.cache import caches
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:  # pragma: no cover - django-redis is optional in development
+    get_redis_connection = None
+
+
+logger = logging.getLogger('api.rate_limiting')
+
+KEY_PREFIX = 'rate_limit'
+
+# Waits shorter than this are float noise from summing period / limit steps
+TOLERANCE = 1e-6
+
+
+# KEYS: one TAT key per window. ARGV: (period, limit) pairs in the same order,
+# then the tolerance.
+# Uses the Redis clock so every app server agrees on "now". Returns the
+# seconds to wait as a string ("0" when allowed) so Lua does not truncate it.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tolerance = tonumber(ARGV[#ARGV])
+local retry_after = 0
+local new_tats = {}
+for i, key in ipairs(KEYS) do
+    local period = tonumber(ARGV[i * 2 - 1])
+    local limit = tonumber(ARGV[i * 2])
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then tat = now end
+    new_tats[i] = tat + period / limit
+    local wait = new_tats[i] - period - now
+    if wait > retry_after then retry_after = wait end
+end
+if retry_after > tolerance then
+    return tostring(retry_after)
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, tostring(new_tats[i]), 'PX', math.ceil((new_tats[i] - now) * 1000))
+end
+return '0'
+"""
+
+
+def gcra(tats, limits, now):
+    """
+    (retry_after, new_tats) for one request given each window's stored TAT
+    (None if unset): the same arithmetic as the Lua script
+    """
+    retry_after, new_tats = 0.0, []
+    for tat, (period, limit) in zip(tats, limits):
+        new_tat = max(tat if tat is not None else now, now) + period / limit
+        new_tats.append(new_tat)
+        retry_after = max(retry_after, new_tat - period - now)
+    return retry_after, new_tats
+
+
+class CacheRateLimiter:
+    """
+    GCRA on any Django cache backend. The TATs are read and written under a
+    lock taken with ``cache.add`` (atomic on every backend), so all workers
+    sharing the cache share the limit; the wall clock stands in for the
+    Redis clock.
+    """
+
+    LOCK_TIMEOUT = 2        # seconds a crashed worker can hold a bucket
+    LOCK_ATTEMPTS = 50
+    LOCK_WAIT = 0.001
+
+    def __init__(self, alias='default', clock=time.time):
+        self.alias = alias
+        self.clock = clock
+
+    def hit(self, keys, limits):
+        cache = caches[self.alias]
+        lock = f'{keys[0]}:lock'
+        locked = False
+        for _ in range(self.LOCK_ATTEMPTS):
+            locked = cache.add(lock, 1, self.LOCK_TIMEOUT)
+            if locked:
+                break
+            time.sleep(self.LOCK_WAIT)
+        # Past the wait the bucket is checked unlocked: at worst a request
+        # racing a stuck lock is admitted
+        try:
+            now = self.clock()
+            stored = cache.get_many(keys)
+            retry_after, new_tats = gcra([stored.get(key) for key in keys], limits, now)
+            if retry_after > TOLERANCE:
+                return retry_after
+            for key, tat in zip(keys, new_tats):
+                cache.set(key, tat, math.ceil(tat - now))
+            return 0.0
+        finally:
+            if locked:
+                cache.delete(lock)
+
+
+class LocalRateLimiter:
+    """In-process GCRA with the same semantics as the Lua script (per worker only)"""
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def hit(self, keys, limits):
+        with self._lock:
+            now = self.clock()
+            self._calls += 1
+            if self._calls % self.SWEEP_EVERY == 0:
+                self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+
+            retry_after, new_tats = gcra([self._tats.get(key) for key in keys], limits, now)
+            if retry_after > TOLERANCE:
+                return retry_after
+            self._tats.update(zip(keys, new_tats))
+            return 0.0
+
+    def reset(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class RateLimiter:
+    """Check-and-consume against every window of a bucket at once"""
+
+    def __init__(self, shared=None, local=None):
+        self.shared = shared or CacheRateLimiter()
+        self.local = local or LocalRateLimiter()
+        self._script = None
+
+    def _redis_script(self):
+        if get_redis_connection is None or not type(caches['default']).__module__.startswith('django_redis'):
+            return None
+        if self._script is None:
+            self._script = get_redis_connection('default').register_script(GCRA_SCRIPT)
+        return self._script
+
+    def hit(self, bucket, limits):
+        """
+        Record one request against ``bucket`` under ``limits`` ({period_seconds:
+        max_requests}). Returns 0 when allowed, otherwise the seconds until the
+        request would be; a denied request consumes nothing.
+        """
+        windows = sorted(limits.items())
+        keys = [f'{KEY_PREFIX}:{bucket}:{period}' for period, _ in windows]
+
+        try:
+            script = self._redis_script()
+            if script is None:
+                return self.shared.hit(keys, windows)
+            args = [value for window in windows for value in window] + [TOLERANCE]
+            return float(script(keys=keys, args=args))
+        except Exception as e:
+            logger.warning(f"Shared rate limiter unavailable, using local fallback: {e}")
+        return self.local.hit(keys, windows)
+
+    def reset(self):
+        """Forget the in-process fallback's state (the shared state lives in the cache)"""
+        self.local.reset()
+
+
+def retry_after_header(seconds):
+    """Whole seconds for the Retry-After header (never 0 for a denied request)"""
+    return str(max(1, math.ceil(seconds)))
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,72 @@
+"""
+Push messaging events to connected WebSocket clients.
+
+Each user's sockets join the group ``user_<id>`` (see ``api.consumers``).
+Events are published once the surrounding transaction commits, so a client
+never hears about a row that was rolled back. When no channel layer is
+configured, or the layer is unreachable, publishing is skipped and clients
+keep working off the REST endpoints.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .models import Message
+from .secure_logging import get_secure_logger
+
+logger = get_secure_logger('api')
+
+
+def user_group(user_id):
+    return f'user_{user_id}'
+
+
+def _send(user_ids, event):
+    # Push is best effort; the REST endpoints remain the source of truth
+    try:
+        layer = get_channel_layer()
+    except Exception as e:
+        logger.warning(f"Channel layer unavailable, skipping WebSocket push: {e}")
+        return
+    if layer is None:
+        return
+    for user_id in user_ids:
+        try:
+            async_to_sync(layer.group_send)(user_group(user_id), event)
+        except Exception as e:
+            logger.warning(f"WebSocket push to user {user_id} failed: {e}")
+
+
+def _unread_event(user_id):
+    return {'type': 'unread.count', 'unread_count': Message.unread_count_for(user_id)}
+
+
+def publish_message(message):
+    """New message: deliver it to both participants, then the recipient's unread count"""
+    from .serializers import MessageDetailSerializer
+
+    def send():
+        payload = dict(MessageDetailSerializer(message).data)
+        _send({message.sender_id, message.recipient_id}, {'type': 'chat.message', 'message': payload})
+        _send([message.recipient_id], _unread_event(message.recipient_id))
+
+    transaction.on_commit(send)
+
+
+def publish_read(reader_id, partner_id, read_at, message_ids=None, up_to_message_id=None):
+    """
+    Read receipt for the sender, and the reader's new unread count for their
+    other tabs. Receipts name the messages read, or, for a whole conversation,
+    everything up to ``up_to_message_id`` (all of it when that is None).
+    """
+    def send():
+        _send([partner_id], {
+            'type': 'chat.read',
+            'reader_id': reader_id,
+            'message_ids': list(message_ids) if message_ids is not None else None,
+            'up_to_message_id': up_to_message_id,
+            'read_at': read_at.isoformat(),
+        })
+        _send([reader_id], _unread_event(reader_id))
+
+    transaction.on_commit(send)
@@ -0,0 +1,109 @@
+"""
+Anonymous Response Cache
+Rendered anonymous GET responses of the public read endpoints, shared by
+every worker through the default cache. Entries are keyed by the normalised
+URL (scheme, host, path, sorted query string), API version and negotiated
+media type. Each entry remembers the versions of its tags — the conditional-GET
+content scopes ('mentors', 'mentor:<id>', 'reviews:<id>', 'resources') — so
+bumping a tag from a model signal makes every entry built on it stale.
+"""
+import hashlib
+import threading
+from collections import Counter
+from typing import Any, Dict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+HIT, MISS, STALE = 'hit', 'miss', 'stale'
+
+
+class ResponseCacheStats:
+    """Hit, miss and stale counters for this process, by view"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def record(self, view_name, outcome):
+        with self._lock:
+            self.counts[view_name, outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self.counts)
+        by_view = {}
+        for (view_name, outcome), count in counts.items():
+            by_view.setdefault(view_name, {HIT: 0, MISS: 0, STALE: 0})[outcome] = count
+        return by_view
+
+
+response_cache_stats = ResponseCacheStats()
+
+
+def response_cache_timeout() -> int:
+    """Seconds an entry lives even if none of its tags move; 0 disables the cache"""
+    return getattr(settings, 'ANONYMOUS_RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def response_cache_key(request) -> str:
+    """Same key for the same content however the query string is ordered"""
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    parts = (
+        request.scheme, request.get_host(), request.path, query,
+        getattr(request, 'api_version', ''), request.accepted_media_type,
+    )
+    digest = hashlib.blake2b('\0'.join(str(part) for part in parts).encode(), digest_size=16)
+    return f'anonymous_response:{digest.hexdigest()}'
+
+
+def get_cached_response(key, versions, view_name):
+    """
+    (response, outcome): the stored response if its tag versions are still
+    current, else None. No entry is a miss, an outdated one is stale.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        outcome = MISS
+    elif entry['versions'] != list(versions):
+        outcome = STALE
+    else:
+        outcome = HIT
+    response_cache_stats.record(view_name, outcome)
+    if outcome != HIT:
+        return None, outcome
+    return HttpResponse(entry['content'], content_type=entry['content_type']), outcome
+
+
+def store_response(key, versions, response):
+    """
+    Keep a successful response; its headers are rebuilt by the view on every
+    hit. The body is stored as text: the production cache serialises to JSON,
+    which has no bytes type.
+    """
+    if response.status_code != 200:
+        return
+    response.render()
+    cache.set(key, {
+        'versions': list(versions),
+        'content_type': response['Content-Type'],
+        'content': response.content.decode(response.charset),
+    }, response_cache_timeout())
+
+
+def response_cache_info() -> Dict[str, Any]:
+    """Counters and settings, for monitoring"""
+    by_view = response_cache_stats.snapshot()
+    totals = {outcome: sum(counts[outcome] for counts in by_view.values()) for outcome in (HIT, MISS, STALE)}
+    lookups = sum(totals.values())
+    return {
+        'enabled': response_cache_timeout() > 0,
+        'timeout': response_cache_timeout(),
+        'hits': totals[HIT],
+        'misses': totals[MISS],
+        'stale': totals[STALE],
+        'hit_rate': round(totals[HIT] / lookups, 4) if lookups else 0.0,
+        'by_view': by_view,
+    }
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import MessagingConsumer
+
+websocket_urlpatterns = [
+    path('ws/messages/', MessagingConsumer.as_asgi(), name='ws-messages'),
+]
@@ -4,11 +4,144 @@ Fixes CWE-117 (Log Injection) and CWE-532 (Sensitive Data Logging)
 """
 import re
 import json
+import atexit
+import copy
+import queue
+import random
 import logging
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict, Optional
 from django.conf import settings
 
 
+class RedactionEngine:
+    """
+    Applies injection filtering and sensitive-data redaction to log text.
+
+    Most patterns can only match where a fixed piece of text occurs
+    ("password", "bearer", "@", "</script>"), found once per pattern at
+    build time; a substring check rules them out far faster than a regex
+    scan. The few with no such text (CRLF, control characters, card
+    numbers) are compiled into one alternation, so ruling them all out is
+    a single scan. Patterns that may match are applied in the original
+    order, which keeps the output identical to running every pattern.
+    Short messages found clean are remembered, so repeated values such as
+    user agents and paths are not rescanned; dirty ones are never stored,
+    which keeps secrets out of the cache.
+    """
+
+    CLEAN_CACHE_SIZE = 4096
+    CACHEABLE_LENGTH = 512
+
+    def __init__(self, injection_patterns, sensitive_patterns, max_length: int):
+        self.max_length = max_length
+        replacements = [(pattern, '[FILTERED]') for pattern in injection_patterns] + [
+            (pattern, f'[{data_type.upper()}_REDACTED]') for pattern, data_type in sensitive_patterns
+        ]
+        self.substitutions = []
+        unkeyed = []
+        for pattern, replacement in replacements:
+            literal = self._required_literal(pattern.pattern)
+            ignore_case = bool(pattern.flags & re.IGNORECASE)
+            if ignore_case:
+                literal = literal.lower()
+            if not literal:
+                unkeyed.append(f'(?:{self._scoped(pattern)})')
+            self.substitutions.append((pattern, replacement, literal, ignore_case))
+        self.unkeyed = re.compile('|'.join(unkeyed) or '(?!)')
+        self._clean = {}
+
+    @staticmethod
+    def _scoped(pattern):
+        """The pattern's source with its flags applied inline, so it can join an alternation"""
+        flags = ''.join(letter for flag, letter in (
+            (re.IGNORECASE, 'i'), (re.DOTALL, 's'), (re.MULTILINE, 'm'),
+        ) if pattern.flags & flag)
+        return f'(?{flags}:{pattern.pattern})' if flags else pattern.pattern
+
+    @staticmethod
+    def _required_literal(source: str) -> str:
+        """
+        The longest run of plain characters every match of ``source`` must
+        contain, or '' if none can be proven. Conservative: escapes, classes,
+        groups and quantified characters all end a run.
+        """
+        runs, run, depth, i = [], '', 0, 0
+        while i < len(source):
+            char = source[i]
+            if char == '|' and depth == 0:
+                return ''
+            if char in '?*+{':
+                # The previous character is optional or repeated
+                run = run[:-1]
+                if char == '{':
+                    i = source.index('}', i)
+                char = None
+            elif char == '\\':
+                i += 1
+                char = None
+            elif char == '[':
+                i += 1
+                while source[i] != ']':
+                    i += 2 if source[i] == '\\' else 1
+                char = None
+            elif char in '()':
+                depth += 1 if char == '(' else -1
+                char = None
+            elif char in '.^$' or depth:
+                char = None
+
+            if char is None:
+                runs.append(run)
+                run = ''
+            else:
+                run += char
+            i += 1
+        runs.append(run)
+        return max(runs, key=len)
+
+    @staticmethod
+    def _lowered(message):
+        """
+        The message for case-insensitive literal checks, or None to run those
+        patterns unchecked. Only ASCII text is checked: IGNORECASE also lets
+        'ſ' and 'ı' match 's' and 'i', which no case mapping of the text reproduces.
+        """
+        return message.lower() if message.isascii() else None
+
+    def sanitize(self, message: str) -> str:
+        cacheable = len(message) <= self.CACHEABLE_LENGTH
+        if cacheable and message in self._clean:
+            return message
+
+        unkeyed = self.unkeyed.search(message) is not None
+        lowered = self._lowered(message)
+        changed = False
+        for pattern, replacement, literal, ignore_case in self.substitutions:
+            if literal:
+                haystack = lowered if ignore_case else message
+                if haystack is not None and literal not in haystack:
+                    continue
+            elif not (unkeyed or changed):
+                continue
+            message, count = pattern.subn(replacement, message)
+            if count:
+                changed = True
+                lowered = self._lowered(message)
+
+        if cacheable and not changed:
+            if len(self._clean) >= self.CLEAN_CACHE_SIZE:
+                self._clean = {}
+            self._clean[message] = True
+
+        # Limit length
+        if len(message) > self.max_length:
+            message = message[:self.max_length] + '... [TRUNCATED]'
+        return message
+
+
 class SecureLogFormatter(logging.Formatter):
     """Secure log formatter that prevents injection and sanitizes sensitive data"""
     
@@ -37,6 +170,7 @@ class SecureLogFormatter(logging.Formatter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.max_length = getattr(settings, 'LOG_MESSAGE_MAX_LENGTH', 10000)
+        self.redactor = get_redaction_engine(self.max_length)
     
     def format(self, record):
         """Format log record with security sanitization"""
@@ -69,11 +203,18 @@ class SecureLogFormatter(logging.Formatter):
         if hasattr(record, 'user_agent'):
             log_entry['user_agent'] = self.sanitize_message(record.user_agent)
         
-        # Add exception info if present
+        # Add exception info if present (queued records carry it pre-rendered)
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry['exception'] = record.exc_text
         
-        # Truncate if too long
+        # Truncate if too long. The other fields alone serialise to more than
+        # 100 characters, so a message this long always overflows: truncate it
+        # up front instead of serialising twice
+        if len(log_entry['message']) > self.max_length - 100:
+            log_entry['message'] = log_entry['message'][:self.max_length - 100] + '... [TRUNCATED]'
+            return json.dumps(log_entry, default=str, ensure_ascii=False)
         message = json.dumps(log_entry, default=str, ensure_ascii=False)
         if len(message) > self.max_length:
             log_entry['message'] = log_entry['message'][:self.max_length - 100] + '... [TRUNCATED]'
@@ -85,20 +226,20 @@ class SecureLogFormatter(logging.Formatter):
         """Sanitize log message to prevent injection and hide sensitive data"""
         if not isinstance(message, str):
             message = str(message)
-        
-        # Remove log injection patterns
-        for pattern in self.INJECTION_PATTERNS:
-            message = pattern.sub('[FILTERED]', message)
-        
-        # Hide sensitive data
-        for pattern, data_type in self.SENSITIVE_PATTERNS:
-            message = pattern.sub(f'[{data_type.upper()}_REDACTED]', message)
-        
-        # Limit length
-        if len(message) > self.max_length:
-            message = message[:self.max_length] + '... [TRUNCATED]'
-        
-        return message
+        return self.redactor.sanitize(message)
+
+
+_redaction_engines = {}
+
+
+def get_redaction_engine(max_length: int) -> RedactionEngine:
+    """One shared engine (and clean-message cache) per max length"""
+    engine = _redaction_engines.get(max_length)
+    if engine is None:
+        engine = _redaction_engines[max_length] = RedactionEngine(
+            SecureLogFormatter.INJECTION_PATTERNS, SecureLogFormatter.SENSITIVE_PATTERNS, max_length
+        )
+    return engine
 
 
 class SecurityAuditLogger:
@@ -176,11 +317,29 @@ class SecurityAuditLogger:
 class APILogger:
     """Structured API request/response logger"""
     
-    def __init__(self):
-        self.logger = logging.getLogger('api.requests')
+    def __init__(self, logger_name: str = 'api.requests', get_sample_rate: Optional[float] = None):
+        self.logger = logging.getLogger(logger_name)
+        self._get_sample_rate = get_sample_rate
+    
+    @property
+    def get_sample_rate(self) -> float:
+        """Share of successful GETs that are logged (API_LOG_GET_SAMPLE_RATE, default all)"""
+        if self._get_sample_rate is not None:
+            return self._get_sample_rate
+        return getattr(settings, 'API_LOG_GET_SAMPLE_RATE', 1.0)
     
     def log_request(self, request, response_status: int, response_time: float):
         """Log API request with sanitized data"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
+        # Sample routine traffic before doing any work; errors and writes are always kept
+        sample_rate = 1.0
+        if request.method == 'GET' and response_status < 400:
+            sample_rate = self.get_sample_rate
+            if sample_rate < 1.0 and random.random() >= sample_rate:
+                return
+        
         # Sanitize headers
         safe_headers = {}
         for key, value in request.META.items():
@@ -210,6 +369,7 @@ class APILogger:
                 'ip_address': self.get_client_ip(request),
                 'response_status': response_status,
                 'response_time_ms': round(response_time * 1000, 2),
+                'sample_rate': sample_rate,
             }
         )
     
@@ -223,6 +383,127 @@ class APILogger:
         return ip
 
 
+# ─────────────────────────────────────────────
+# Queued logging — formatting and file I/O on a background thread
+# ─────────────────────────────────────────────
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hands records to the shared log queue for the handlers it replaced.
+    The queue is bounded: when it is full the record is dropped and
+    counted, so a slow disk never stalls a request. ERROR and above wait
+    briefly for room before giving up.
+    """
+
+    ERROR_PUT_TIMEOUT = 0.1  # seconds
+
+    def __init__(self, log_queue, targets, stats):
+        super().__init__(log_queue)
+        self.targets = tuple(targets)
+        self.stats = stats
+
+    def prepare(self, record):
+        # Only make the record safe to hand over: the listener thread formats it
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks pin frames; render them now (rare, and only on errors)
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.log_targets = self.targets
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.ERROR:
+                self.queue.put(record, timeout=self.ERROR_PUT_TIMEOUT)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.stats.record_drop(record)
+
+
+class _TargetedQueueListener(QueueListener):
+    """Sends each record only to the handlers of the logger that queued it"""
+
+    def handle(self, record):
+        for handler in record.log_targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class LogQueueStats:
+    """Drop counters for the log queue, by logger name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.dropped = Counter()
+
+    def record_drop(self, record):
+        with self._lock:
+            self.dropped[record.name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.dropped)
+
+
+_log_queue = None
+_log_listener = None
+log_queue_stats = LogQueueStats()
+
+
+def enable_queued_logging(max_size: int = 10000):
+    """
+    Swap the handlers of every configured logger for a DroppingQueueHandler
+    and start one listener thread that runs the original handlers. Call once
+    after logging is configured (ApiConfig.ready); later calls are no-ops.
+    """
+    global _log_queue, _log_listener
+    if _log_listener is not None:
+        return
+
+    _log_queue = queue.Queue(maxsize=max_size)
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        if logger.handlers:
+            logger.handlers = [DroppingQueueHandler(_log_queue, logger.handlers, log_queue_stats)]
+
+    _log_listener = _TargetedQueueListener(_log_queue, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(disable_queued_logging)
+
+
+def disable_queued_logging():
+    """Flush the queue and restore the original handlers"""
+    global _log_queue, _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    for logger in [logging.getLogger()] + list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger):
+            restored = []
+            for handler in logger.handlers:
+                restored.extend(handler.targets if isinstance(handler, DroppingQueueHandler) else [handler])
+            logger.handlers = restored
+    _log_queue = _log_listener = None
+
+
+def queued_logging_stats() -> Dict[str, Any]:
+    """Queue depth and drop counters, for monitoring"""
+    dropped = log_queue_stats.snapshot()
+    return {
+        'enabled': _log_listener is not None,
+        'depth': _log_queue.qsize() if _log_queue is not None else 0,
+        'max_size': _log_queue.maxsize if _log_queue is not None else 0,
+        'dropped': sum(dropped.values()),
+        'dropped_by_logger': dropped,
+    }
+
+
 # Global instances
 security_logger = SecurityAuditLogger()
 api_logger = APILogger()
@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from django.db import IntegrityError, transaction
 from django.contrib.auth.password_validation import validate_password
-from .models import User, MentorProfile, Session, Review, StudentFeedback, Resource, Report, AuditLog, PlatformSettings, AdminNotificationSettings, MentorFavorite, SavedSearch, Message, SessionAnalytics
+from .error_handling import ResourceConflictError
+from .models import User, MentorProfile, Session, Review, StudentFeedback, Resource, Report, AuditLog, PlatformSettings, AdminNotificationSettings, MentorFavorite, SavedSearch, Message, SessionAnalytics, Conversation
 
 
 # ─────────────────────────────────────────────
@@ -81,14 +83,29 @@ class AdminMeSerializer(serializers.ModelSerializer):
 # ─────────────────────────────────────────────
 # Mentor Profile
 # ─────────────────────────────────────────────
+class MentorProfileListSerializer(serializers.ListSerializer):
+    """Resolves favorite status for a whole page with one query"""
+
+    def to_representation(self, data):
+        from .database_optimization import QueryOptimizer
+
+        profiles = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        self.child.context['favorited_mentor_ids'] = QueryOptimizer.get_favorited_mentor_ids(
+            user, (p.user_id for p in profiles)
+        )
+        return super().to_representation(profiles)
+
+
 class MentorProfileSerializer(serializers.ModelSerializer):
     user_id      = serializers.IntegerField(source='user.id', read_only=True)
     username     = serializers.CharField(source='user.username', read_only=True)
     first_name   = serializers.CharField(source='user.first_name', read_only=True)
     last_name    = serializers.CharField(source='user.last_name', read_only=True)
-    review_count = serializers.SerializerMethodField()
     reliability_score = serializers.FloatField(source='user.reliability_score', read_only=True)
     is_favorited = serializers.SerializerMethodField()
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model  = MentorProfile
@@ -96,16 +113,17 @@ class MentorProfileSerializer(serializers.ModelSerializer):
             'id', 'user_id', 'username', 'first_name', 'last_name',
             'university', 'graduation_year', 'field_of_study',
             'bio', 'linkedin_url', 'availability', 'timezone',
-            'is_verified', 'average_rating', 'review_count', 'reliability_score', 'is_favorited',
+            'is_verified', 'average_rating', 'review_count', 'rating_histogram', 'reliability_score', 'is_favorited',
             'profile_completeness', 'years_of_experience', 'languages',
         )
         read_only_fields = ('id', 'user_id', 'username', 'first_name', 'last_name',
-                            'is_verified', 'average_rating', 'review_count', 'profile_completeness', 'reliability_score', 'is_favorited')
+                            'is_verified', 'average_rating', 'review_count', 'rating_histogram', 'profile_completeness', 'reliability_score', 'is_favorited')
+        list_serializer_class = MentorProfileListSerializer
 
-    def get_review_count(self, obj):
-        return Review.objects.filter(session__mentor=obj.user).count()
-    
     def get_is_favorited(self, obj):
+        favorited_ids = self.context.get('favorited_mentor_ids')
+        if favorited_ids is not None:
+            return obj.user_id in favorited_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated and request.user.role == 'student':
             return MentorFavorite.objects.filter(student=request.user, mentor=obj.user).exists()
@@ -160,6 +178,16 @@ class MentorProfileUpdateSerializer(serializers.ModelSerializer):
 # ─────────────────────────────────────────────
 # Session
 # ─────────────────────────────────────────────
+# MySQL and PostgreSQL name the violated constraint; SQLite lists its columns
+SLOT_CLASH_MARKERS = ('session_active_slot_uniq', 'api_session.mentor_id, api_session.active_slot')
+
+
+def _is_slot_clash(error):
+    """Whether an IntegrityError is the (mentor, active_slot) unique constraint"""
+    messages = [str(arg) for exc in (error, error.__cause__) if exc is not None for arg in exc.args]
+    return any(marker in message for message in messages for marker in SLOT_CLASH_MARKERS)
+
+
 class SessionSerializer(serializers.ModelSerializer):
     student_username = serializers.CharField(source='student.username', read_only=True)
     mentor_username  = serializers.CharField(source='mentor.username', read_only=True)
@@ -213,19 +241,6 @@ class SessionSerializer(serializers.ModelSerializer):
                             f"Please check their availability calendar and choose an available slot."
                         )
                     })
-                
-                # Check if slot is already booked
-                existing_session = Session.objects.filter(
-                    mentor=mentor_user,
-                    requested_time=requested_time,
-                    status__in=['pending', 'accepted']
-                ).exists()
-                
-                if existing_session:
-                    raise serializers.ValidationError({
-                        'requested_time': 'This time slot is already booked. Please choose another time.'
-                    })
-                
             except (User.DoesNotExist, MentorProfile.DoesNotExist):
                 pass  # Already validated in validate_mentor_id
         
@@ -233,8 +248,19 @@ class SessionSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         mentor_id = validated_data.pop('mentor_id')
-        mentor    = User.objects.get(pk=mentor_id)
-        return Session.objects.create(mentor=mentor, **validated_data)
+        # Double booking is caught by the (mentor, active_slot) unique
+        # constraint; the savepoint keeps the request transaction usable
+        # after a clash
+        try:
+            with transaction.atomic():
+                return Session.objects.create(mentor_id=mentor_id, **validated_data)
+        except IntegrityError as e:
+            if not _is_slot_clash(e):
+                raise
+            raise ResourceConflictError(
+                'This time slot is already booked. Please choose another time.',
+                resource_type='session',
+            )
 
 
 class SessionDetailSerializer(serializers.ModelSerializer):
@@ -529,13 +555,17 @@ class MessageDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'sender_id', 'sender_username', 'recipient_id', 'recipient_username', 'is_read', 'read_at', 'created_at')
 
 
-class ConversationSerializer(serializers.Serializer):
-    """Serializer for conversation list (unique users)"""
-    user_id = serializers.IntegerField()
-    username = serializers.CharField()
-    unread_count = serializers.IntegerField()
-    last_message = serializers.CharField()
-    last_message_time = serializers.DateTimeField()
+class ConversationSerializer(serializers.ModelSerializer):
+    """Serializer for conversation list (one row per partner)"""
+    user_id = serializers.IntegerField(source='partner_id', read_only=True)
+    username = serializers.CharField(source='partner.username', read_only=True)
+    last_message = serializers.CharField(source='last_message.content', default='', read_only=True)
+    last_message_time = serializers.DateTimeField(source='last_message_at', read_only=True)
+
+    class Meta:
+        model = Conversation
+        fields = ('user_id', 'username', 'unread_count', 'last_message', 'last_message_time')
+        read_only_fields = fields
 
 
 # ─────────────────────────────────────────────
@@ -0,0 +1,81 @@
+"""
+Session State Machine
+Every status change is a single conditional UPDATE (compare-and-set on the
+current status), so two actors racing on the same session cannot both win
+"""
+from django.db import transaction
+
+from .availability import invalidate_mentor_availability
+
+
+VALID_TRANSITIONS = {
+    'pending':   ['accepted', 'declined', 'cancelled'],
+    'accepted':  ['completed', 'cancelled'],
+    'declined':  [],
+    'completed': [],
+    'cancelled': [],
+}
+
+MAX_BULK_TRANSITION = 100
+
+
+def allowed_sources(target, from_statuses=None):
+    """Statuses that may move to ``target``, optionally narrowed to ``from_statuses``"""
+    sources = [source for source, targets in VALID_TRANSITIONS.items() if target in targets]
+    if from_statuses is not None:
+        sources = [source for source in sources if source in from_statuses]
+    return sources
+
+
+def apply_transition(queryset, target, from_statuses=None, **fields):
+    """
+    ``UPDATE ... SET status = target WHERE <queryset> AND status IN (allowed)``.
+    Returns the number of rows that changed. Bypasses model signals, so
+    callers own any follow-up such as availability invalidation.
+    """
+    sources = allowed_sources(target, from_statuses)
+    if not sources:
+        return 0
+    return queryset.filter(status__in=sources).update(status=target, **fields)
+
+
+def transition_session(queryset, pk, target, from_statuses=None, **fields):
+    """
+    Move one session to ``target``. Returns ``(session, changed)``:
+    ``session`` is None when it is not in ``queryset``; ``changed`` is False
+    when its current status does not allow the move (or another request won).
+    """
+    changed = apply_transition(queryset.filter(pk=pk), target, from_statuses, **fields)
+    session = queryset.select_related('student', 'mentor').filter(pk=pk).first()
+    if changed and session is not None:
+        invalidate_mentor_availability(session.mentor_id)
+    return session, bool(changed)
+
+
+def transition_sessions(queryset, pks, target, **fields):
+    """
+    Move many sessions to ``target`` in one transaction and return the
+    sessions that changed. Ineligible or unknown ids are left untouched.
+    """
+    sources = allowed_sources(target)
+    with transaction.atomic():
+        # Lock the candidates first: without it, a single-session transition
+        # committing between this SELECT and the UPDATE would leave its row
+        # at ``target`` and be reported (and notified) as moved by this call
+        candidates = list(
+            queryset.select_for_update()
+            .filter(pk__in=pks, status__in=sources)
+            .values_list('pk', flat=True)
+        )
+        if not candidates:
+            return []
+        apply_transition(queryset.filter(pk__in=candidates), target, **fields)
+        sessions = list(
+            queryset.select_related('student', 'mentor')
+            .filter(pk__in=candidates, status=target)
+            .order_by('pk')
+        )
+
+    for mentor_id in {session.mentor_id for session in sessions}:
+        invalidate_mentor_availability(mentor_id)
+    return sessions
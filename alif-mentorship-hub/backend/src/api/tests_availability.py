@@ -0,0 +1,253 @@
+"""
+Availability Test Suite
+Compiled availability engine: slot expansion, DST handling and lookups
+"""
+from datetime import datetime, timedelta
+
+import pytz
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.availability import OffsetTimeline, get_compiled_availability
+from api.models import User, MentorProfile, Session
+
+
+def reference_slots(availability, tz_name, start_date, end_date):
+    """Slot expansion with one pytz localize per bound, as the model used to do"""
+    tz = pytz.timezone(tz_name)
+    slots, day = [], start_date.date()
+    while day <= end_date.date():
+        for slot in sorted(availability, key=lambda s: (s['day'], s['start_time'], s['end_time'])):
+            if slot['day'] == day.weekday():
+                start = tz.localize(datetime.combine(day, datetime.strptime(slot['start_time'], '%H:%M').time()))
+                end = tz.localize(datetime.combine(day, datetime.strptime(slot['end_time'], '%H:%M').time()))
+                slots.append({
+                    'start': start.isoformat(),
+                    'end': end.isoformat(),
+                    'day_name': day.strftime('%A'),
+                    'date': day.isoformat(),
+                })
+        day += timedelta(days=1)
+    return slots
+
+
+class CompiledAvailabilityTest(SimpleTestCase):
+    """The compiled engine must agree with pytz on every slot, DST edges included"""
+
+    availability = [
+        {'day': day, 'start_time': start, 'end_time': end}
+        for day in range(7)
+        for start, end in (('00:30', '02:30'), ('01:00', '03:00'), ('09:00', '17:00'))
+    ]
+
+    def test_matches_pytz_across_dst_transitions(self):
+        """90-day ranges spanning spring-forward and fall-back in both hemispheres"""
+        past = datetime(2000, 1, 1, tzinfo=pytz.UTC)
+        for tz_name in ('America/New_York', 'Europe/London', 'Australia/Sydney', 'Africa/Mogadishu', 'UTC'):
+            for start in (datetime(2030, 2, 20, tzinfo=pytz.UTC), datetime(2030, 9, 20, tzinfo=pytz.UTC)):
+                end = start + timedelta(days=90)
+                with self.subTest(tz=tz_name, start=start.date()):
+                    compiled = get_compiled_availability(self.availability, tz_name).slots(start, end, now=past)
+                    self.assertEqual(compiled, reference_slots(self.availability, tz_name, start, end))
+
+    def test_ambiguous_and_skipped_times_resolve_like_localize(self):
+        """Wall times in the fall-back overlap and spring-forward gap use standard time"""
+        tz = pytz.timezone('America/New_York')
+        timeline = OffsetTimeline(tz, datetime(2030, 3, 1).date(), datetime(2030, 11, 30).date())
+        for naive in (datetime(2030, 3, 10, 2, 30), datetime(2030, 11, 3, 1, 30), datetime(2030, 7, 1, 12, 0)):
+            with self.subTest(naive=naive):
+                self.assertEqual(
+                    timeline.localize(naive).isoformat(),
+                    tz.localize(naive, is_dst=False).isoformat()
+                )
+
+    def test_only_future_slots(self):
+        """Slots starting at or before now are skipped"""
+        compiled = get_compiled_availability([{'day': 0, 'start_time': '09:00', 'end_time': '10:00'}], 'UTC')
+        monday = datetime(2030, 1, 7, tzinfo=pytz.UTC)
+        self.assertEqual(len(compiled.slots(monday, monday, now=monday + timedelta(hours=8))), 1)
+        self.assertEqual(compiled.slots(monday, monday, now=monday + timedelta(hours=9)), [])
+
+    def test_is_available_at(self):
+        """Bounds are inclusive and evaluated in the mentor's timezone"""
+        profile = MentorProfile(
+            availability=[{'day': 0, 'start_time': '09:00', 'end_time': '17:00'}],
+            timezone='America/New_York'
+        )
+        tz = pytz.timezone('America/New_York')
+        self.assertTrue(profile.is_available_at(tz.localize(datetime(2030, 7, 1, 9, 0))))
+        self.assertTrue(profile.is_available_at(tz.localize(datetime(2030, 7, 1, 17, 0))))
+        self.assertFalse(profile.is_available_at(tz.localize(datetime(2030, 7, 1, 17, 1))))
+        # 13:30 UTC on a Monday is 09:30 in New York during summer time only
+        self.assertTrue(profile.is_available_at(datetime(2030, 7, 1, 13, 30, tzinfo=pytz.UTC)))
+        self.assertFalse(profile.is_available_at(datetime(2030, 1, 7, 13, 30, tzinfo=pytz.UTC)))
+
+    def test_compiled_form_is_cached_per_version(self):
+        """Identical availability reuses one compiled object; edits compile afresh"""
+        profile = MentorProfile(availability=[{'day': 1, 'start_time': '10:00', 'end_time': '11:00'}], timezone='UTC')
+        first = profile.compiled_availability
+        self.assertIs(profile.compiled_availability, first)
+
+        profile.availability = profile.availability + [{'day': 2, 'start_time': '10:00', 'end_time': '11:00'}]
+        self.assertIsNot(profile.compiled_availability, first)
+
+
+class MentorFreeSlotsTest(APITestCase):
+    """MentorAvailabilityView returns bookable fixed-length slots only"""
+
+    # 2030-01-07 is a Monday
+    monday = datetime(2030, 1, 7, tzinfo=pytz.UTC)
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(username='student', password='testpass123', role='student')
+        self.mentor = User.objects.create_user(username='mentor', password='testpass123', role='mentor')
+        self.profile = MentorProfile.objects.create(
+            user=self.mentor,
+            university='Test University',
+            graduation_year=2020,
+            field_of_study='Computer Science',
+            is_verified=True,
+            timezone='UTC',
+            availability=[{'day': 0, 'start_time': '09:00', 'end_time': '12:00'}]
+        )
+        self.url = reverse('mentor-availability', kwargs={'pk': self.profile.pk})
+
+    def book(self, hour, minute=0, status_='pending'):
+        return Session.objects.create(
+            student=self.student,
+            mentor=self.mentor,
+            status=status_,
+            requested_time=self.monday.replace(hour=hour, minute=minute),
+            goal='Career advice'
+        )
+
+    def starts(self, **params):
+        params.setdefault('start_date', self.monday.isoformat())
+        params.setdefault('end_date', self.monday.isoformat())
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [slot['start'][11:16] for slot in response.data['available_slots']]
+
+    def test_fixed_granularity(self):
+        """The window is cut into slots of the requested length"""
+        self.assertEqual(self.starts(slot_minutes=60), ['09:00', '10:00', '11:00'])
+        self.assertEqual(len(self.starts(slot_minutes=30)), 6)
+        self.assertEqual(self.starts(slot_minutes=120), ['09:00'])
+
+    def test_booked_sessions_are_subtracted(self):
+        """Pending/accepted bookings block one session length; declined ones do not"""
+        self.book(10, 15)
+        self.book(9, 0, status_='declined')
+        # 10:15-11:15 is busy: 10:00 and 10:30 overlap it, 11:30 is the next free grid point
+        self.assertEqual(self.starts(slot_minutes=30), ['09:00', '09:30', '11:30'])
+
+    def test_cached_until_bookings_change(self):
+        """Repeat requests hit the cache; creating or declining a session invalidates it"""
+        with self.assertNumQueries(2):
+            self.assertEqual(self.starts(), ['09:00', '10:00', '11:00'])
+        with self.assertNumQueries(1):
+            self.starts()
+
+        session = self.book(10)
+        self.assertEqual(self.starts(), ['09:00', '11:00'])
+
+        session.status = 'declined'
+        session.save(update_fields=['status'])
+        self.assertEqual(self.starts(), ['09:00', '10:00', '11:00'])
+
+    def test_profile_change_invalidates(self):
+        """Editing the recurring windows is reflected immediately"""
+        self.starts()
+        self.profile.availability = [{'day': 0, 'start_time': '14:00', 'end_time': '15:00'}]
+        self.profile.save()
+        self.assertEqual(self.starts(), ['14:00'])
+
+    def test_invalid_parameters(self):
+        """Unsupported slot lengths and oversized ranges are rejected"""
+        response = self.client.get(self.url, {'slot_minutes': 7})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {
+            'start_date': self.monday.isoformat(),
+            'end_date': (self.monday + timedelta(days=120)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MentorAvailabilityBatchTest(APITestCase):
+    """POST /mentors/availability/batch/ returns many mentors' free slots at once"""
+
+    monday = datetime(2030, 1, 7, tzinfo=pytz.UTC)
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(username='student', password='testpass123', role='student')
+        self.profiles = []
+        for i, tz_name in enumerate(('UTC', 'Africa/Mogadishu', 'America/New_York')):
+            mentor = User.objects.create_user(username=f'mentor{i}', password='testpass123', role='mentor')
+            self.profiles.append(MentorProfile.objects.create(
+                user=mentor,
+                university='Test University',
+                graduation_year=2020,
+                field_of_study='Computer Science',
+                is_verified=True,
+                timezone=tz_name,
+                availability=[{'day': 0, 'start_time': '09:00', 'end_time': '12:00'}]
+            ))
+            Session.objects.create(
+                student=self.student,
+                mentor=mentor,
+                status='accepted',
+                requested_time=self.monday.replace(hour=i + 10),
+                goal='Career advice'
+            )
+        self.url = reverse('mentor-availability-batch')
+        self.body = {
+            'mentor_ids': [profile.pk for profile in self.profiles],
+            'start_date': self.monday.isoformat(),
+            'end_date': self.monday.isoformat(),
+        }
+
+    def test_matches_single_mentor_endpoint_in_two_queries(self):
+        """Each result equals the per-mentor response; profiles + sessions are two queries"""
+        with self.assertNumQueries(2):
+            response = self.client.post(self.url, self.body, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['mentor_id'] for r in response.data['results']], self.body['mentor_ids'])
+        self.assertEqual(response.data['not_found'], [])
+
+        cache.clear()
+        for profile, result in zip(self.profiles, response.data['results']):
+            single = self.client.get(
+                reverse('mentor-availability', kwargs={'pk': profile.pk}),
+                {'start_date': self.body['start_date'], 'end_date': self.body['end_date']}
+            )
+            self.assertEqual(single.data, result)
+
+    def test_cached_mentors_skip_the_booking_query(self):
+        """A fully cached batch only loads the profiles"""
+        self.client.post(self.url, self.body, format='json')
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, self.body, format='json')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_unknown_and_unverified_mentors(self):
+        """Missing or unverified mentors are reported, not failed"""
+        self.profiles[1].is_verified = False
+        self.profiles[1].save()
+        body = dict(self.body, mentor_ids=[self.profiles[0].pk, self.profiles[1].pk, 999999])
+        response = self.client.post(self.url, body, format='json')
+        self.assertEqual([r['mentor_id'] for r in response.data['results']], [self.profiles[0].pk])
+        self.assertEqual(response.data['not_found'], [self.profiles[1].pk, 999999])
+
+    def test_invalid_requests(self):
+        """Empty, oversized or malformed batches are rejected"""
+        for mentor_ids in ([], list(range(1, 52)), ['abc'], 'not-a-list'):
+            with self.subTest(mentor_ids=mentor_ids):
+                response = self.client.post(self.url, dict(self.body, mentor_ids=mentor_ids), format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, dict(self.body, slot_minutes=7), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
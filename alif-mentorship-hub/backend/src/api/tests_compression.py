@@ -0,0 +1,161 @@
+"""
+Compression Test Suite
+Content-encoding negotiation and the compression middleware
+"""
+import gzip
+import json
+import unittest
+
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from api.compression import CODECS, compress, compression_level, negotiate_encoding, parse_accept_encoding
+from api.middleware import ResponseCompressionMiddleware
+from api.models import MentorProfile, User
+
+
+class NegotiationTest(SimpleTestCase):
+    """Highest q-value wins, ties go to the server's preference, q=0 refuses"""
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0.8, BR, x-gzip;q=0.5, zstd;q=oops'),
+            {'gzip': 0.8, 'br': 1.0, 'zstd': 0.0},
+        )
+
+    def test_negotiate_encoding(self):
+        self.assertIsNone(negotiate_encoding(''))
+        self.assertIsNone(negotiate_encoding('identity'))
+        self.assertIsNone(negotiate_encoding('gzip;q=0'))
+        self.assertIsNone(negotiate_encoding('*;q=0'))
+        self.assertEqual(negotiate_encoding('deflate, gzip'), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip, unknown;q=1'), 'gzip')
+        self.assertEqual(negotiate_encoding('*'), next(e for e in ('zstd', 'br', 'gzip') if e in CODECS))
+
+    @unittest.skipUnless('br' in CODECS, 'brotli is not installed')
+    def test_brotli_preferred_over_gzip(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(negotiate_encoding('gzip, br;q=0.5'), 'gzip')
+
+
+class PaddingTest(SimpleTestCase):
+    """Random padding changes the compressed length but not what decodes"""
+
+    DATA = json.dumps({'token': 'secret', 'echo': 'secret' * 50}).encode()
+
+    def decompress(self, data, encoding):
+        if encoding == 'gzip':
+            return gzip.decompress(data)
+        if encoding == 'br':
+            import brotli
+            return brotli.decompress(data)
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+    def test_every_codec_is_padded(self):
+        for encoding in CODECS:
+            with self.subTest(encoding=encoding):
+                bare = compress(self.DATA, encoding)
+                self.assertEqual(compress(self.DATA, encoding), bare)
+                lengths = set()
+                for max_random_bytes in (1, 100, 100, 100, 300, 70000):
+                    padded = compress(self.DATA, encoding, max_random_bytes)
+                    self.assertEqual(self.decompress(padded, encoding), self.DATA)
+                    self.assertGreater(len(padded), len(bare))
+                    lengths.add(len(padded))
+                self.assertGreater(len(lengths), 2)
+
+
+class ResponseCompressionMiddlewareTest(SimpleTestCase):
+    """Large responses are compressed; small, streamed and precompressed ones are left alone"""
+
+    BODY = {'results': [{'id': i, 'university': 'SIMAD University', 'field_of_study': 'Computer Science'}
+                        for i in range(100)]}
+
+    def setUp(self):
+        self.request = RequestFactory().get('/api/mentors/', HTTP_ACCEPT_ENCODING='gzip')
+
+    def process(self, response, request=None):
+        return ResponseCompressionMiddleware(lambda r: response)(request or self.request)
+
+    def test_large_json_is_gzipped(self):
+        response = self.process(JsonResponse(self.BODY))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.BODY)
+        self.assertGreater(float(response['X-Compression-Ratio']), 5)
+        self.assertTrue(response['X-Compression-Time'].endswith('ms'))
+
+    def test_client_without_gzip_gets_identity_with_vary(self):
+        request = RequestFactory().get('/api/mentors/')
+        response = self.process(JsonResponse(self.BODY), request)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(json.loads(response.content), self.BODY)
+
+    def test_skipped_responses(self):
+        small = self.process(JsonResponse({'ok': True}))
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertEqual(small['Content-Length'], str(len(small.content)))
+
+        image = self.process(HttpResponse(b'\x89PNG' * 1000, content_type='image/png'))
+        self.assertFalse(image.has_header('Content-Encoding'))
+
+        encoded = HttpResponse(b'x' * 5000)
+        encoded['Content-Encoding'] = 'br'
+        self.assertEqual(self.process(encoded).content, b'x' * 5000)
+
+        streaming = self.process(StreamingHttpResponse(iter([b'x' * 5000])))
+        self.assertFalse(streaming.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(streaming.streaming_content), b'x' * 5000)
+
+    def test_strong_etag_is_weakened(self):
+        response = JsonResponse(self.BODY)
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.process(response)['ETag'], 'W/"abc"')
+
+    def test_token_endpoints_are_not_compressed(self):
+        for path in ('/api/auth/login/', '/api/v1/auth/refresh/'):
+            with self.subTest(path=path):
+                request = RequestFactory().post(path, HTTP_ACCEPT_ENCODING='gzip')
+                response = self.process(JsonResponse(self.BODY), request)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(json.loads(response.content), self.BODY)
+
+        with override_settings(RESPONSE_COMPRESSION_EXCLUDED_PATHS=['/api/mentors/']):
+            self.assertFalse(self.process(JsonResponse(self.BODY)).has_header('Content-Encoding'))
+
+    def test_compressed_length_is_masked(self):
+        lengths = {len(self.process(JsonResponse(self.BODY)).content) for _ in range(10)}
+        self.assertGreater(len(lengths), 1)
+
+    def test_level_and_threshold_are_configurable(self):
+        self.assertEqual(compression_level('gzip'), 6)
+        with override_settings(RESPONSE_COMPRESSION_LEVELS={'gzip': 1}, RESPONSE_COMPRESSION_MAX_RANDOM_BYTES=0):
+            response = self.process(JsonResponse(self.BODY))
+        expected = gzip.compress(JsonResponse(self.BODY).content, compresslevel=1, mtime=0)
+        self.assertEqual(response.content, expected)
+
+        with override_settings(RESPONSE_COMPRESSION_MIN_SIZE=10 ** 6):
+            self.assertFalse(self.process(JsonResponse(self.BODY)).has_header('Content-Encoding'))
+
+
+@override_settings(MIDDLEWARE=['api.middleware.ResponseCompressionMiddleware'], RESPONSE_COMPRESSION_MIN_SIZE=0)
+class CompressedEndpointTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            user = User.objects.create_user(username=f'mentor{i}', password='testpass123', role='mentor')
+            MentorProfile.objects.create(
+                user=user, university=f'University {i}', graduation_year=2020,
+                field_of_study='Computer Science', is_verified=True,
+            )
+
+    def test_mentor_list_is_served_gzipped(self):
+        response = self.client.get(reverse('mentor-list'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('results', json.loads(gzip.decompress(response.content)))
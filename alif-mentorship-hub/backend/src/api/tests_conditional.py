@@ -0,0 +1,125 @@
+"""
+Conditional GET Test Suite
+Version-based ETags, 304s without serialising, and per-endpoint Cache-Control
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.config_views import get_frontend_config
+from api.models import MentorFavorite, MentorProfile, Resource, Review, Session, User
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.mentor = User.objects.create_user(username='mentor1', password='testpass123', role='mentor')
+        self.profile = MentorProfile.objects.create(
+            user=self.mentor, university='SIMAD University', graduation_year=2020,
+            field_of_study='Computer Science', is_verified=True,
+        )
+        self.student = User.objects.create_user(username='student1', password='testpass123', role='student')
+
+    def revalidate(self, url, etag, **extra):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag, **extra)
+
+    def test_matching_etag_returns_304_without_queries(self):
+        url = reverse('mentor-list')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'max-age=30, public')
+
+        with self.assertNumQueries(0):
+            second = self.revalidate(url, first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.content, b'')
+
+        # Weak validators (as the compression middleware sends) still match
+        self.assertEqual(self.revalidate(url, 'W/' + first['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, {'field': 'Computer'}, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+    def test_profile_change_moves_the_etag_after_commit(self):
+        url = reverse('mentor-detail', args=[self.profile.pk])
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.bio = 'Happy to help with scholarship applications'
+            self.profile.save()
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['bio'], 'Happy to help with scholarship applications')
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mentor.first_name = 'Amina'
+            self.mentor.save()
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+        # Logins touch last_login only and keep the tag
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mentor.last_login = timezone.now()
+            self.mentor.save(update_fields=['last_login'])
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_new_review_moves_review_and_mentor_etags(self):
+        urls = [reverse('mentor-reviews', args=[self.profile.pk]), reverse('mentor-list')]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.assertEqual(self.client.get(urls[0])['Cache-Control'], 'max-age=300, public')
+
+        session = Session.objects.create(
+            student=self.student, mentor=self.mentor, status='completed',
+            requested_time=timezone.now() - timedelta(days=1),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(session=session, rating=5, comment='Great')
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_favorites_are_private_per_user(self):
+        url = reverse('mentor-list')
+        anonymous = self.client.get(url)['ETag']
+        self.client.force_authenticate(self.student)
+        response = self.client.get(url)
+        self.assertNotEqual(response['ETag'], anonymous)
+        self.assertEqual(response['Cache-Control'], 'max-age=30, private')
+        self.assertIn('Authorization', response['Vary'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MentorFavorite.objects.create(student=self.student, mentor=self.mentor)
+        response = self.revalidate(url, response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['results'][0]['is_favorited'])
+
+    def test_resources_and_availability(self):
+        url = reverse('resource-list-create')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Resource.objects.create(title='Scholarships 2027', category='scholarships', body='...',
+                                    published_at=timezone.now())
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+        url = reverse('mentor-availability', args=[self.profile.pk])
+        first = self.client.get(url, {'start_date': '2030-01-07', 'end_date': '2030-01-08'})
+        self.assertEqual(first['Cache-Control'], 'max-age=0, must-revalidate, public')
+        response = self.client.get(
+            url, {'start_date': '2030-01-07', 'end_date': '2030-01-08'}, HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.assertFalse(self.client.get(url, {'slot_minutes': '7'}).has_header('ETag'))
+
+    def test_frontend_config(self):
+        factory = APIRequestFactory()
+        first = get_frontend_config(factory.get('/api/v1/config/frontend/'))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'max-age=600, public')
+        second = get_frontend_config(factory.get('/api/v1/config/frontend/', HTTP_IF_NONE_MATCH=first['ETag']))
+        self.assertEqual(second.status_code, 304)
@@ -0,0 +1,154 @@
+"""
+Email Outbox Test Suite
+Notifications are queued in the request transaction and delivered in batches;
+Django's locmem backend stands in for the SMTP server
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.email import deliver_queued_emails, queue_email, retry_delay
+from api.models import User, MentorProfile, EmailOutbox, Session
+
+
+class CountingEmailBackend(EmailBackend):
+    """locmem backend that records how many connections were opened"""
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return True
+
+
+class FlakyEmailBackend(EmailBackend):
+    """Rejects any message addressed to a 'bounce' recipient"""
+
+    def send_messages(self, messages):
+        if any('bounce' in address for message in messages for address in message.to):
+            raise ConnectionError('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class OutboxQueueTest(APITestCase):
+    """Request handlers only write outbox rows; nothing is sent inline"""
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            username='student', email='student@example.com', password='testpass123', role='student'
+        )
+        self.mentor = User.objects.create_user(
+            username='mentor', email='mentor@example.com', password='testpass123', role='mentor'
+        )
+        MentorProfile.objects.create(
+            user=self.mentor,
+            university='Test University',
+            graduation_year=2020,
+            field_of_study='Computer Science',
+            is_verified=True,
+            timezone='UTC',
+            availability=[{'day': day, 'start_time': '00:00', 'end_time': '24:00'} for day in range(7)]
+        )
+
+    def test_booking_queues_the_request_notification(self):
+        self.client.force_authenticate(user=self.student)
+        response = self.client.post(reverse('session-list-create'), {
+            'mentor_id': self.mentor.pk,
+            'requested_time': (timezone.now() + timedelta(days=2)).isoformat(),
+            'goal': 'Career advice',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.recipients, ['mentor@example.com'])
+        self.assertIn('New session request', queued.subject)
+
+    def test_rolled_back_transaction_drops_the_email(self):
+        """The row shares the caller's transaction, so a failed request sends nothing"""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                queue_email('Subject', 'Body', ['student@example.com'])
+                raise RuntimeError('request failed after queueing')
+        self.assertEqual(EmailOutbox.queue_depth(), 0)
+
+    def test_failed_outbox_insert_rolls_back_the_transition(self):
+        """A status change never commits without its notification"""
+        session = Session.objects.create(
+            student=self.student, mentor=self.mentor, requested_time=timezone.now() + timedelta(days=2),
+            goal='Career advice',
+        )
+        self.client.force_authenticate(user=self.mentor)
+        with mock.patch.object(EmailOutbox.objects, 'create', side_effect=DatabaseError('outbox unavailable')):
+            accept = self.client.post(reverse('session-accept', kwargs={'pk': session.pk}),
+                                      {'meet_link': 'https://meet.example.com/a'})
+            bulk = self.client.post(reverse('session-bulk-transition'),
+                                    {'action': 'decline', 'session_ids': [session.pk]}, format='json')
+        self.assertEqual(accept.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(bulk.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'pending')
+        self.assertIsNone(session.meet_link)
+
+
+class OutboxDeliveryTest(TestCase):
+    """The sender drains due messages over one connection per batch and backs off on failure"""
+
+    def setUp(self):
+        CountingEmailBackend.opened = 0
+
+    def queue(self, count, recipient='user{}@example.com'):
+        return [queue_email(f'Subject {i}', 'Body', [recipient.format(i)]) for i in range(count)]
+
+    @override_settings(EMAIL_BACKEND='api.tests_email.CountingEmailBackend')
+    def test_batches_share_one_connection(self):
+        self.queue(5)
+        out = StringIO()
+        call_command('send_queued_emails', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingEmailBackend.opened, 3)
+        self.assertEqual(EmailOutbox.objects.filter(status='sent', sent_at__isnull=False).count(), 5)
+        self.assertIn('Sent 5 email(s)', out.getvalue())
+        self.assertIn('Queue depth: 0 pending', out.getvalue())
+
+    @override_settings(EMAIL_BACKEND='api.tests_email.FlakyEmailBackend')
+    def test_failures_retry_with_backoff_then_give_up(self):
+        self.queue(2)
+        bounce, = self.queue(1, recipient='bounce@example.com')
+
+        stats = deliver_queued_emails(max_attempts=2)
+        self.assertEqual(stats, {'sent': 2, 'retried': 1, 'failed': 0})
+        bounce.refresh_from_db()
+        self.assertEqual((bounce.status, bounce.attempts), ('pending', 1))
+        self.assertIn('550', bounce.last_error)
+        self.assertGreater(bounce.next_attempt_at, timezone.now() + retry_delay(1) - timedelta(seconds=5))
+
+        # Not due yet: backoff keeps it out of the next batch
+        self.assertEqual(deliver_queued_emails(), {'sent': 0, 'retried': 0, 'failed': 0})
+
+        EmailOutbox.objects.filter(pk=bounce.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_queued_emails(max_attempts=2), {'sent': 0, 'retried': 0, 'failed': 1})
+        bounce.refresh_from_db()
+        self.assertEqual((bounce.status, bounce.attempts), ('failed', 2))
+        self.assertEqual(EmailOutbox.queue_depth(), 0)
+
+    def test_retry_delay_is_exponential_and_capped(self):
+        self.assertEqual(retry_delay(1), timedelta(seconds=30))
+        self.assertEqual(retry_delay(3), timedelta(minutes=2))
+        self.assertEqual(retry_delay(20), timedelta(hours=1))
+
+    def test_depth_report(self):
+        self.queue(3)
+        out = StringIO()
+        call_command('send_queued_emails', '--depth', stdout=out)
+        self.assertIn('Queue depth: 3 pending', out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
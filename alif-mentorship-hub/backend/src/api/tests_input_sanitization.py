@@ -0,0 +1,97 @@
+"""
+Input Sanitization Test Suite
+Threat screening, plain-text fast path, memo and iterative JSON walks
+"""
+import re
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from api.input_sanitization import InputSanitizer, _memoized_sanitize, sanitize_dict, validate_json_field
+from api.management.commands.benchmark_input_sanitization import (
+    LegacyInputSanitizer, build_payloads, legacy_sanitize_dict, legacy_validate_json_field,
+)
+
+
+def outcome(function, *args, **kwargs):
+    try:
+        return function(*args, **kwargs)
+    except ValidationError as e:
+        return f'error: {e}'
+
+
+class InputSanitizerTest(SimpleTestCase):
+    """Screening and the fast path skip work, never change a result or an error"""
+
+    EDGE_CASES = [
+        'Amina', 'Computer Science', 'id', 'my ID card', 'this or that', 'x or y=1', "1' OR '1'='1",
+        'select', 'Selected works', 'EXECUTE now', 'a--b', 'C#', 'path/../x', '..', 'file.tar.gz',
+        '%2E%2e/etc', 'Mentor: yes', 'a onclick = b', 'javascript:alert(1)', 'Tom & Jerry', '<b>hi</b>',
+        "I'm here", '  many   spaces  ', 'tab\there', 'nul\x00byte', 'ſelect * from x', 'Muqdisho ✓',
+        'Ｓelect', 'İd', 'x' * 300,
+    ]
+
+    def setUp(self):
+        _memoized_sanitize.cache_clear()
+
+    def test_matches_unscreened_sanitizer(self):
+        for value in self.EDGE_CASES:
+            for allow_html in (False, True):
+                with self.subTest(value=value, allow_html=allow_html):
+                    self.assertEqual(
+                        outcome(InputSanitizer.sanitize_string, value, allow_html=allow_html, max_length=50),
+                        outcome(LegacyInputSanitizer.sanitize_string, value, allow_html=allow_html, max_length=50),
+                    )
+
+    def test_matches_unscreened_sanitizer_on_payloads(self):
+        for kind, payload in build_payloads(500, seed=5):
+            with self.subTest(payload=payload):
+                if kind == 'text':
+                    self.assertEqual(
+                        outcome(InputSanitizer.sanitize_string, payload),
+                        outcome(LegacyInputSanitizer.sanitize_string, payload),
+                    )
+                elif kind == 'availability':
+                    self.assertEqual(outcome(validate_json_field, payload), outcome(legacy_validate_json_field, payload))
+                else:
+                    self.assertEqual(outcome(sanitize_dict, payload), outcome(legacy_sanitize_dict, payload))
+
+    def test_screen_words_cover_every_pattern_word(self):
+        pattern_words = set()
+        for pattern in InputSanitizer.SQL_INJECTION_PATTERNS + InputSanitizer.COMMAND_INJECTION_PATTERNS:
+            for group in re.findall(r'\(([A-Za-z|]+)\)', pattern.pattern):
+                pattern_words.update(word.lower() for word in group.split('|'))
+        self.assertEqual(pattern_words - InputSanitizer.THREAT_WORDS, InputSanitizer.CONDITION_WORDS)
+
+    def test_credentials_are_not_memoized(self):
+        sanitize_dict({'password': 'Pass.word!', 'new_password': 'Other.one!'})
+        # Only the two keys went through the memo
+        self.assertEqual(_memoized_sanitize.cache_info().currsize, 2)
+
+        InputSanitizer.sanitize_string('Computer Science')
+        InputSanitizer.sanitize_string('Computer Science')
+        self.assertEqual(_memoized_sanitize.cache_info().hits, 1)
+
+
+class JsonWalkTest(SimpleTestCase):
+    """Nested payloads are walked without recursion, in the same order and with the same limits"""
+
+    def test_key_collisions_keep_the_last_value(self):
+        payload = {' a ': {'x': 1}, 'a': [' one ', {'y': 'two'}], 'b': 'three'}
+        self.assertEqual(validate_json_field(payload), legacy_validate_json_field(payload))
+        self.assertEqual(list(validate_json_field(payload)), ['a', 'b'])
+        self.assertEqual(sanitize_dict(payload), legacy_sanitize_dict(payload))
+
+    def test_depth_and_size_limits(self):
+        with self.assertRaisesMessage(ValidationError, 'JSON structure too deep'):
+            validate_json_field({'a': {'b': {'c': {'d': 1}}}})
+        with self.assertRaisesMessage(ValidationError, 'JSON array too large'):
+            validate_json_field(list(range(101)))
+        self.assertEqual(validate_json_field({'a': {'b': {'c': 1}}}), {'a': {'b': {'c': 1}}})
+
+    def test_deep_dicts_are_rejected_not_recursed(self):
+        payload = {}
+        for _ in range(5000):
+            payload = {'level': payload}
+        with self.assertRaisesMessage(ValidationError, 'JSON structure too deep'):
+            sanitize_dict(payload)
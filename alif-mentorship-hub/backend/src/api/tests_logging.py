@@ -0,0 +1,152 @@
+"""
+Logging Test Suite
+Queued logging pipeline, drop counters, successful-GET sampling and redaction
+"""
+import logging
+import queue
+
+from django.test import RequestFactory, SimpleTestCase
+
+from api.management.commands.benchmark_log_redaction import LegacySecureLogFormatter, build_corpus
+from api.secure_logging import (
+    APILogger, DroppingQueueHandler, LogQueueStats, RedactionEngine, SecureLogFormatter, _TargetedQueueListener,
+    disable_queued_logging, enable_queued_logging, queued_logging_stats,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class QueuedLoggingTest(SimpleTestCase):
+    """Records are formatted and written by the listener thread, never lost silently"""
+
+    def setUp(self):
+        self.logger = logging.getLogger('tests.queued')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.addCleanup(setattr, self.logger, 'handlers', [])
+
+    def test_full_queue_drops_and_counts(self):
+        stats = LogQueueStats()
+        self.logger.handlers = [DroppingQueueHandler(queue.Queue(maxsize=2), [ListHandler()], stats)]
+        for i in range(5):
+            self.logger.info('event %s', i)
+        self.assertEqual(stats.snapshot(), {'tests.queued': 3})
+
+    def test_listener_runs_each_loggers_own_handlers(self):
+        info, errors = ListHandler(), ListHandler(logging.ERROR)
+        errors.setFormatter(SecureLogFormatter())
+        log_queue = queue.Queue()
+        self.logger.handlers = [DroppingQueueHandler(log_queue, [info, errors], LogQueueStats())]
+        listener = _TargetedQueueListener(log_queue, respect_handler_level=True)
+        listener.start()
+
+        self.logger.info('user %s logged in', 42)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            self.logger.exception('failed for token=abc123')
+        listener.stop()
+
+        self.assertEqual(info.lines[0], 'user 42 logged in')
+        self.assertEqual(len(errors.lines), 1)
+        self.assertIn('[TOKEN_REDACTED]', errors.lines[0])
+        self.assertIn('ValueError: boom', errors.lines[0])
+
+    def test_enable_and_disable_swap_handlers(self):
+        # ApiConfig.ready switches the app-wide queue on (LOG_QUEUE_ENABLED);
+        # start from direct handlers and put it back for the tests after this one
+        previous = queued_logging_stats()
+        disable_queued_logging()
+        if previous['enabled']:
+            def restore():
+                self.logger.handlers = []
+                enable_queued_logging(previous['max_size'])
+            self.addCleanup(restore)
+
+        target = ListHandler()
+        self.logger.handlers = [target]
+        enable_queued_logging(max_size=100)
+        try:
+            self.assertIsInstance(self.logger.handlers[0], DroppingQueueHandler)
+            self.assertTrue(queued_logging_stats()['enabled'])
+            self.logger.info('queued')
+        finally:
+            disable_queued_logging()
+        self.assertEqual(self.logger.handlers, [target])
+        self.assertEqual(target.lines, ['queued'])
+
+
+class RequestLogSamplingTest(SimpleTestCase):
+    """Only successful GETs are sampled; errors and writes are always logged"""
+
+    def setUp(self):
+        self.handler = ListHandler()
+        logger = logging.getLogger('tests.requests')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.handlers = [self.handler]
+        self.addCleanup(setattr, logger, 'handlers', [])
+        self.factory = RequestFactory()
+
+    def test_successful_gets_are_sampled(self):
+        api_logger = APILogger('tests.requests', get_sample_rate=0.0)
+        api_logger.log_request(self.factory.get('/api/mentors/'), 200, 0.01)
+        api_logger.log_request(self.factory.get('/api/mentors/'), 404, 0.01)
+        api_logger.log_request(self.factory.post('/api/messages/'), 201, 0.01)
+        self.assertEqual(len(self.handler.lines), 2)
+
+    def test_sensitive_headers_are_redacted(self):
+        records = []
+        self.handler.emit = records.append
+        APILogger('tests.requests', get_sample_rate=1.0).log_request(
+            self.factory.get('/api/mentors/', HTTP_AUTHORIZATION='Bearer secret'), 200, 0.01
+        )
+        self.assertEqual(records[0].headers['authorization'], '[REDACTED]')
+        self.assertEqual(records[0].sample_rate, 1.0)
+
+
+class RedactionEngineTest(SimpleTestCase):
+    """The engine skips work, never output: results match running every pattern in order"""
+
+    def setUp(self):
+        self.legacy = LegacySecureLogFormatter()
+        self.engine = RedactionEngine(
+            SecureLogFormatter.INJECTION_PATTERNS, SecureLogFormatter.SENSITIVE_PATTERNS, self.legacy.max_length
+        )
+
+    def test_matches_sequential_patterns(self):
+        edge_cases = [
+            'Invalid bearer token: xyz', 'password\n=abc', 'onload\n=', 'PASSWORD: "hunter2"',
+            'mail a.b@example.org now', '4111-1111-1111-1111', '123-45-6789', '<SCRIPT>x</script>',
+            'monkey=banana', '', 'x' * 20000, 'paſsword=hunter2', 'authorızatıon: xyz', 'KEY=abc ünïcode',
+        ]
+        for message in build_corpus(2000, seed=3) + edge_cases:
+            with self.subTest(message=message[:60]):
+                self.assertEqual(self.engine.sanitize(message), self.legacy.sanitize_message(message))
+
+    def test_only_clean_messages_are_cached(self):
+        self.engine.sanitize('Mentor profile 12 updated')
+        self.engine.sanitize('login failed password=hunter2')
+        self.assertEqual(list(self.engine._clean), ['Mentor profile 12 updated'])
+        self.assertEqual(self.engine.sanitize('Mentor profile 12 updated'), 'Mentor profile 12 updated')
+
+    def test_required_literal(self):
+        self.assertEqual(RedactionEngine._required_literal(r'bearer\s+([a-z]+=*)'), 'bearer')
+        self.assertEqual(RedactionEngine._required_literal(r'\b\d{3}-\d{2}-\d{4}\b'), '-')
+        self.assertEqual(RedactionEngine._required_literal(r'keys?=(\w+)'), 'key')
+        self.assertEqual(RedactionEngine._required_literal(r'[\r\n]'), '')
+        self.assertEqual(RedactionEngine._required_literal(r'token|secret'), '')
+
+    def test_format_truncates_long_messages_once(self):
+        record = logging.LogRecord('api', logging.INFO, __file__, 1, 'y' * 20000 + ' token=abc', None, None)
+        line = SecureLogFormatter().format(record)
+        self.assertIn('... [TRUNCATED]', line)
+        self.assertNotIn('abc', line)
+        self.assertLessEqual(len(line), SecureLogFormatter().max_length + 200)
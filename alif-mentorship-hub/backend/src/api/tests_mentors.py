@@ -0,0 +1,394 @@
+"""
+Mentor Directory Test Suite
+Query-count regression tests for the public mentor endpoints
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import User, MentorProfile, Session, Review, MentorFavorite
+from api.availability import compile_weekly_bitmap, utc_offset_minutes
+from api.database_optimization import FullTextMatch
+
+
+class MentorListQueryCountTest(APITestCase):
+    """Mentor list/detail must cost a fixed number of queries regardless of page size"""
+
+    def setUp(self):
+        # Anonymous responses are cached across tests otherwise
+        cache.clear()
+        self.student = User.objects.create_user(
+            username='student',
+            password='testpass123',
+            role='student'
+        )
+
+    def create_mentors(self, count, start=0):
+        mentors = []
+        for i in range(start, start + count):
+            user = User.objects.create_user(
+                username=f'mentor{i}',
+                password='testpass123',
+                role='mentor'
+            )
+            mentors.append(MentorProfile.objects.create(
+                user=user,
+                university=f'University {i}',
+                graduation_year=2020,
+                field_of_study='Computer Science',
+                is_verified=True
+            ))
+        return mentors
+
+    def review_mentor(self, profile, rating=5):
+        session = Session.objects.create(
+            student=self.student,
+            mentor=profile.user,
+            status='completed',
+            requested_time=timezone.now() - timedelta(days=1),
+            goal='Career advice'
+        )
+        return Review.objects.create(session=session, rating=rating)
+
+    def test_anonymous_list_query_count_is_constant(self):
+        """COUNT + page query, independent of how many mentors are on the page"""
+        url = reverse('mentor-list')
+        self.create_mentors(3)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_mentors(17, start=3)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_student_list_adds_one_favorites_lookup(self):
+        """Favorite status is resolved with a single query for the whole page"""
+        mentors = self.create_mentors(10)
+        MentorFavorite.objects.create(student=self.student, mentor=mentors[0].user)
+        MentorFavorite.objects.create(student=self.student, mentor=mentors[3].user)
+        self.client.force_authenticate(user=self.student)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('mentor-list'))
+
+        favorited = {m['id'] for m in response.data['results'] if m['is_favorited']}
+        self.assertEqual(favorited, {mentors[0].id, mentors[3].id})
+
+    def test_review_count_comes_from_annotation(self):
+        """review_count matches the real count and sorting by reviews still works"""
+        mentors = self.create_mentors(3)
+        self.review_mentor(mentors[1], rating=4)
+        self.review_mentor(mentors[1], rating=5)
+        self.review_mentor(mentors[2], rating=3)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('mentor-list'), {'sort': 'reviews'})
+
+        counts = [(m['id'], m['review_count']) for m in response.data['results']]
+        self.assertEqual(counts, [(mentors[1].id, 2), (mentors[2].id, 1), (mentors[0].id, 0)])
+
+    def test_detail_query_count(self):
+        """Detail view is one query for an anonymous visitor"""
+        mentor = self.create_mentors(1)[0]
+        self.review_mentor(mentor)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('mentor-detail', kwargs={'pk': mentor.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['review_count'], 1)
+
+
+class RatingAggregatesTest(APITestCase):
+    """Review signals keep MentorProfile counters exact without recomputing"""
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            username='student',
+            password='testpass123',
+            role='student'
+        )
+        self.mentor = User.objects.create_user(
+            username='mentor',
+            password='testpass123',
+            role='mentor'
+        )
+        self.profile = MentorProfile.objects.create(
+            user=self.mentor,
+            university='Test University',
+            graduation_year=2020,
+            field_of_study='Computer Science',
+            is_verified=True
+        )
+
+    def create_review(self, rating):
+        session = Session.objects.create(
+            student=self.student,
+            mentor=self.mentor,
+            status='completed',
+            requested_time=timezone.now() - timedelta(days=1),
+            goal='Career advice'
+        )
+        return Review.objects.create(session=session, rating=rating)
+
+    def test_insert_update_delete(self):
+        """Counters, sum, histogram and average follow every review change"""
+        first = self.create_review(5)
+        self.create_review(3)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 2)
+        self.assertEqual(self.profile.rating_sum, 8)
+        self.assertEqual(self.profile.average_rating, 4.0)
+        self.assertEqual(self.profile.rating_histogram, {1: 0, 2: 0, 3: 1, 4: 0, 5: 1})
+
+        first.rating = 2
+        first.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 2)
+        self.assertEqual(self.profile.average_rating, 2.5)
+        self.assertEqual(self.profile.rating_histogram, {1: 0, 2: 1, 3: 1, 4: 0, 5: 0})
+
+        first.delete()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 1)
+        self.assertEqual(self.profile.average_rating, 3.0)
+
+        Review.objects.get().delete()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 0)
+        self.assertEqual(self.profile.rating_sum, 0)
+        self.assertEqual(self.profile.average_rating, 0.0)
+
+    def test_review_insert_is_constant_work(self):
+        """Adding a review never reads the mentor's other reviews"""
+        for _ in range(5):
+            self.create_review(4)
+        session = Session.objects.create(
+            student=self.student,
+            mentor=self.mentor,
+            status='completed',
+            requested_time=timezone.now() - timedelta(days=1),
+            goal='Career advice'
+        )
+        # INSERT review + UPDATE profile (session is already cached on the instance)
+        with self.assertNumQueries(2):
+            Review.objects.create(session=session, rating=1)
+
+    def test_stale_profile_save_keeps_counters(self):
+        """A full save of an old profile instance must not clobber counters"""
+        stale = MentorProfile.objects.get(pk=self.profile.pk)
+        self.create_review(5)
+        stale.bio = 'Updated bio'
+        stale.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 1)
+        self.assertEqual(self.profile.bio, 'Updated bio')
+
+    def test_rebuild_command_repairs_drift(self):
+        """rebuild_rating_aggregates reports and fixes drifted counters"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        self.create_review(4)
+        self.create_review(2)
+        MentorProfile.objects.filter(pk=self.profile.pk).update(review_count=7, average_rating=1.0)
+
+        out = StringIO()
+        call_command('rebuild_rating_aggregates', '--dry-run', stdout=out)
+        self.assertIn('Drift on mentor profile', out.getvalue())
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 7)
+
+        call_command('rebuild_rating_aggregates', stdout=StringIO())
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.review_count, 2)
+        self.assertEqual(self.profile.average_rating, 3.0)
+
+        out = StringIO()
+        call_command('rebuild_rating_aggregates', stdout=out)
+        self.assertIn('No drift detected', out.getvalue())
+
+
+class MentorSearchTest(APITestCase):
+    """q= searches bio, field of study and university, ranked by relevance"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_mentor(self, username, field_of_study, university, bio='', rating=0.0):
+        user = User.objects.create_user(username=username, password='testpass123', role='mentor')
+        return MentorProfile.objects.create(
+            user=user,
+            university=university,
+            graduation_year=2020,
+            field_of_study=field_of_study,
+            bio=bio,
+            is_verified=True,
+            average_rating=rating
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse('mentor-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [m['id'] for m in response.data['results']]
+
+    def test_search_covers_bio_and_ranks_by_relevance(self):
+        """A field-of-study hit outranks a bio-only hit; non-matches are excluded"""
+        in_bio = self.create_mentor('m1', 'Economics', 'SIMAD University', bio='I teach data science on weekends', rating=5.0)
+        in_field = self.create_mentor('m2', 'Data Science', 'Benadir University', rating=3.0)
+        self.create_mentor('m3', 'Medicine', 'Amoud University')
+
+        self.assertEqual(self.search(q='science'), [in_field.id, in_bio.id])
+
+    def test_all_terms_must_match(self):
+        """Multi-word queries require every term somewhere in the profile"""
+        both = self.create_mentor('m1', 'Computer Science', 'University of Mogadishu')
+        self.create_mentor('m2', 'Computer Science', 'University of Hargeisa')
+
+        self.assertEqual(self.search(q='computer mogadishu'), [both.id])
+        self.assertEqual(self.search(q='  ;; '), [])
+
+    def test_relevance_then_sort_keys(self):
+        """Equal relevance falls back to the requested sort order"""
+        low = self.create_mentor('m1', 'Nursing', 'Amoud University', rating=2.0)
+        high = self.create_mentor('m2', 'Nursing', 'Amoud University', rating=4.5)
+
+        self.assertEqual(self.search(q='nursing', sort='rating'), [high.id, low.id])
+
+    def test_search_with_cursor_pagination(self):
+        """Ranked results can be walked with keyset cursors"""
+        expected = set()
+        for i in range(25):
+            bio = 'Cloud networks mentor' if i % 2 else ''
+            expected.add(self.create_mentor(f'm{i}', 'Cloud Engineering', 'SIMAD University', bio=bio).id)
+
+        first = self.client.get(reverse('mentor-list'), {'q': 'cloud', 'cursor': ''})
+        second = self.client.get(first.data['next'])
+        ids = [m['id'] for m in first.data['results'] + second.data['results']]
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(set(ids), expected)
+        self.assertIsNone(second.data['next'])
+
+    def test_full_text_match_falls_back_to_icontains(self):
+        """Off MySQL the MATCH expression still scores, every term required"""
+        both = self.create_mentor('m1', 'Computer Science', 'University of Mogadishu', bio='computer labs')
+        self.create_mentor('m2', 'Computer Science', 'University of Hargeisa')
+
+        def ranks(query):
+            return list(
+                MentorProfile.objects
+                .annotate(rank=FullTextMatch('bio', 'field_of_study', 'university', query=query))
+                .filter(rank__gt=0)
+                .values_list('id', 'rank')
+            )
+
+        self.assertEqual(ranks('+computer* +mogadishu*'), [(both.id, 2.0)])
+        self.assertEqual(ranks(''), [])
+
+
+class AvailabilityBitmapTest(APITestCase):
+    """available_at / available_day filters run against the compiled UTC bitmap"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_mentor(self, username, availability, tz='Africa/Mogadishu'):
+        user = User.objects.create_user(username=username, password='testpass123', role='mentor')
+        return MentorProfile.objects.create(
+            user=user,
+            university='Test University',
+            graduation_year=2020,
+            field_of_study='Computer Science',
+            is_verified=True,
+            availability=availability,
+            timezone=tz
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse('mentor-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {m['id'] for m in response.data['results']}
+
+    def test_compile_shifts_to_utc_and_wraps_the_week(self):
+        """Local windows are shifted by the offset and split at UTC midnight"""
+        # Mogadishu is UTC+3: Monday 09:00-12:00 local is Monday 06:00-09:00 UTC
+        week = compile_weekly_bitmap([{'day': 0, 'start_time': '09:00', 'end_time': '12:00'}], 180)
+        self.assertEqual(week[0], ((1 << 6) - 1) << 12)
+        self.assertEqual(sum(week[1:]), 0)
+
+        # Monday 01:00-04:00 local wraps back to Sunday 22:00 - Monday 01:00 UTC
+        week = compile_weekly_bitmap([{'day': 0, 'start_time': '01:00', 'end_time': '04:00'}], 180)
+        self.assertEqual(week[6], 0b1111 << 44)
+        self.assertEqual(week[0], 0b11)
+
+    def test_available_at_filter(self):
+        """Only mentors covering the requested instant are returned"""
+        morning = self.create_mentor('m1', [{'day': 0, 'start_time': '09:00', 'end_time': '12:00'}])
+        self.create_mentor('m2', [{'day': 0, 'start_time': '14:00', 'end_time': '17:00'}])
+        self.create_mentor('m3', [])
+
+        # 2026-10-19 is a Monday; 07:30 UTC is 10:30 in Mogadishu
+        self.assertEqual(self.search(available_at='2026-10-19T07:30:00Z'), {morning.id})
+        self.assertEqual(self.search(available_at='2026-10-19T10:30:00+03:00'), {morning.id})
+        self.assertEqual(self.search(available_at='2026-10-20T07:30:00Z'), set())
+
+    def test_available_window_filter(self):
+        """Mentors must be free for the whole UTC window"""
+        long_day = self.create_mentor('m1', [{'day': 2, 'start_time': '15:00', 'end_time': '20:00'}])
+        short = self.create_mentor('m2', [{'day': 2, 'start_time': '17:00', 'end_time': '18:00'}])
+        self.create_mentor('m3', [{'day': 3, 'start_time': '17:00', 'end_time': '20:00'}])
+
+        # 14:00-16:00 UTC on Wednesday is 17:00-19:00 in Mogadishu
+        with self.assertNumQueries(2):
+            self.assertEqual(self.search(available_day=2, **{'from': '14:00', 'to': '16:00'}), {long_day.id})
+        self.assertEqual(self.search(available_day=2), {long_day.id, short.id})
+        self.assertEqual(self.search(available_day=2, **{'from': '16:00', 'to': '14:00'}), set())
+
+    def test_profile_update_recompiles(self):
+        """Changing availability or timezone refreshes the bitmap"""
+        profile = self.create_mentor('m1', [{'day': 0, 'start_time': '09:00', 'end_time': '10:00'}])
+        profile.timezone = 'UTC'
+        profile.save(update_fields=['timezone'])
+        profile.refresh_from_db()
+        self.assertEqual(profile.availability_bits_0, 0b11 << 18)
+        self.assertEqual(profile.availability_utc_offset, 0)
+
+    def test_rebuild_command_follows_dst(self):
+        """Bitmaps compiled under winter time are refreshed after the DST switch"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        profile = self.create_mentor(
+            'm1', [{'day': 0, 'start_time': '09:00', 'end_time': '10:00'}], tz='America/New_York'
+        )
+        winter = datetime(2026, 1, 15, tzinfo=dt_timezone.utc)
+        summer = datetime(2026, 7, 15, tzinfo=dt_timezone.utc)
+        profile.compile_availability_bitmap(at=winter)
+        self.assertEqual(profile.availability_utc_offset, -300)
+        self.assertEqual(profile.availability_bits_0, 0b11 << 28)
+        self.assertTrue(profile.compile_availability_bitmap(at=summer))
+        self.assertEqual(profile.availability_bits_0, 0b11 << 26)
+
+        # Store whichever season's bitmap is stale right now
+        stale_at = winter if utc_offset_minutes('America/New_York') != -300 else summer
+        profile.compile_availability_bitmap(at=stale_at)
+        MentorProfile.objects.filter(pk=profile.pk).update(
+            availability_bits_0=profile.availability_bits_0,
+            availability_utc_offset=profile.availability_utc_offset
+        )
+
+        out = StringIO()
+        call_command('rebuild_availability_bitmaps', '--dry-run', stdout=out)
+        self.assertIn('1 stale bitmap(s)', out.getvalue())
+
+        call_command('rebuild_availability_bitmaps', stdout=StringIO())
+        out = StringIO()
+        call_command('rebuild_availability_bitmaps', stdout=out)
+        self.assertIn('All bitmaps are up to date', out.getvalue())
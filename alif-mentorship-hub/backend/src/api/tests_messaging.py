@@ -0,0 +1,234 @@
+"""
+Messaging Test Suite
+Denormalised conversation list kept in step with message writes
+"""
+import importlib
+import random
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import User, Message, Conversation
+from api.unread import decrement_unread_count, unread_count_key
+
+
+class ConversationListTest(APITestCase):
+    """The inbox is one indexed query over Conversation rows"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='testpass123', role='student')
+        self.partners = [
+            User.objects.create_user(username=f'mentor{i}', password='testpass123', role='mentor')
+            for i in range(3)
+        ]
+
+    def send(self, sender, recipient, content='Hello'):
+        return Message.objects.create(sender=sender, recipient=recipient, content=content)
+
+    def inbox(self, user=None):
+        self.client.force_authenticate(user=user or self.user)
+        response = self.client.get(reverse('conversation-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_rows_follow_the_latest_message(self):
+        self.send(self.user, self.partners[0], 'first')
+        self.send(self.partners[1], self.user, 'from mentor1')
+        self.send(self.partners[1], self.user, 'again')
+        self.send(self.partners[0], self.user, 'reply')
+
+        rows = self.inbox()
+        self.assertEqual([r['username'] for r in rows], ['mentor0', 'mentor1'])
+        self.assertEqual(rows[0]['last_message'], 'reply')
+        self.assertEqual([r['unread_count'] for r in rows], [1, 2])
+
+        # The partner's side of the pair tracks its own unread counter
+        self.assertEqual(self.inbox(self.partners[0])[0]['unread_count'], 1)
+
+    def test_query_count_is_independent_of_partner_count(self):
+        self.send(self.partners[0], self.user)
+        self.client.force_authenticate(user=self.user)
+        # Warm the middleware's per-process snapshots so only the view is counted
+        self.client.get(reverse('conversation-list'))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('conversation-list'))
+
+        for partner in self.partners:
+            for _ in range(3):
+                self.send(partner, self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('conversation-list'))
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_mark_read_decrements_once(self):
+        message = self.send(self.partners[0], self.user)
+        self.send(self.partners[0], self.user)
+        self.client.force_authenticate(user=self.user)
+        url = reverse('message-mark-read', kwargs={'pk': message.pk})
+
+        for _ in range(2):
+            response = self.client.post(url, {}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['is_read'])
+        self.assertEqual(self.inbox()[0]['unread_count'], 1)
+
+    def test_backfill_matches_live_counters(self):
+        self.send(self.user, self.partners[0], 'hi')
+        read = self.send(self.partners[0], self.user, 'hello')
+        self.send(self.partners[0], self.user, 'are you there?')
+        self.send(self.partners[2], self.user, 'hey')
+        Message.objects.filter(pk=read.pk).update(is_read=True)
+        Conversation.mark_read(self.user.id, self.partners[0].id, 1)
+
+        fields = ('owner_id', 'partner_id', 'last_message_id', 'last_message_at', 'unread_count')
+        live = sorted(Conversation.objects.values_list(*fields))
+        Conversation.objects.all().delete()
+        migration = importlib.import_module('api.migrations.0020_conversation')
+        migration.backfill_conversations(apps, None)
+        self.assertEqual(sorted(Conversation.objects.values_list(*fields)), live)
+
+
+class ConversationMarkReadTest(APITestCase):
+    """Opening a conversation marks it read in one request and one UPDATE"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='student', password='testpass123', role='student')
+        self.mentor = User.objects.create_user(username='mentor', password='testpass123', role='mentor')
+        self.other = User.objects.create_user(username='other', password='testpass123', role='mentor')
+        self.client.force_authenticate(user=self.user)
+
+    def send(self, sender, recipient, count=1):
+        return [Message.objects.create(sender=sender, recipient=recipient, content='Hi') for _ in range(count)]
+
+    def mark_read(self, **data):
+        return self.client.post(reverse('conversation-mark-read', kwargs={'user_id': self.mentor.id}), data)
+
+    def test_marks_only_that_partners_messages(self):
+        self.send(self.mentor, self.user, 3)
+        self.send(self.other, self.user, 2)
+        sent = self.send(self.user, self.mentor)[0]
+
+        response = self.mark_read()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'marked_read': 3, 'unread_count': 2})
+        self.assertFalse(Message.objects.filter(sender=self.mentor, is_read=False).exists())
+        self.assertFalse(Message.objects.get(pk=sent.pk).is_read)
+        self.assertEqual(Conversation.objects.get(owner=self.user, partner=self.mentor).unread_count, 0)
+        self.assertEqual(Conversation.objects.get(owner=self.user, partner=self.other).unread_count, 2)
+
+    def test_up_to_message_id(self):
+        messages = self.send(self.mentor, self.user, 4)
+
+        response = self.mark_read(up_to_message_id=messages[1].pk)
+        self.assertEqual(response.data, {'marked_read': 2, 'unread_count': 2})
+        self.assertEqual(
+            list(Message.objects.filter(is_read=False).order_by('pk').values_list('pk', flat=True)),
+            [messages[2].pk, messages[3].pk],
+        )
+        self.assertEqual(Conversation.objects.get(owner=self.user, partner=self.mentor).unread_count, 2)
+
+        # Repeating the request is a no-op
+        self.assertEqual(self.mark_read(up_to_message_id=messages[1].pk).data['marked_read'], 0)
+        self.assertEqual(Conversation.objects.get(owner=self.user, partner=self.mentor).unread_count, 2)
+
+    def test_query_count_is_independent_of_unread_count(self):
+        self.send(self.mentor, self.user)
+        with CaptureQueriesContext(connection) as few:
+            self.mark_read()
+        self.send(self.mentor, self.user, 50)
+        cache.clear()
+        with CaptureQueriesContext(connection) as many:
+            response = self.mark_read()
+        self.assertEqual(response.data['marked_read'], 50)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "api_message"') for q in many.captured_queries), 1)
+
+    def test_rejects_non_integer_bound(self):
+        response = self.mark_read(up_to_message_id='latest')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# The interleaving test posts far more than a client may per minute
+@override_settings(RATE_LIMIT_ENABLED=False)
+class UnreadCounterTest(APITestCase):
+    """The unread badge is served from a cached counter that tracks the database"""
+
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='testpass123', role='mentor' if i else 'student')
+            for i in range(4)
+        ]
+
+    def send(self, sender, recipient):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Message.objects.create(sender=sender, recipient=recipient, content='Hi')
+
+    def post(self, user, url, data=None):
+        self.client.force_authenticate(user=user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def unread_count(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.get(reverse('unread-count')).data['unread_count']
+
+    def test_served_from_cache_once_warm(self):
+        self.send(self.users[1], self.users[0])
+        self.assertEqual(self.unread_count(self.users[0]), 1)
+        self.client.force_authenticate(user=self.users[0])
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('unread-count'))
+        self.assertEqual(response.data['unread_count'], 1)
+
+    def test_missing_key_is_rebuilt_from_the_database(self):
+        self.send(self.users[1], self.users[0])
+        self.send(self.users[2], self.users[0])
+        cache.delete(unread_count_key(self.users[0].id))
+        self.client.force_authenticate(user=self.users[0])
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('unread-count'))
+        self.assertEqual(response.data['unread_count'], 2)
+
+    def test_negative_drift_forces_a_rebuild(self):
+        self.send(self.users[1], self.users[0])
+        cache.set(unread_count_key(self.users[0].id), 0)
+        decrement_unread_count(self.users[0].id)
+        self.assertIsNone(cache.get(unread_count_key(self.users[0].id)))
+        self.assertEqual(self.unread_count(self.users[0]), 1)
+
+    def test_counter_matches_database_after_random_interleavings(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                Message.objects.all().delete()
+                cache.clear()
+
+                for _ in range(150):
+                    user = rng.choice(self.users)
+                    partner = rng.choice([u for u in self.users if u != user])
+                    action = rng.random()
+                    if action < 0.5:
+                        self.send(partner, user)
+                    elif action < 0.7:
+                        message = Message.objects.filter(recipient=user, is_read=False).order_by('?').first()
+                        if message:
+                            self.post(user, reverse('message-mark-read', kwargs={'pk': message.pk}))
+                    elif action < 0.85:
+                        latest = Message.objects.filter(recipient=user, sender=partner).order_by('-pk').first()
+                        data = {'up_to_message_id': rng.randint(1, latest.pk)} if latest and rng.random() < 0.5 else {}
+                        self.post(user, reverse('conversation-mark-read', kwargs={'user_id': partner.id}), data)
+                    else:
+                        self.unread_count(user)
+
+                    for u in self.users:
+                        self.assertEqual(Message.unread_count_for(u.id), Message.count_unread(u.id))
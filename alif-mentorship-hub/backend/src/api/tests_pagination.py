@@ -0,0 +1,150 @@
+"""
+Pagination Test Suite
+Opt-in keyset (cursor) pagination on the list endpoints
+"""
+import base64
+import json
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api.models import User, MentorProfile, Session, Message
+
+
+class KeysetPaginationTest(APITestCase):
+    """?cursor= switches list views to COUNT-free keyset pages"""
+
+    def setUp(self):
+        # Anonymous responses are cached across tests otherwise
+        cache.clear()
+        self.student = User.objects.create_user(
+            username='student',
+            password='testpass123',
+            role='student'
+        )
+        self.mentor = User.objects.create_user(
+            username='mentor',
+            password='testpass123',
+            role='mentor'
+        )
+
+    def create_messages(self, count):
+        Message.objects.bulk_create([
+            Message(sender=self.student, recipient=self.mentor, content=f'Message {i}')
+            for i in range(count)
+        ])
+        # Identical timestamps force the id tie-breaker to do the work
+        Message.objects.update(created_at=timezone.now())
+        return list(Message.objects.order_by('-id').values_list('id', flat=True))
+
+    def walk(self, url, params):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return ids, pages, response
+            response = self.client.get(response.data['next'])
+
+    def test_page_number_mode_is_default(self):
+        """Without ?cursor= the response keeps count/next/previous page links"""
+        self.create_messages(3)
+        self.client.force_authenticate(user=self.student)
+        response = self.client.get(reverse('message-list-create'), {'user_id': self.mentor.id})
+        self.assertEqual(response.data['count'], 3)
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_walk_forwards_and_backwards(self):
+        """Every row is returned exactly once, in order, in both directions"""
+        expected = self.create_messages(45)
+        self.client.force_authenticate(user=self.student)
+        url = reverse('message-list-create')
+
+        ids, pages, last = self.walk(url, {'user_id': self.mentor.id, 'cursor': ''})
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+        self.assertNotIn('count', last.data)
+
+        backwards = []
+        response = self.client.get(last.data['previous'])
+        while True:
+            backwards = [item['id'] for item in response.data['results']] + backwards
+            if not response.data['previous']:
+                break
+            response = self.client.get(response.data['previous'])
+        self.assertEqual(backwards, expected[:40])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_cursor_page_is_single_query(self):
+        """A deep mentor-list page costs one query: no COUNT, no OFFSET"""
+        for i in range(25):
+            user = User.objects.create_user(username=f'm{i}', password='testpass123', role='mentor')
+            MentorProfile.objects.create(
+                user=user,
+                university='University',
+                graduation_year=2020,
+                field_of_study='Computer Science',
+                is_verified=True,
+                average_rating=(i % 5) + 0.5
+            )
+        url = reverse('mentor-list')
+        first = self.client.get(url, {'sort': 'rating', 'cursor': ''})
+
+        with self.assertNumQueries(1):
+            second = self.client.get(first.data['next'])
+
+        ratings = [m['average_rating'] for m in first.data['results'] + second.data['results']]
+        self.assertEqual(len(ratings), 25)
+        self.assertEqual(ratings, sorted(ratings, reverse=True))
+
+    def test_session_list_cursor(self):
+        """Session list pages on (-created_at, -id) for the requesting user"""
+        now = timezone.now()
+        for i in range(22):
+            Session.objects.create(
+                student=self.student,
+                mentor=self.mentor,
+                requested_time=now + timedelta(days=1, hours=i),
+                goal=f'Goal {i}'
+            )
+        self.client.force_authenticate(user=self.mentor)
+        ids, pages, _ = self.walk(reverse('session-list-create'), {'cursor': ''})
+        self.assertEqual(pages, 2)
+        self.assertEqual(ids, list(Session.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_invalid_or_foreign_cursor_is_rejected(self):
+        """Garbage cursors and cursors issued for another sort order are 404s"""
+        url = reverse('mentor-list')
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        for i in range(21):
+            user = User.objects.create_user(username=f'm{i}', password='testpass123', role='mentor')
+            MentorProfile.objects.create(
+                user=user,
+                university='University',
+                graduation_year=2020,
+                field_of_study='Computer Science',
+                is_verified=True
+            )
+        next_link = self.client.get(url, {'sort': 'rating', 'cursor': ''}).data['next']
+        self.assertIsNotNone(next_link)
+        response = self.client.get(next_link.replace('sort=rating', 'sort=experience'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Right ordering, values that are not valid for its fields
+        cursor = parse_qs(urlparse(next_link).query)['cursor'][0]
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        for value in ('not-a-number', None, [1], {'pk': 1}):
+            payload['p'][-1] = value
+            tampered = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            with self.subTest(value=value):
+                response = self.client.get(url, {'sort': 'rating', 'cursor': tampered})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,83 @@
+"""
+Platform Settings Test Suite
+Process-local settings snapshot used by the maintenance-mode check
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.middleware import MaintenanceModeMiddleware
+from api.models import PLATFORM_SETTINGS_MAX_AGE, PLATFORM_SETTINGS_VERSION_KEY, PlatformSettings, User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(MIDDLEWARE=['api.middleware.MaintenanceModeMiddleware'])
+class PlatformSettingsSnapshotTest(TestCase):
+    """The hot path reads a per-worker copy; admin edits reach every worker within a second"""
+
+    def setUp(self):
+        cache.clear()
+        PlatformSettings._snapshot = None
+        self.clock = FakeClock()
+        patcher = mock.patch.object(PlatformSettings, '_clock', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, PlatformSettings, '_snapshot', None)
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='admin')
+
+    def simulate_other_worker_edit(self, **fields):
+        """A PATCH handled by another process: row and version key change, our snapshot stays"""
+        PlatformSettings.objects.filter(pk=1).update(**fields)
+        cache.set(PLATFORM_SETTINGS_VERSION_KEY, 'other-worker', None)
+
+    def test_maintenance_check_makes_no_queries_once_warm(self):
+        middleware = MaintenanceModeMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get('/api/mentors/')
+        middleware(request)
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.clock.now += 0.3
+                self.assertEqual(middleware(request).status_code, 200)
+
+    def test_other_workers_pick_up_a_bump_within_the_check_interval(self):
+        self.assertFalse(PlatformSettings.get_cached().maintenance_mode)
+        self.simulate_other_worker_edit(maintenance_mode=True)
+
+        self.clock.now += 0.5
+        self.assertFalse(PlatformSettings.get_cached().maintenance_mode)
+        self.clock.now += 0.6
+        self.assertTrue(PlatformSettings.get_cached().maintenance_mode)
+
+    def test_unchanged_version_is_revalidated_without_a_query(self):
+        PlatformSettings.get_cached()
+        self.clock.now += 5
+        with self.assertNumQueries(0):
+            PlatformSettings.get_cached()
+
+    def test_snapshot_is_reloaded_after_max_age(self):
+        PlatformSettings.get_cached()
+        PlatformSettings.objects.filter(pk=1).update(maintenance_mode=True)
+        self.clock.now += PLATFORM_SETTINGS_MAX_AGE + 1
+        self.assertTrue(PlatformSettings.get_cached().maintenance_mode)
+
+    def test_admin_patch_takes_effect_immediately_in_this_worker(self):
+        PlatformSettings.get_cached()
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.patch(reverse('admin-settings'), {'maintenance_mode': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(cache.get(PLATFORM_SETTINGS_VERSION_KEY))
+
+        response = self.client.get(reverse('mentor-list'))
+        self.assertEqual(response.status_code, 503)
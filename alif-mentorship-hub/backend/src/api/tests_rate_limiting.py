@@ -0,0 +1,131 @@
+"""
+Rate Limiting Test Suite
+GCRA limiter semantics and the middleware's route-template buckets
+"""
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from api.rate_limiting import CacheRateLimiter, LocalRateLimiter, rate_limiter, retry_after_header
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class LocalRateLimiterTest(SimpleTestCase):
+    """The in-process fallback: a burst of N, then one request every P / N seconds"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = LocalRateLimiter(clock=self.clock)
+
+    def reset(self):
+        self.limiter.reset()
+
+    def hit(self, limits, key='client'):
+        windows = sorted(limits.items())
+        return self.limiter.hit([f'{key}:{period}' for period, _ in windows], windows)
+
+    def test_burst_then_steady_rate(self):
+        for limit in (5, 7, 100):
+            with self.subTest(limit=limit):
+                self.reset()
+                for _ in range(limit):
+                    self.assertEqual(self.hit({60: limit}), 0)
+                retry_after = self.hit({60: limit})
+                self.assertAlmostEqual(retry_after, 60 / limit)
+
+                self.clock.now += retry_after
+                self.assertEqual(self.hit({60: limit}), 0)
+                self.assertGreater(self.hit({60: limit}), 0)
+
+    def test_denied_requests_consume_nothing(self):
+        for _ in range(3):
+            self.hit({60: 3})
+        for _ in range(10):
+            self.assertGreater(self.hit({60: 3}), 0)
+        self.clock.now += 20
+        self.assertEqual(self.hit({60: 3}), 0)
+
+    def test_every_window_is_enforced(self):
+        limits = {1: 2, 60: 3}
+        self.assertEqual(self.hit(limits), 0)
+        self.assertEqual(self.hit(limits), 0)
+        self.assertAlmostEqual(self.hit(limits), 0.5)
+
+        self.clock.now += 1
+        self.assertEqual(self.hit(limits), 0)
+        # The per-second window has room again, the per-minute one does not
+        self.assertAlmostEqual(self.hit(limits), 19)
+
+    def test_buckets_are_independent(self):
+        self.hit({60: 1}, key='a')
+        self.assertGreater(self.hit({60: 1}, key='a'), 0)
+        self.assertEqual(self.hit({60: 1}, key='b'), 0)
+
+    def test_retry_after_header_rounds_up(self):
+        self.assertEqual(retry_after_header(0.2), '1')
+        self.assertEqual(retry_after_header(3.01), '4')
+
+
+class CacheRateLimiterTest(LocalRateLimiterTest):
+    """The same semantics kept in the cache, shared by every worker using it"""
+
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        self.limiter = CacheRateLimiter(clock=self.clock)
+
+    def reset(self):
+        cache.clear()
+
+    def test_workers_share_one_limit(self):
+        other_worker = CacheRateLimiter(clock=self.clock)
+        for _ in range(2):
+            self.hit({60: 3})
+        self.assertEqual(other_worker.hit(['client:60'], [(60, 3)]), 0)
+        self.assertGreater(self.hit({60: 3}), 0)
+        self.assertNotIn('client:60:lock', cache)
+
+
+@override_settings(MIDDLEWARE=[
+    'api.middleware.RequestTrackingMiddleware',
+    'api.middleware.RateLimitingMiddleware',
+])
+class RateLimitingMiddlewareTest(TestCase):
+    """Anonymous API clients get 20 requests a minute per route template"""
+
+    def setUp(self):
+        cache.clear()
+        rate_limiter.reset()
+
+    def test_detail_urls_share_one_bucket_and_429_has_retry_after(self):
+        for pk in range(1, 21):
+            response = self.client.get(reverse('mentor-detail', kwargs={'pk': pk}))
+            self.assertNotEqual(response.status_code, 429)
+
+        response = self.client.get(reverse('mentor-detail', kwargs={'pk': 99}))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(response.json()['error']['retry_after'], 3)
+
+        # Other routes have their own bucket
+        self.assertNotEqual(self.client.get(reverse('mentor-list')).status_code, 429)
+
+    def test_clients_are_limited_separately(self):
+        url = reverse('mentor-detail', kwargs={'pk': 1})
+        for _ in range(20):
+            self.client.get(url, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.1').status_code, 429)
+        self.assertNotEqual(self.client.get(url, REMOTE_ADDR='10.0.0.2').status_code, 429)
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_can_be_disabled(self):
+        url = reverse('mentor-detail', kwargs={'pk': 1})
+        for _ in range(25):
+            self.assertNotEqual(self.client.get(url).status_code, 429)
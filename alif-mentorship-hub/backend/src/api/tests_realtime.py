@@ -0,0 +1,147 @@
+"""
+Realtime Test Suite
+WebSocket push for new messages, read receipts and unread counts
+"""
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.consumers import JWTQueryAuthMiddleware
+from api.models import User, Message
+from api.routing import websocket_urlpatterns
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+application = JWTQueryAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+class MessagingConsumerTest(TestCase):
+    """Participants hear about changes without polling the REST endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(username='student', password='testpass123', role='student')
+        self.mentor = User.objects.create_user(username='mentor', password='testpass123', role='mentor')
+        # A fresh layer per test; its queues belong to that test's event loop
+        self.enterContext(override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS))
+        self.communicators = []
+
+    async def connect(self, user=None, token=None):
+        if token is None:
+            token = str(RefreshToken.for_user(user).access_token)
+        communicator = WebsocketCommunicator(application, f'/ws/messages/?token={token}')
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def open(self, user):
+        communicator, connected = await self.connect(user)
+        self.assertTrue(connected)
+        self.communicators.append(communicator)
+        return communicator
+
+    async def close_all(self):
+        for communicator in self.communicators:
+            await communicator.disconnect()
+
+    def post_message(self, sender, recipient, content='Hello'):
+        client = APIClient()
+        client.force_authenticate(user=sender)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse('message-list-create'), {'recipient_id': recipient.id, 'content': content})
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def mark_read(self, user, message_id):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse('message-mark-read', kwargs={'pk': message_id}), {}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def read_conversation(self, user, partner):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse('conversation-mark-read', kwargs={'user_id': partner.id}), {}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    async def test_rejects_missing_or_invalid_token(self):
+        for token in ('', 'not-a-jwt'):
+            communicator, connected = await self.connect(token=token)
+            self.assertFalse(connected)
+
+    async def test_connect_reports_current_unread_count(self):
+        await sync_to_async(Message.objects.create)(sender=self.mentor, recipient=self.student, content='Hi')
+        student = await self.open(self.student)
+        self.assertEqual(await student.receive_json_from(), {'type': 'unread_count', 'unread_count': 1})
+        await self.close_all()
+
+    async def test_new_message_reaches_both_participants(self):
+        student = await self.open(self.student)
+        mentor = await self.open(self.mentor)
+        await student.receive_json_from()
+        await mentor.receive_json_from()
+
+        data = await sync_to_async(self.post_message)(self.student, self.mentor, 'Can we meet?')
+
+        for communicator in (student, mentor):
+            frame = await communicator.receive_json_from()
+            self.assertEqual(frame['type'], 'message')
+            self.assertEqual(frame['message']['id'], data['id'])
+            self.assertEqual(frame['message']['content'], 'Can we meet?')
+        self.assertEqual(await mentor.receive_json_from(), {'type': 'unread_count', 'unread_count': 1})
+        # The sender's unread count did not change, so nothing else is pushed to them
+        self.assertTrue(await student.receive_nothing())
+        await self.close_all()
+
+    async def test_read_receipt_and_unread_count(self):
+        message = await sync_to_async(Message.objects.create)(sender=self.student, recipient=self.mentor, content='Hi')
+        student = await self.open(self.student)
+        mentor = await self.open(self.mentor)
+        await student.receive_json_from()
+        await mentor.receive_json_from()
+
+        await sync_to_async(self.mark_read)(self.mentor, message.id)
+
+        receipt = await student.receive_json_from()
+        self.assertEqual(receipt['type'], 'read')
+        self.assertEqual(receipt['reader_id'], self.mentor.id)
+        self.assertEqual(receipt['message_ids'], [message.id])
+        self.assertEqual(await mentor.receive_json_from(), {'type': 'unread_count', 'unread_count': 0})
+
+        # Marking it read again changes nothing and pushes nothing
+        await sync_to_async(self.mark_read)(self.mentor, message.id)
+        self.assertTrue(await student.receive_nothing())
+        await self.close_all()
+
+    async def test_ping(self):
+        student = await self.open(self.student)
+        await student.receive_json_from()
+        await student.send_json_to({'type': 'ping'})
+        self.assertEqual(await student.receive_json_from(), {'type': 'pong'})
+        await self.close_all()
+
+    def test_rest_endpoints_work_without_a_channel_layer(self):
+        with override_settings(CHANNEL_LAYERS={}):
+            data = self.post_message(self.student, self.mentor)
+            self.mark_read(self.mentor, data['id'])
+        self.assertTrue(Message.objects.get(pk=data['id']).is_read)
+
+    async def test_conversation_read_receipt(self):
+        await sync_to_async(Message.objects.create)(sender=self.student, recipient=self.mentor, content='Hi')
+        student = await self.open(self.student)
+        await student.receive_json_from()
+
+        await sync_to_async(self.read_conversation)(self.mentor, self.student)
+
+        receipt = await student.receive_json_from()
+        self.assertEqual(receipt['type'], 'read')
+        self.assertIsNone(receipt['message_ids'])
+        self.assertIsNone(receipt['up_to_message_id'])
+        await self.close_all()
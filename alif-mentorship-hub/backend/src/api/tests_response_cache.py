@@ -0,0 +1,142 @@
+"""
+Response Cache Test Suite
+Shared cache of anonymous GET responses, tag invalidation and counters
+"""
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import MentorProfile, Resource, Review, Session, User
+from api.rate_limiting import rate_limiter
+from api.response_cache import response_cache_info, response_cache_key, response_cache_stats
+
+
+class JSONLocMemCache(LocMemCache):
+    """LocMem limited to JSON values, like the production redis serializer"""
+
+    def set(self, key, value, timeout=None, version=None):
+        super().set(key, json.dumps(value), timeout, version)
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, version=version)
+        return default if value is None else json.loads(value)
+
+
+@override_settings(ANONYMOUS_RESPONSE_CACHE_TIMEOUT=300)
+class AnonymousResponseCacheTest(APITestCase):
+    def setUp(self):
+        # Also resets the rate limiter, whose buckets live in the same cache
+        cache.clear()
+        rate_limiter.reset()
+        response_cache_stats.counts.clear()
+        self.mentor = User.objects.create_user(username='mentor1', password='testpass123', role='mentor')
+        self.profile = MentorProfile.objects.create(
+            user=self.mentor, university='SIMAD University', graduation_year=2020,
+            field_of_study='Computer Science', is_verified=True,
+        )
+        self.student = User.objects.create_user(username='student1', password='testpass123', role='student')
+
+    def get(self, url, *args, **kwargs):
+        """A GET that must succeed, so a 429 or 500 is reported as such instead of a missing X-Cache"""
+        response = self.client.get(url, *args, **kwargs)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        return response
+
+    def test_second_anonymous_request_is_served_without_queries(self):
+        url = reverse('mentor-list')
+        first = self.get(url, {'sort': 'rating', 'field': 'Computer'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        # Same query string in another order is the same entry
+        with self.assertNumQueries(0):
+            second = self.get(f'{url}?field=Computer&sort=rating')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+        self.assertEqual(self.get(url, {'sort': 'newest'})['X-Cache'], 'MISS')
+
+    def test_tags_are_invalidated_from_signals(self):
+        detail, reviews = reverse('mentor-detail', args=[self.profile.pk]), reverse('mentor-reviews', args=[self.profile.pk])
+        for url in (detail, reviews):
+            self.get(url)
+
+        session = Session.objects.create(
+            student=self.student, mentor=self.mentor, status='completed',
+            requested_time=timezone.now() - timedelta(days=1),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(session=session, rating=4, comment='Clear and patient')
+
+        response = self.get(reviews)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(response.data['results'][0]['comment'], 'Clear and patient')
+        response = self.get(detail)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(response.data['review_count'], 1)
+        self.assertEqual(self.get(detail)['X-Cache'], 'HIT')
+
+        resources = reverse('resource-list-create')
+        self.get(resources)
+        with self.captureOnCommitCallbacks(execute=True):
+            Resource.objects.create(title='Scholarships 2027', category='scholarships', body='...',
+                                    published_at=timezone.now())
+        response = self.get(resources)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_authenticated_and_failed_requests_bypass_the_cache(self):
+        missing = reverse('mentor-detail', args=[self.profile.pk + 100])
+        for _ in range(2):
+            self.assertEqual(self.client.get(missing).status_code, 404)
+        self.assertEqual(response_cache_info()['misses'], 2)
+
+        url = reverse('mentor-list')
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        self.client.force_authenticate(self.student)
+        response = self.get(url)
+        self.assertFalse(response.has_header('X-Cache'))
+        self.assertEqual(response['Cache-Control'], 'max-age=30, private')
+
+    def test_counters(self):
+        url = reverse('resource-list-create')
+        self.get(url)
+        self.get(url)
+        info = response_cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['stale']), (1, 1, 0))
+        self.assertEqual(info['hit_rate'], 0.5)
+        self.assertEqual(info['by_view'], {'ResourceListCreateView': {'hit': 1, 'miss': 1, 'stale': 0}})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'api.tests_response_cache.JSONLocMemCache'}})
+    def test_entries_survive_a_json_serializer(self):
+        url = reverse('mentor-detail', args=[self.profile.pk])
+        first = self.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        second = self.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+    @override_settings(ANONYMOUS_RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.assertFalse(self.get(reverse('mentor-list')).has_header('X-Cache'))
+        self.assertFalse(response_cache_info()['enabled'])
+
+
+@override_settings(ALLOWED_HOSTS=['testserver', 'api.example.com'])
+class ResponseCacheKeyTest(SimpleTestCase):
+    def key(self, path, **extra):
+        request = RequestFactory().get(path, **extra)
+        request.accepted_media_type = 'application/json'
+        return response_cache_key(request)
+
+    def test_key_normalisation(self):
+        self.assertEqual(self.key('/api/mentors/?b=2&a=1'), self.key('/api/mentors/?a=1&b=2'))
+        self.assertNotEqual(self.key('/api/mentors/?a=1&a=2'), self.key('/api/mentors/?a=2&a=1'))
+        # Pagination links are absolute, so the host is part of the key
+        self.assertNotEqual(self.key('/api/mentors/'), self.key('/api/mentors/', HTTP_HOST='api.example.com'))
@@ -0,0 +1,445 @@
+"""
+Session Lifecycle Test Suite
+Compare-and-set status transitions, bulk accept/decline, slot reservation,
+no-show detection and reminder dispatch
+"""
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework import status
+
+from api.models import User, MentorProfile, Session, EmailOutbox
+from api.session_state import apply_transition, transition_session
+
+
+class SessionTransitionTest(APITestCase):
+    """Each transition is one conditional UPDATE; losers of a race see 0 rows"""
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            username='student', email='student@example.com', password='testpass123', role='student'
+        )
+        self.mentor = User.objects.create_user(username='mentor', password='testpass123', role='mentor')
+        self.other_mentor = User.objects.create_user(username='other', password='testpass123', role='mentor')
+
+    def create_session(self, mentor=None, status_='pending', hours=48):
+        return Session.objects.create(
+            student=self.student,
+            mentor=mentor or self.mentor,
+            status=status_,
+            requested_time=timezone.now() + timedelta(hours=hours),
+            goal='Career advice'
+        )
+
+    def test_conditional_update_only_moves_allowed_statuses(self):
+        """A second actor racing on the same pending session changes nothing"""
+        session = self.create_session()
+        scope = Session.objects.filter(pk=session.pk)
+        self.assertEqual(apply_transition(scope, 'accepted', meet_link='https://meet.example.com/a'), 1)
+        self.assertEqual(apply_transition(scope, 'declined'), 0)
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'accepted')
+
+    def test_transition_session_reports_missing_and_rejected(self):
+        session = self.create_session(status_='completed')
+        found, changed = transition_session(Session.objects.filter(mentor=self.mentor), session.pk, 'accepted')
+        self.assertEqual((found.pk, changed), (session.pk, False))
+        found, changed = transition_session(Session.objects.filter(mentor=self.other_mentor), session.pk, 'accepted')
+        self.assertEqual((found, changed), (None, False))
+
+    def test_accept_view(self):
+        """Accept is a guarded UPDATE; a repeat accept is rejected"""
+        session = self.create_session()
+        url = reverse('session-accept', kwargs={'pk': session.pk})
+        self.client.force_authenticate(user=self.mentor)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'meet_link': 'https://meet.example.com/a'})
+        # No read-then-check: the guarded UPDATE is the view's first
+        # statement on the session table (middleware may query other tables)
+        statements = [query['sql'] for query in queries if '"api_session"' in query['sql']]
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        self.assertIn('"status" IN', statements[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'accepted')
+        self.assertEqual(response.data['meet_link'], 'https://meet.example.com/a')
+        self.assertEqual(EmailOutbox.queue_depth(), 1)
+
+        response = self.client.post(url, {'meet_link': 'https://meet.example.com/b'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        session.refresh_from_db()
+        self.assertEqual(session.meet_link, 'https://meet.example.com/a')
+
+    def test_other_mentor_gets_404(self):
+        session = self.create_session()
+        self.client.force_authenticate(user=self.other_mentor)
+        response = self.client.post(reverse('session-decline', kwargs={'pk': session.pk}), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'pending')
+
+    def test_accept_without_link_looks_the_session_up_first(self):
+        """Ownership and status are checked before the missing meet_link"""
+        session = self.create_session()
+        closed = self.create_session(status_='completed', hours=72)
+
+        def accept(pk):
+            return self.client.post(reverse('session-accept', kwargs={'pk': pk}), {}, format='json')
+
+        self.client.force_authenticate(user=self.other_mentor)
+        self.assertEqual(accept(session.pk).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(accept(999999).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.mentor)
+        response = accept(closed.pk)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("status 'completed'", response.data['error'])
+        response = accept(session.pk)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('meet_link is required', response.data['error'])
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'pending')
+
+    def test_late_cancel_of_accepted_session_applies_penalty(self):
+        session = self.create_session(status_='accepted', hours=2)
+        self.client.force_authenticate(user=self.student)
+        response = self.client.post(reverse('session-cancel', kwargs={'pk': session.pk}), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'cancelled')
+        self.assertIn('warning', response.data)
+
+        response = self.client.post(reverse('session-cancel', kwargs={'pk': session.pk}), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('can be cancelled', response.data['error'])
+
+    def test_bulk_accept(self):
+        """Only this mentor's pending sessions move; everything else is skipped"""
+        pending = [self.create_session() for _ in range(3)]
+        accepted = self.create_session(status_='accepted')
+        foreign = self.create_session(mentor=self.other_mentor)
+        ids = [s.pk for s in pending] + [accepted.pk, foreign.pk, 999999]
+
+        self.client.force_authenticate(user=self.mentor)
+        response = self.client.post(reverse('session-bulk-transition'), {
+            'action': 'accept',
+            'session_ids': ids,
+            'meet_link': 'https://meet.example.com/room',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual([s['id'] for s in response.data['sessions']], [s.pk for s in pending])
+        self.assertEqual(response.data['skipped'], [accepted.pk, foreign.pk, 999999])
+        self.assertEqual(EmailOutbox.queue_depth(), 3)
+        self.assertEqual(
+            Session.objects.filter(mentor=self.mentor, status='accepted').count(), 4
+        )
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.status, 'pending')
+
+    def test_bulk_validation(self):
+        self.client.force_authenticate(user=self.mentor)
+        url = reverse('session-bulk-transition')
+        for body in (
+            {'action': 'complete', 'session_ids': [1]},
+            {'action': 'decline', 'session_ids': []},
+            {'action': 'decline', 'session_ids': list(range(1, 102))},
+            {'action': 'decline', 'session_ids': ['x']},
+            {'action': 'accept', 'session_ids': [1]},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(url, body, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.student)
+        response = self.client.post(url, {'action': 'decline', 'session_ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+def create_bookable_mentor(username='mentor'):
+    mentor = User.objects.create_user(username=username, password='testpass123', role='mentor')
+    MentorProfile.objects.create(
+        user=mentor,
+        university='Test University',
+        graduation_year=2020,
+        field_of_study='Computer Science',
+        is_verified=True,
+        timezone='UTC',
+        availability=[{'day': day, 'start_time': '00:00', 'end_time': '24:00'} for day in range(7)]
+    )
+    return mentor
+
+
+class SlotReservationTest(APITestCase):
+    """An active session owns its (mentor, requested_time) slot at the database level"""
+
+    def setUp(self):
+        self.mentor = create_bookable_mentor()
+        self.students = [
+            User.objects.create_user(username=f'student{i}', password='testpass123', role='student')
+            for i in range(2)
+        ]
+        self.slot = (timezone.now() + timedelta(days=3)).replace(minute=0, second=0, microsecond=0)
+
+    def book(self, student):
+        self.client.force_authenticate(user=student)
+        return self.client.post(reverse('session-list-create'), {
+            'mentor_id': self.mentor.pk,
+            'requested_time': self.slot.isoformat(),
+            'goal': 'Career advice',
+        }, format='json')
+
+    def test_second_booking_of_a_slot_conflicts(self):
+        self.assertEqual(self.book(self.students[0]).status_code, status.HTTP_201_CREATED)
+        response = self.book(self.students[1])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['error']['code'], 'RESOURCE_CONFLICT')
+        self.assertEqual(Session.objects.filter(mentor=self.mentor).count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_conflicts(self):
+        error = IntegrityError('FOREIGN KEY constraint failed')
+        with mock.patch.object(Session.objects, 'create', side_effect=error):
+            response = self.book(self.students[0])
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def test_released_slot_can_be_rebooked(self):
+        """Declined, cancelled and completed sessions no longer hold the slot"""
+        for released in ('declined', 'cancelled', 'completed'):
+            with self.subTest(released=released):
+                Session.objects.filter(mentor=self.mentor).delete()
+                self.assertEqual(self.book(self.students[0]).status_code, status.HTTP_201_CREATED)
+                Session.objects.filter(mentor=self.mentor).update(status=released)
+                self.assertEqual(self.book(self.students[1]).status_code, status.HTTP_201_CREATED)
+
+    def test_other_mentors_are_independent(self):
+        other = create_bookable_mentor('other')
+        Session.objects.create(
+            student=self.students[0], mentor=other, requested_time=self.slot, goal='Career advice'
+        )
+        self.assertEqual(self.book(self.students[1]).status_code, status.HTTP_201_CREATED)
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class ConcurrentBookingTest(TransactionTestCase):
+    """Parallel bookings of one slot: exactly one INSERT wins, the rest get 409"""
+
+    workers = 8
+
+    def test_parallel_bookings_for_the_same_slot(self):
+        mentor = create_bookable_mentor()
+        students = [
+            User.objects.create_user(username=f'student{i}', password='testpass123', role='student')
+            for i in range(self.workers)
+        ]
+        slot = (timezone.now() + timedelta(days=3)).replace(minute=0, second=0, microsecond=0)
+        barrier = threading.Barrier(self.workers)
+        codes = []
+
+        def book(student):
+            client = APIClient()
+            client.force_authenticate(user=student)
+            try:
+                barrier.wait()
+                response = client.post(reverse('session-list-create'), {
+                    'mentor_id': mentor.pk,
+                    'requested_time': slot.isoformat(),
+                    'goal': 'Career advice',
+                }, format='json')
+                codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(student,)) for student in students]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(codes.count(status.HTTP_409_CONFLICT), self.workers - 1)
+        self.assertEqual(Session.objects.filter(mentor=mentor, status='pending').count(), 1)
+
+
+class DetectNoShowsTest(APITestCase):
+    """Chunked, set-based no-show detection matches the per-session penalties"""
+
+    def setUp(self):
+        self.mentor = User.objects.create_user(username='mentor', password='testpass123', role='mentor')
+        self.repeat = User.objects.create_user(username='repeat', password='testpass123', role='student')
+        self.once = User.objects.create_user(
+            username='once', password='testpass123', role='student', cancellation_count=1
+        )
+        now = timezone.now()
+        self.overdue = [
+            self.create_session(self.repeat, now - timedelta(days=2)),
+            self.create_session(self.repeat, now - timedelta(days=1)),
+            self.create_session(self.once, now - timedelta(hours=3)),
+        ]
+        self.untouched = [
+            self.create_session(self.once, now - timedelta(hours=1)),  # inside the grace period
+            self.create_session(self.once, now - timedelta(days=3), status_='pending'),
+            self.create_session(self.repeat, now + timedelta(days=1)),
+        ]
+
+    def create_session(self, student, requested_time, status_='accepted'):
+        return Session.objects.create(
+            student=student, mentor=self.mentor, status=status_,
+            requested_time=requested_time, goal='Career advice'
+        )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('detect_no_shows', *args, stdout=out)
+        return out.getvalue()
+
+    def test_cancels_overdue_sessions_and_penalises_students(self):
+        output = self.run_command('--batch-size', '2')
+        self.assertIn('Processed 3 no-show(s) for 2 student(s) in 2 batch(es)', output)
+
+        for session in self.overdue:
+            session.refresh_from_db()
+            self.assertEqual(session.status, 'cancelled')
+            self.assertIn('no-show', session.mentor_notes)
+        for session in self.untouched:
+            previous = session.status
+            session.refresh_from_db()
+            self.assertEqual(session.status, previous)
+
+        self.repeat.refresh_from_db()
+        self.assertEqual(self.repeat.no_show_count, 2)
+        self.assertEqual(self.repeat.reliability_score, 60.0)
+        self.assertTrue(self.repeat.is_restricted())
+
+        self.once.refresh_from_db()
+        self.assertEqual(self.once.no_show_count, 1)
+        self.assertEqual(self.once.reliability_score, 70.0)
+        self.assertFalse(self.once.is_restricted())
+
+        self.assertIn('No no-shows detected.', self.run_command())
+
+    def test_second_no_show_restricts_and_score_floors_at_zero(self):
+        User.objects.filter(pk=self.once.pk).update(no_show_count=5, cancellation_count=3)
+        self.run_command()
+        self.once.refresh_from_db()
+        self.assertEqual(self.once.no_show_count, 6)
+        self.assertEqual(self.once.reliability_score, 0.0)
+        self.assertTrue(self.once.is_restricted())
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_command('--dry-run', '--batch-size', '1')
+        self.assertIn('3 no-show(s) across 2 student(s). Dry run', output)
+        self.assertEqual(Session.objects.filter(status='cancelled').count(), 0)
+        self.repeat.refresh_from_db()
+        self.assertEqual((self.repeat.no_show_count, self.repeat.reliability_score), (0, 100.0))
+
+    def test_rejects_non_positive_batch_size(self):
+        for size in ('0', '-5'):
+            with self.subTest(size=size), self.assertRaises(CommandError):
+                self.run_command('--batch-size', size)
+        self.assertEqual(Session.objects.filter(status='cancelled').count(), 0)
+
+
+class CountingEmailBackend(EmailBackend):
+    """locmem backend that records how many connections were opened"""
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return True
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP unavailable')
+
+
+class MentorFailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        if any('mentor@example.com' in message.to for message in messages):
+            raise ConnectionError('Mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class SessionReminderTest(APITestCase):
+    """send_session_reminders claims each due session once and batches its emails"""
+
+    def setUp(self):
+        self.mentor = User.objects.create_user(
+            username='mentor', email='mentor@example.com', password='testpass123', role='mentor'
+        )
+        self.student = User.objects.create_user(
+            username='student', email='student@example.com', password='testpass123', role='student'
+        )
+        now = timezone.now()
+        self.due = [
+            self.create_session(now + timedelta(hours=2)),
+            self.create_session(now + timedelta(hours=20)),
+        ]
+        self.create_session(now + timedelta(hours=30))
+        self.create_session(now + timedelta(hours=5), status_='pending')
+        self.create_session(now + timedelta(hours=6), reminder_sent_at=now)
+        CountingEmailBackend.opened = 0
+
+    def create_session(self, requested_time, status_='accepted', **extra):
+        return Session.objects.create(
+            student=self.student, mentor=self.mentor, status=status_,
+            requested_time=requested_time, goal='Career advice', **extra
+        )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('send_session_reminders', *args, stdout=out)
+        return out.getvalue()
+
+    @override_settings(EMAIL_BACKEND='api.tests_sessions.CountingEmailBackend')
+    def test_sends_each_reminder_once_over_one_connection_per_batch(self):
+        output = self.run_command('--batch-size', '1')
+        self.assertIn('Sent 4 reminder email(s) in 2 batch(es)', output)
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            ['mentor@example.com'] * 2 + ['student@example.com'] * 2
+        )
+        for session in self.due:
+            session.refresh_from_db()
+            self.assertIsNotNone(session.reminder_sent_at)
+
+        self.assertIn('No reminders due.', self.run_command())
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_dry_run(self):
+        self.assertIn('2 reminder(s) due. Dry run', self.run_command('--dry-run'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Session.objects.filter(pk__in=[s.pk for s in self.due], reminder_sent_at__isnull=False))
+
+    @override_settings(EMAIL_BACKEND='api.tests_sessions.FailingEmailBackend')
+    def test_failed_sends_are_released_for_retry(self):
+        output = self.run_command()
+        self.assertIn('2 session(s) failed and were released for retry.', output)
+        self.assertEqual(
+            Session.objects.filter(pk__in=[s.pk for s in self.due], reminder_sent_at__isnull=True).count(), 2
+        )
+
+    @override_settings(EMAIL_BACKEND='api.tests_sessions.MentorFailingEmailBackend')
+    def test_only_the_failed_recipient_is_retried(self):
+        output = self.run_command()
+        self.assertIn('Sent 2 reminder email(s)', output)
+        self.assertIn('2 reminder email(s) failed and were queued for retry.', output)
+        self.assertEqual([m.to for m in mail.outbox], [['student@example.com']] * 2)
+        self.assertFalse(Session.objects.filter(pk__in=[s.pk for s in self.due], reminder_sent_at__isnull=True))
+        self.assertEqual(
+            list(EmailOutbox.objects.values_list('recipients', flat=True)), [['mentor@example.com']] * 2
+        )
+
+        self.assertIn('No reminders due.', self.run_command())
+        self.assertEqual(len(mail.outbox), 2)
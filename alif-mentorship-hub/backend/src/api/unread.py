@@ -0,0 +1,43 @@
+"""
+Unread Message Counters
+Per-user unread totals kept in the cache and adjusted on write, so the
+unread badge does not COUNT(*) api_message on every poll
+"""
+from django.core.cache import cache
+
+
+# Keys expire without being refreshed by incr/decr, so every counter is
+# rebuilt from the database at least this often and any drift is bounded
+UNREAD_COUNT_TIMEOUT = 15 * 60  # seconds
+
+
+def unread_count_key(user_id):
+    return f'unread_count:{user_id}'
+
+
+def get_cached_unread_count(user_id):
+    """The cached total, or None when it has to be rebuilt"""
+    return cache.get(unread_count_key(user_id))
+
+
+def store_unread_count(user_id, count):
+    # add() so a rebuild never overwrites a counter a writer created meanwhile
+    cache.add(unread_count_key(user_id), count, UNREAD_COUNT_TIMEOUT)
+
+
+def increment_unread_count(user_id, delta=1):
+    try:
+        cache.incr(unread_count_key(user_id), delta)
+    except ValueError:
+        pass  # Not cached; the next read rebuilds it from the database
+
+
+def decrement_unread_count(user_id, delta=1):
+    key = unread_count_key(user_id)
+    try:
+        count = cache.decr(key, delta)
+    except ValueError:
+        return
+    if count < 0:
+        # The counter drifted below zero; drop it and rebuild on the next read
+        cache.delete(key)
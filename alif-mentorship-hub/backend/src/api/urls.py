@@ -6,6 +6,7 @@ from .views import (
     AdminMentorListView, AdminMentorVerifyView, AdminMentorRejectView,
     SessionListCreateView, SessionDetailView,
     SessionAcceptView, SessionDeclineView, SessionCompleteView, SessionCancelView,
+    SessionBulkTransitionView,
     SessionReviewView, SessionFeedbackView, SessionReportView,
     ResourceListCreateView, ResourceDetailView,
     AdminStatsView,
@@ -17,8 +18,8 @@ from .views import (
     AdminAuditLogView,
     MentorFavoriteListView, MentorFavoriteToggleView,
     SavedSearchListCreateView, SavedSearchDetailView,
-    MentorAvailabilityView,
-    MessageListCreateView, ConversationListView, MessageMarkAsReadView, UnreadMessageCountView,
+    MentorAvailabilityView, MentorAvailabilityBatchView,
+    MessageListCreateView, ConversationListView, ConversationMarkAsReadView, MessageMarkAsReadView, UnreadMessageCountView,
     SessionAnalyticsDetailView, StudentAnalyticsView, MentorAnalyticsView,
 )
 
@@ -32,6 +33,7 @@ urlpatterns = [
     # ── Mentor Profiles (public) ───────────────────────────────────────────
     path('mentors/',                      MentorListView.as_view(),         name='mentor-list'),
     path('mentors/me/',                   MentorMeView.as_view(),           name='mentor-me'),
+    path('mentors/availability/batch/',   MentorAvailabilityBatchView.as_view(), name='mentor-availability-batch'),
     path('mentors/<int:pk>/',             MentorDetailView.as_view(),       name='mentor-detail'),
     path('mentors/<int:pk>/reviews/',     MentorReviewListView.as_view(),   name='mentor-reviews'),
     path('mentors/<int:pk>/availability/', MentorAvailabilityView.as_view(), name='mentor-availability'),
@@ -54,6 +56,7 @@ urlpatterns = [
 
     # ── Sessions ───────────────────────────────────────────────────────────
     path('sessions/',                           SessionListCreateView.as_view(), name='session-list-create'),
+    path('sessions/bulk-transition/',           SessionBulkTransitionView.as_view(), name='session-bulk-transition'),
     path('sessions/<int:pk>/',                  SessionDetailView.as_view(),     name='session-detail'),
     path('sessions/<int:pk>/accept/',           SessionAcceptView.as_view(),     name='session-accept'),
     path('sessions/<int:pk>/decline/',          SessionDeclineView.as_view(),    name='session-decline'),
@@ -99,6 +102,7 @@ urlpatterns = [
     # ── Real-Time Messaging (Phase 3) ──────────────────────────────────────
     path('messages/',                           MessageListCreateView.as_view(),         name='message-list-create'),
     path('conversations/',                      ConversationListView.as_view(),          name='conversation-list'),
+    path('conversations/<int:user_id>/read/',   ConversationMarkAsReadView.as_view(),    name='conversation-mark-read'),
     path('messages/<int:pk>/read/',             MessageMarkAsReadView.as_view(),         name='message-mark-read'),
     path('messages/unread-count/',              UnreadMessageCountView.as_view(),        name='unread-count'),
     
@@ -1,16 +1,20 @@
 import logging
+import time
+from collections import defaultdict
+from datetime import timezone as dt_timezone
 from django.db.models import Q, Count, Avg, Prefetch
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db import transaction
 from django.core.cache import cache
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import User, MentorProfile, Session, Review, StudentFeedback, Resource, Report, AuditLog, PlatformSettings, AdminNotificationSettings, MentorFavorite, SavedSearch, Message, SessionAnalytics
+from .models import User, MentorProfile, Session, Review, StudentFeedback, Resource, Report, AuditLog, PlatformSettings, AdminNotificationSettings, MentorFavorite, SavedSearch, Message, SessionAnalytics, EmailOutbox, Conversation
 from .serializers import (
     RegisterSerializer, MentorProfileSerializer, MentorProfileUpdateSerializer,
     SessionSerializer, SessionDetailSerializer, ReviewSerializer, StudentFeedbackSerializer, ResourceSerializer,
@@ -37,13 +41,24 @@ from .email import (
     send_report_resolved_notification,
     send_session_cancelled_notification,
 )
-from .secure_logging import get_secure_logger, log_user_action, log_error_safely, security_logger
+from .secure_logging import get_secure_logger, log_user_action, log_error_safely, queued_logging_stats, security_logger
+from .response_cache import response_cache_info
 from .error_handling import (
     ErrorHandlingMixin, ErrorCode, ErrorResponseBuilder, 
     raise_business_error, raise_resource_conflict, EnterpriseAPIException
 )
 from .input_sanitization import InputSanitizer, SecureValidationMixin, sanitize_request_data
-from .database_optimization import DatabaseOptimizer, QueryOptimizer
+from .database_optimization import DatabaseOptimizer, QueryOptimizer, MentorSearch
+from .pagination import KeysetPageNumberPagination
+from .conditional import ConditionalGetMixin, apply_cache_policy, content_etag, not_modified
+from .session_state import MAX_BULK_TRANSITION, VALID_TRANSITIONS, transition_session, transition_sessions
+from .realtime import publish_message, publish_read
+from .unread import decrement_unread_count
+from .availability import (
+    ALLOWED_SLOT_MINUTES, AVAILABILITY_CACHE_TIMEOUT, BOOKED_STATUSES, MAX_BATCH_MENTORS, MAX_RANGE_DAYS,
+    availability_cache_key, availability_cache_keys, booking_query_bounds, build_free_slot_payload,
+    filter_available_at, filter_available_window, get_session_minutes, parse_minutes,
+)
 
 # Setup secure logging
 logger = get_secure_logger('api')
@@ -230,10 +245,17 @@ class LoginView(APIView, ErrorHandlingMixin):
 # ─────────────────────────────────────────────
 # Mentor Profiles — Public
 # ─────────────────────────────────────────────
-class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
+class MentorListView(ConditionalGetMixin, generics.ListAPIView, ErrorHandlingMixin):
     serializer_class   = MentorProfileSerializer
     permission_classes = [AllowAny]
     throttle_classes   = [AnonRateThrottle, UserRateThrottle]
+    pagination_class   = KeysetPageNumberPagination
+    cache_max_age      = 30
+    vary_on_user       = True
+    shared_cache       = True
+
+    def get_content_scopes(self):
+        return ['mentors']
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -249,7 +271,7 @@ class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
                 # Apply filters with proper validation
                 filters = self._get_validated_filters()
                 qs = self._apply_filters(qs, filters)
-                qs = self._apply_sorting(qs, filters.get('sort'))
+                qs = self._apply_sorting(qs, filters.get('sort'), ranked='q' in filters)
                 
                 log_user_action(
                     user_id=getattr(self.request.user, 'id', None),
@@ -270,6 +292,11 @@ class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
         filters = {}
         
         try:
+            # Full-text search over bio, field of study and university
+            q = self.request.query_params.get('q')
+            if q:
+                filters['q'] = validate_search_string(q, 'q', 100)
+            
             # Basic string filters
             field = self.request.query_params.get('field')
             if field:
@@ -306,6 +333,25 @@ class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
             if sort_by and sort_by in ['rating', 'reviews', 'experience', 'reliability', 'newest']:
                 filters['sort'] = sort_by
             
+            # Availability filters, matched against the compiled UTC bitmap
+            available_at = self.request.query_params.get('available_at')
+            if available_at:
+                # An unencoded '+' in the UTC offset arrives as a space
+                moment = parse_datetime(available_at.replace(' ', '+'))
+                if moment is None:
+                    raise ValueError("available_at must be an ISO 8601 datetime")
+                if timezone.is_naive(moment):
+                    moment = timezone.make_aware(moment, dt_timezone.utc)
+                filters['available_at'] = moment
+            
+            available_day = self.request.query_params.get('available_day')
+            if available_day:
+                from_time = self.request.query_params.get('from')
+                to_time = self.request.query_params.get('to')
+                filters['available_from'] = parse_minutes(from_time) if from_time else None
+                filters['available_to'] = parse_minutes(to_time) if to_time else None
+                filters['available_day'] = safe_int_conversion(available_day, 'available_day', 0, 6)
+            
         except ValueError as e:
             logger.warning(f"Invalid filter parameter: {str(e)}")
             # Continue with valid filters, ignore invalid ones
@@ -314,6 +360,9 @@ class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
     
     def _apply_filters(self, qs, filters):
         """Apply validated filters to queryset"""
+        if filters.get('q'):
+            qs = MentorSearch.apply(qs, filters['q'])
+        
         if filters.get('field'):
             qs = qs.filter(field_of_study__icontains=filters['field'])
         
@@ -326,6 +375,14 @@ class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
         if filters.get('availability'):
             qs = qs.exclude(availability=[])
         
+        if filters.get('available_at'):
+            qs = filter_available_at(qs, filters['available_at'])
+        
+        if 'available_day' in filters:
+            qs = filter_available_window(
+                qs, filters['available_day'], filters['available_from'], filters['available_to']
+            )
+        
         if filters.get('rating_min'):
             qs = qs.filter(average_rating__gte=filters['rating_min'])
         
@@ -337,30 +394,39 @@ class MentorListView(generics.ListAPIView, ErrorHandlingMixin):
         
         return qs
     
-    def _apply_sorting(self, qs, sort_by):
-        """Apply sorting to queryset"""
+    def _apply_sorting(self, qs, sort_by, ranked=False):
+        """Apply sorting to queryset; search relevance ranks ahead of the sort keys"""
         if sort_by == 'rating':
-            return qs.order_by('-average_rating', '-id')
+            ordering = ('-average_rating', '-id')
         elif sort_by == 'reviews':
-            # Use annotation to avoid N+1 queries
-            return qs.annotate(
-                review_count=Count('user__sessions_as_mentor__review')
-            ).order_by('-review_count', '-id')
+            # review_count is denormalised on MentorProfile
+            ordering = ('-review_count', '-id')
         elif sort_by == 'experience':
-            return qs.order_by('-years_of_experience', '-id')
+            ordering = ('-years_of_experience', '-id')
         elif sort_by == 'reliability':
-            return qs.order_by('-user__reliability_score', '-id')
+            ordering = ('-user__reliability_score', '-id')
         elif sort_by == 'newest':
-            return qs.order_by('-id')
+            ordering = ('-id',)
         else:
-            return qs.order_by('-id')
+            ordering = ('-id',)
+        
+        if ranked:
+            ordering = ('-search_rank',) + ordering
+        return qs.order_by(*ordering)
 
 
-class MentorDetailView(generics.RetrieveAPIView):
+class MentorDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     serializer_class   = MentorProfileSerializer
     permission_classes = [AllowAny]
+    cache_max_age      = 60
+    vary_on_user       = True
+    shared_cache       = True
+
     queryset           = MentorProfile.objects.filter(is_verified=True).select_related('user')
 
+    def get_content_scopes(self):
+        return [f"mentor:{self.kwargs['pk']}"]
+
 
 class MentorMeView(APIView):
     permission_classes = [IsMentor]
@@ -386,9 +452,15 @@ class MentorMeView(APIView):
 # ─────────────────────────────────────────────
 # Mentor Reviews — Public
 # ─────────────────────────────────────────────
-class MentorReviewListView(generics.ListAPIView):
+class MentorReviewListView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class   = ReviewSerializer
     permission_classes = [AllowAny]
+    pagination_class   = KeysetPageNumberPagination
+    cache_max_age      = 300
+    shared_cache       = True
+
+    def get_content_scopes(self):
+        return [f"reviews:{self.kwargs['pk']}"]
 
     def get_queryset(self):
         mentor_profile_id = self.kwargs['pk']
@@ -396,7 +468,7 @@ class MentorReviewListView(generics.ListAPIView):
             Review.objects
             .filter(session__mentor__mentor_profile__id=mentor_profile_id)
             .select_related('session__student')
-            .order_by('-created_at')
+            .order_by('-created_at', '-id')
         )
 
 
@@ -406,6 +478,7 @@ class MentorReviewListView(generics.ListAPIView):
 class AdminMentorVerifyView(APIView):
     permission_classes = [IsAdmin]
 
+    @transaction.atomic
     def post(self, request, pk):
         try:
             profile = MentorProfile.objects.get(pk=pk)
@@ -456,17 +529,9 @@ class AdminMentorListView(generics.ListAPIView):
 # ─────────────────────────────────────────────
 # Sessions
 # ─────────────────────────────────────────────
-VALID_TRANSITIONS = {
-    'pending':   ['accepted', 'declined', 'cancelled'],
-    'accepted':  ['completed', 'cancelled'],
-    'declined':  [],
-    'completed': [],
-    'cancelled': [],
-}
-
-
 class SessionListCreateView(generics.ListCreateAPIView):
     throttle_classes = [UserRateThrottle]
+    pagination_class = KeysetPageNumberPagination
     
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -486,7 +551,7 @@ class SessionListCreateView(generics.ListCreateAPIView):
                 'student', 'mentor', 'mentor__mentor_profile'
             ).prefetch_related(
                 'review', 'report', 'student_feedback'
-            ).order_by('-created_at')
+            ).order_by('-created_at', '-id')
             
             if user.role == 'student':
                 qs = qs.filter(student=user)
@@ -521,12 +586,9 @@ class SessionListCreateView(generics.ListCreateAPIView):
             session = serializer.save(student=self.request.user)
             logger.info(f"Session created: {session.id} by {self.request.user.username}")
             
-            # Send notification (wrapped in try-catch to prevent transaction rollback)
-            try:
-                send_session_request_notification(session)
-            except Exception as e:
-                logger.error(f"Failed to send session notification: {str(e)}")
-                # Don't fail the transaction for notification errors
+            # Queued in the outbox within this transaction, so the booking and
+            # its notification commit together
+            send_session_request_notification(session)
                 
         except Exception as e:
             logger.error(f"Session creation failed: {str(e)}")
@@ -568,44 +630,36 @@ class SessionAcceptView(APIView):
 
     @transaction.atomic
     def post(self, request, pk):
-        try:
-            session = Session.objects.select_related('student', 'mentor').get(pk=pk, mentor=request.user)
-        except Session.DoesNotExist:
+        sessions = Session.objects.filter(mentor=request.user)
+        meet_link = request.data.get('meet_link', '').strip()
+        if meet_link:
+            session, changed = transition_session(sessions, pk, 'accepted', meet_link=meet_link)
+        else:
+            # Nothing to write, but the session is still looked up first so
+            # unknown and foreign ids get a 404 rather than a validation error
+            session, changed = sessions.filter(pk=pk).first(), False
+        if session is None:
             logger.warning(f"Session {pk} not found for mentor {request.user.username}")
             return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
-        
-        try:
+        if not changed:
             if 'accepted' not in VALID_TRANSITIONS.get(session.status, []):
                 logger.warning(f"Invalid transition attempt: {session.status} -> accepted for session {pk}")
                 return Response(
                     {'error': f"Cannot accept a session with status '{session.status}'."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            meet_link = request.data.get('meet_link', '').strip()
-            if not meet_link:
-                return Response(
-                    {'error': 'meet_link is required when accepting a session.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            session.status = 'accepted'
-            session.meet_link = meet_link
-            session.save(update_fields=['status', 'meet_link'])
-            
-            logger.info(f"Session {pk} accepted by mentor {request.user.username}")
-            
-            # Send notification (don't fail transaction if notification fails)
-            try:
-                send_session_accepted_notification(session)
-            except Exception as e:
-                logger.error(f"Failed to send acceptance notification: {str(e)}")
-            
-            return Response(SessionDetailSerializer(session).data)
-            
-        except Exception as e:
-            logger.error(f"Error accepting session {pk}: {str(e)}")
-            raise
+            return Response(
+                {'error': 'meet_link is required when accepting a session.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        logger.info(f"Session {pk} accepted by mentor {request.user.username}")
+        
+        # Queued in the outbox (delivered by send_queued_emails); a failed
+        # insert rolls the transition back with it
+        send_session_accepted_notification(session)
+        
+        return Response(SessionDetailSerializer(session).data)
 
 
 class SessionDeclineView(APIView):
@@ -614,52 +668,90 @@ class SessionDeclineView(APIView):
 
     @transaction.atomic
     def post(self, request, pk):
-        try:
-            session = Session.objects.select_related('student', 'mentor').get(pk=pk, mentor=request.user)
-        except Session.DoesNotExist:
+        session, changed = transition_session(Session.objects.filter(mentor=request.user), pk, 'declined')
+        if session is None:
             logger.warning(f"Session {pk} not found for mentor {request.user.username}")
             return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if not changed:
+            logger.warning(f"Invalid transition attempt: {session.status} -> declined for session {pk}")
+            return Response(
+                {'error': f"Cannot decline a session with status '{session.status}'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        logger.info(f"Session {pk} declined by mentor {request.user.username}")
+        
+        send_session_declined_notification(session)
         
+        return Response(SessionDetailSerializer(session).data)
+
+
+class SessionBulkTransitionView(APIView):
+    permission_classes = [IsMentor]
+    throttle_classes   = [UserRateThrottle]
+
+    ACTIONS = {
+        'accept':  ('accepted', send_session_accepted_notification),
+        'decline': ('declined', send_session_declined_notification),
+    }
+
+    def post(self, request):
+        """Accept or decline many pending requests in one transaction"""
+        action = request.data.get('action')
+        if action not in self.ACTIONS:
+            return Response({'error': "action must be 'accept' or 'decline'."}, status=status.HTTP_400_BAD_REQUEST)
+        target, notify = self.ACTIONS[action]
+        
+        session_ids = request.data.get('session_ids')
+        if not isinstance(session_ids, list) or not session_ids:
+            return Response({'error': 'session_ids must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(session_ids) > MAX_BULK_TRANSITION:
+            return Response(
+                {'error': f'At most {MAX_BULK_TRANSITION} session_ids per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         try:
-            if 'declined' not in VALID_TRANSITIONS.get(session.status, []):
-                logger.warning(f"Invalid transition attempt: {session.status} -> declined for session {pk}")
+            session_ids = list(dict.fromkeys(int(session_id) for session_id in session_ids))
+        except (TypeError, ValueError):
+            return Response({'error': 'session_ids must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fields = {}
+        if target == 'accepted':
+            meet_link = str(request.data.get('meet_link', '')).strip()
+            if not meet_link:
                 return Response(
-                    {'error': f"Cannot decline a session with status '{session.status}'."},
+                    {'error': 'meet_link is required when accepting a session.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            session.status = 'declined'
-            session.save(update_fields=['status'])
-            
-            logger.info(f"Session {pk} declined by mentor {request.user.username}")
-            
-            try:
-                send_session_declined_notification(session)
-            except Exception as e:
-                logger.error(f"Failed to send decline notification: {str(e)}")
-            
-            return Response(SessionDetailSerializer(session).data)
-            
-        except Exception as e:
-            logger.error(f"Error declining session {pk}: {str(e)}")
-            raise
+            fields['meet_link'] = meet_link
+        
+        # Transitions and their outbox emails commit or roll back together
+        with transaction.atomic():
+            sessions = transition_sessions(Session.objects.filter(mentor=request.user), session_ids, target, **fields)
+            for session in sessions:
+                notify(session)
+        changed_ids = {session.id for session in sessions}
+        logger.info(f"Bulk {action}: {len(sessions)}/{len(session_ids)} sessions by mentor {request.user.username}")
+        
+        return Response({
+            'updated': len(sessions),
+            'sessions': SessionDetailSerializer(sessions, many=True).data,
+            'skipped': [session_id for session_id in session_ids if session_id not in changed_ids],
+        })
 
 
 class SessionCompleteView(APIView):
     permission_classes = [IsMentor]
 
+    @transaction.atomic
     def post(self, request, pk):
-        try:
-            session = Session.objects.get(pk=pk, mentor=request.user)
-        except Session.DoesNotExist:
+        notes = request.data.get('mentor_notes', '').strip()
+        fields = {'mentor_notes': notes} if notes else {}
+        session, changed = transition_session(Session.objects.filter(mentor=request.user), pk, 'completed', **fields)
+        if session is None:
             return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
-        if 'completed' not in VALID_TRANSITIONS.get(session.status, []):
+        if not changed:
             return Response({'error': f"Cannot complete a session with status '{session.status}'."}, status=status.HTTP_400_BAD_REQUEST)
-        notes = request.data.get('mentor_notes', '').strip()
-        session.status = 'completed'
-        if notes:
-            session.mentor_notes = notes
-        session.save(update_fields=['status', 'mentor_notes'])
         send_session_completed_notification(session)
         return Response(SessionDetailSerializer(session).data)
 
@@ -667,19 +759,32 @@ class SessionCompleteView(APIView):
 class SessionCancelView(APIView):
     permission_classes = [IsStudent]
 
+    @transaction.atomic
     def post(self, request, pk):
         try:
             session = Session.objects.get(pk=pk, student=request.user)
         except Session.DoesNotExist:
             return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
         
-        if session.status not in ['pending', 'accepted']:
+        if 'cancelled' not in VALID_TRANSITIONS.get(session.status, []):
             return Response({'error': 'Only pending or accepted sessions can be cancelled.'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # Compare-and-set on the status we just read: the penalty below
+        # depends on it, so a concurrent accept/decline must win or lose cleanly
+        previous_status = session.status
+        session, changed = transition_session(
+            Session.objects.filter(student=request.user), pk, 'cancelled', from_statuses=[previous_status]
+        )
+        if not changed:
+            return Response(
+                {'error': f"Session status changed to '{session.status}' before it could be cancelled."},
+                status=status.HTTP_409_CONFLICT
+            )
+        
         # Check if cancellation is within 24 hours of session
         hours_until_session = (session.requested_time - timezone.now()).total_seconds() / 3600
         
-        if hours_until_session < 24 and session.status == 'accepted':
+        if hours_until_session < 24 and previous_status == 'accepted':
             # Late cancellation - apply penalty
             request.user.apply_cancellation_penalty()
             warning_message = (
@@ -695,8 +800,6 @@ class SessionCancelView(APIView):
         else:
             warning_message = None
         
-        session.status = 'cancelled'
-        session.save(update_fields=['status'])
         send_session_cancelled_notification(session, request.user)
         
         response_data = SessionDetailSerializer(session).data
@@ -791,6 +894,7 @@ class AdminReportListView(generics.ListAPIView):
 class AdminReportResolveView(APIView):
     permission_classes = [IsAdmin]
 
+    @transaction.atomic
     def post(self, request, pk):
         try:
             report = Report.objects.get(pk=pk)
@@ -846,8 +950,13 @@ class AdminReportDismissView(APIView):
 # ─────────────────────────────────────────────
 # Resources
 # ─────────────────────────────────────────────
-class ResourceListCreateView(generics.ListCreateAPIView):
+class ResourceListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = ResourceSerializer
+    cache_max_age    = 300
+    shared_cache     = True
+
+    def get_content_scopes(self):
+        return ['resources']
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -931,6 +1040,8 @@ class AdminPlatformSettingsView(APIView):
         serializer = PlatformSettingsSerializer(settings, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        # Workers reload their cached copy (e.g. maintenance mode) within a second
+        PlatformSettings.bump_version()
         create_audit_log(
             admin=request.user,
             action='update_platform_settings',
@@ -981,6 +1092,9 @@ class AdminStatsView(APIView):
             'sessions_this_month':     Session.objects.filter(created_at__gte=month_start).count(),
             'completed_sessions':      Session.objects.filter(status='completed').count(),
             'average_platform_rating': round(avg_rating, 2),
+            'email_queue_depth':       EmailOutbox.queue_depth(),
+            'log_queue':               queued_logging_stats(),
+            'response_cache':          response_cache_info(),
         })
 
 
@@ -1029,20 +1143,17 @@ class AdminSessionListView(generics.ListAPIView):
 class AdminSessionCancelView(APIView):
     permission_classes = [IsAdmin]
 
+    @transaction.atomic
     def post(self, request, pk):
-        try:
-            session = Session.objects.get(pk=pk)
-        except Session.DoesNotExist:
+        session, changed = transition_session(Session.objects.all(), pk, 'cancelled')
+        if session is None:
             return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
-        
-        if session.status not in ['pending', 'accepted']:
+        if not changed:
             return Response(
                 {'error': f'This session cannot be cancelled because it is already {session.status}.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        session.status = 'cancelled'
-        session.save(update_fields=['status'])
         create_audit_log(
             admin=request.user,
             action='cancel_session',
@@ -1262,64 +1373,153 @@ class MentorAvailabilityView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, pk):
-        """Get available time slots for a mentor"""
+        """Get free, fixed-length time slots for a mentor"""
         try:
-            profile = MentorProfile.objects.get(pk=pk, is_verified=True)
+            profile = MentorProfile.objects.select_related('user').get(pk=pk, is_verified=True)
         except MentorProfile.DoesNotExist:
             return Response({'error': 'Mentor not found.'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Get date range from query params (default: next 14 days)
-        from datetime import datetime, timedelta
-        import pytz
-        
-        start_date_str = request.query_params.get('start_date')
-        end_date_str = request.query_params.get('end_date')
-        
-        if start_date_str:
-            try:
-                start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
-            except ValueError:
-                return Response({'error': 'Invalid start_date format. Use ISO format.'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            start_date = datetime.now(pytz.UTC)
-        
-        if end_date_str:
-            try:
-                end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-            except ValueError:
-                return Response({'error': 'Invalid end_date format. Use ISO format.'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            end_date = start_date + timedelta(days=14)
+        params, error = parse_availability_params(request.query_params)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        start_date, end_date, slot_minutes = params
         
-        # Get available slots
-        slots = profile.get_available_slots(start_date, end_date)
+        # The cache key carries the mentor's availability version; the time
+        # bucket retires the tag when the cached payload itself expires
+        cache_key = availability_cache_key(profile.user_id, start_date, end_date, slot_minutes)
+        etag = content_etag(request, (), cache_key, int(time.time() // AVAILABILITY_CACHE_TIMEOUT))
+        response = not_modified(request, etag)
+        if response is None:
+            payload = load_free_slot_payloads([profile], start_date, end_date, slot_minutes)[profile.user_id]
+            response = Response(payload)
+        return apply_cache_policy(request, response, etag, 0)
+
+
+class MentorAvailabilityBatchView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """Get free slots for several mentors over one date range in a single call"""
+        mentor_ids = request.data.get('mentor_ids')
+        if not isinstance(mentor_ids, list) or not mentor_ids:
+            return Response({'error': 'mentor_ids must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(mentor_ids) > MAX_BATCH_MENTORS:
+            return Response(
+                {'error': f'At most {MAX_BATCH_MENTORS} mentor_ids per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            mentor_ids = list(dict.fromkeys(int(mentor_id) for mentor_id in mentor_ids))
+        except (TypeError, ValueError):
+            return Response({'error': 'mentor_ids must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get existing sessions to mark booked slots
-        existing_sessions = Session.objects.filter(
-            mentor=profile.user,
-            status__in=['pending', 'accepted'],
-            requested_time__gte=start_date,
-            requested_time__lte=end_date
-        ).values_list('requested_time', flat=True)
+        params, error = parse_availability_params(request.data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        start_date, end_date, slot_minutes = params
         
-        booked_times = [dt.isoformat() for dt in existing_sessions]
+        profiles = MentorProfile.objects.select_related('user').in_bulk(mentor_ids)
+        profiles = {pk: profile for pk, profile in profiles.items() if profile.is_verified}
+        payloads = load_free_slot_payloads(profiles.values(), start_date, end_date, slot_minutes)
         
         return Response({
-            'mentor_id': profile.id,
-            'mentor_username': profile.user.username,
-            'timezone': profile.timezone,
-            'available_slots': slots,
-            'booked_times': booked_times,
-            'total_slots': len(slots),
+            'results': [payloads[profiles[pk].user_id] for pk in mentor_ids if pk in profiles],
+            'not_found': [pk for pk in mentor_ids if pk not in profiles],
         })
 
 
+def load_free_slot_payloads(profiles, start_date, end_date, slot_minutes):
+    """
+    Free-slot payloads keyed by mentor user id. Cached mentors cost nothing;
+    the rest share one indexed range query on (mentor_id, requested_time, status).
+    """
+    profiles = {profile.user_id: profile for profile in profiles}
+    cache_keys = availability_cache_keys(profiles, start_date, end_date, slot_minutes)
+    cached = cache.get_many(cache_keys.values())
+    payloads = {user_id: cached[key] for user_id, key in cache_keys.items() if key in cached}
+    
+    misses = [user_id for user_id in profiles if user_id not in payloads]
+    if misses:
+        booked_from, booked_to = booking_query_bounds(start_date, end_date)
+        booked = defaultdict(list)
+        for mentor_id, requested_time in Session.objects.filter(
+            mentor_id__in=misses,
+            requested_time__gte=booked_from,
+            requested_time__lt=booked_to,
+            status__in=BOOKED_STATUSES,
+        ).values_list('mentor_id', 'requested_time'):
+            booked[mentor_id].append(requested_time)
+        
+        fresh = {
+            user_id: build_free_slot_payload(profiles[user_id], start_date, end_date, slot_minutes, booked[user_id])
+            for user_id in misses
+        }
+        cache.set_many({cache_keys[user_id]: payload for user_id, payload in fresh.items()}, AVAILABILITY_CACHE_TIMEOUT)
+        payloads.update(fresh)
+    
+    return payloads
+
+
+def parse_availability_params(query_params):
+    """
+    Parse start_date/end_date (ISO, default: now → +14 days) and slot_minutes
+    from query params or a request body.
+    Returns ((start_date, end_date, slot_minutes), None) or (None, error).
+    """
+    from datetime import datetime, timedelta
+    import pytz
+    
+    start_date_str = query_params.get('start_date')
+    end_date_str = query_params.get('end_date')
+    
+    if start_date_str:
+        try:
+            start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return None, 'Invalid start_date format. Use ISO format.'
+    else:
+        start_date = datetime.now(pytz.UTC)
+    
+    if end_date_str:
+        try:
+            end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return None, 'Invalid end_date format. Use ISO format.'
+    else:
+        end_date = start_date + timedelta(days=14)
+    
+    if timezone.is_naive(start_date):
+        start_date = timezone.make_aware(start_date, pytz.UTC)
+    if timezone.is_naive(end_date):
+        end_date = timezone.make_aware(end_date, pytz.UTC)
+    
+    if end_date < start_date:
+        return None, 'end_date must not be before start_date.'
+    if (end_date.date() - start_date.date()).days > MAX_RANGE_DAYS:
+        return None, f'Date range must not exceed {MAX_RANGE_DAYS} days.'
+    
+    slot_minutes = query_params.get('slot_minutes')
+    if slot_minutes is None:
+        slot_minutes = get_session_minutes()
+    else:
+        try:
+            slot_minutes = int(slot_minutes)
+        except (TypeError, ValueError):
+            slot_minutes = None
+        if slot_minutes not in ALLOWED_SLOT_MINUTES:
+            allowed = ', '.join(str(m) for m in ALLOWED_SLOT_MINUTES)
+            return None, f'slot_minutes must be one of: {allowed}.'
+    
+    return (start_date, end_date, slot_minutes), None
+
+
 # ─────────────────────────────────────────────
 # Real-Time Messaging (Phase 3)
 # ─────────────────────────────────────────────
 class MessageListCreateView(generics.ListCreateAPIView):
     serializer_class   = MessageDetailSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class   = KeysetPageNumberPagination
 
     def get_queryset(self):
         """Get messages between current user and another user"""
@@ -1330,7 +1530,7 @@ class MessageListCreateView(generics.ListCreateAPIView):
         return Message.objects.filter(
             Q(sender=self.request.user, recipient_id=user_id) |
             Q(sender_id=user_id, recipient=self.request.user)
-        ).select_related('sender', 'recipient').order_by('-created_at')
+        ).select_related('sender', 'recipient').order_by('-created_at', '-id')
 
     def perform_create(self, serializer):
         recipient_id = self.request.data.get('recipient_id')
@@ -1339,58 +1539,20 @@ class MessageListCreateView(generics.ListCreateAPIView):
         except User.DoesNotExist:
             raise serializers.ValidationError({'recipient_id': 'User not found.'})
         
-        serializer.save(sender=self.request.user, recipient=recipient)
+        message = serializer.save(sender=self.request.user, recipient=recipient)
+        publish_message(message)
 
 
-class ConversationListView(APIView):
+class ConversationListView(generics.ListAPIView):
+    serializer_class   = ConversationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class   = KeysetPageNumberPagination
 
-    def get(self, request):
-        """Get list of conversations (unique users)"""
-        from django.db.models import Max, Q
-        
-        # Get all unique users this user has messaged
-        conversations = Message.objects.filter(
-            Q(sender=request.user) | Q(recipient=request.user)
-        ).values('sender_id', 'recipient_id').distinct()
-        
-        user_ids = set()
-        for conv in conversations:
-            if conv['sender_id'] != request.user.id:
-                user_ids.add(conv['sender_id'])
-            if conv['recipient_id'] != request.user.id:
-                user_ids.add(conv['recipient_id'])
-        
-        conversation_data = []
-        for user_id in user_ids:
-            other_user = User.objects.get(pk=user_id)
-            
-            # Get last message
-            last_message = Message.objects.filter(
-                Q(sender=request.user, recipient_id=user_id) |
-                Q(sender_id=user_id, recipient=request.user)
-            ).order_by('-created_at').first()
-            
-            # Get unread count
-            unread_count = Message.objects.filter(
-                sender_id=user_id,
-                recipient=request.user,
-                is_read=False
-            ).count()
-            
-            conversation_data.append({
-                'user_id': other_user.id,
-                'username': other_user.username,
-                'unread_count': unread_count,
-                'last_message': last_message.content if last_message else '',
-                'last_message_time': last_message.created_at if last_message else None,
-            })
-        
-        # Sort by last message time
-        conversation_data.sort(key=lambda x: x['last_message_time'] or timezone.now(), reverse=True)
-        
-        serializer = ConversationSerializer(conversation_data, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        """Conversations (one per partner), newest first, from conversation_inbox_idx"""
+        return Conversation.objects.filter(owner=self.request.user).select_related(
+            'partner', 'last_message'
+        ).order_by('-last_message_at', '-id')
 
 
 class MessageMarkAsReadView(APIView):
@@ -1398,28 +1560,58 @@ class MessageMarkAsReadView(APIView):
 
     def post(self, request, pk):
         try:
-            message = Message.objects.get(pk=pk, recipient=request.user)
+            message = Message.objects.select_related('sender', 'recipient').get(pk=pk, recipient=request.user)
         except Message.DoesNotExist:
             return Response({'error': 'Message not found.'}, status=status.HTTP_404_NOT_FOUND)
         
-        message.is_read = True
-        message.read_at = timezone.now()
-        message.save(update_fields=['is_read', 'read_at'])
+        # Only the request that actually flips is_read adjusts the unread counter
+        read_at = timezone.now()
+        if Message.objects.filter(pk=pk, is_read=False).update(is_read=True, read_at=read_at):
+            Conversation.mark_read(request.user.id, message.sender_id, 1)
+            message.is_read, message.read_at = True, read_at
+            transaction.on_commit(lambda: decrement_unread_count(request.user.id))
+            publish_read(request.user.id, message.sender_id, read_at, message_ids=[message.pk])
         
         return Response(MessageDetailSerializer(message).data)
 
 
+class ConversationMarkAsReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, user_id):
+        """Mark everything received from one partner (optionally up to a message id) as read"""
+        up_to = request.data.get('up_to_message_id')
+        if up_to is not None:
+            try:
+                up_to = int(up_to)
+            except (TypeError, ValueError):
+                return Response({'error': 'up_to_message_id must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One UPDATE on the (is_read, recipient) index, however many messages are unread
+        unread = Message.objects.filter(is_read=False, recipient=request.user, sender_id=user_id)
+        if up_to is not None:
+            unread = unread.filter(pk__lte=up_to)
+        read_at = timezone.now()
+        with transaction.atomic():
+            marked = unread.update(is_read=True, read_at=read_at)
+            if marked:
+                Conversation.mark_read(request.user.id, user_id, marked)
+                transaction.on_commit(lambda: decrement_unread_count(request.user.id, marked))
+        if marked:
+            publish_read(request.user.id, user_id, read_at, up_to_message_id=up_to)
+
+        return Response({
+            'marked_read': marked,
+            'unread_count': Message.unread_count_for(request.user.id),
+        })
+
+
 class UnreadMessageCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        """Get total unread message count"""
-        unread_count = Message.objects.filter(
-            recipient=request.user,
-            is_read=False
-        ).count()
-        
-        return Response({'unread_count': unread_count})
+        """Get total unread message count (served from the cached counter)"""
+        return Response({'unread_count': Message.unread_count_for(request.user.id)})
 
 
 # ─────────────────────────────────────────────
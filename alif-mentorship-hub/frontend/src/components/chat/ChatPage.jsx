@@ -1,9 +1,12 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { messageService } from '../../services/messageService';
 import ConversationList from './ConversationList';
 import ChatWindow from './ChatWindow';
 import './ChatPage.css';
 
+const POLL_INTERVAL = 3000;
+const RECONNECT_DELAY = 5000;
+
 export default function ChatPage() {
   const [conversations, setConversations] = useState([]);
   const [selectedUser, setSelectedUser] = useState(null);
@@ -11,22 +14,79 @@ export default function ChatPage() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [unreadCount, setUnreadCount] = useState(0);
+  const [live, setLive] = useState(false);
+  const selectedUserRef = useRef(null);
+
+  useEffect(() => {
+    selectedUserRef.current = selectedUser;
+  }, [selectedUser]);
 
   // Load conversations on mount
   useEffect(() => {
     loadConversations();
     loadUnreadCount();
-    
-    // Poll for new messages every 3 seconds
+  }, []);
+
+  // Server push over WebSocket; reconnect after a drop
+  useEffect(() => {
+    let close = () => {};
+    let retry;
+
+    const handleEvent = (event) => {
+      if (event.type === 'unread_count') {
+        setUnreadCount(event.unread_count);
+      } else if (event.type === 'message') {
+        loadConversations();
+        const partner = selectedUserRef.current;
+        if (partner && (event.message.sender_id === partner || event.message.recipient_id === partner)) {
+          loadMessages(partner);
+        }
+      } else if (event.type === 'read') {
+        // Either the exact messages read, or the reader's whole conversation up to an id
+        const ids = event.message_ids ? new Set(event.message_ids) : null;
+        const isRead = (msg) =>
+          ids
+            ? ids.has(msg.id)
+            : msg.recipient_id === event.reader_id &&
+              (event.up_to_message_id == null || msg.id <= event.up_to_message_id);
+        setMessages((current) =>
+          current.map((msg) => (isRead(msg) ? { ...msg, is_read: true, read_at: event.read_at } : msg))
+        );
+      }
+    };
+
+    const connect = () => {
+      close = messageService.subscribe({
+        onEvent: handleEvent,
+        onOpen: () => setLive(true),
+        onClose: () => {
+          setLive(false);
+          retry = setTimeout(connect, RECONNECT_DELAY);
+        },
+      });
+    };
+    connect();
+
+    return () => {
+      clearTimeout(retry);
+      close();
+    };
+  }, []);
+
+  // Fall back to polling the REST endpoints while the socket is down
+  useEffect(() => {
+    if (live) return undefined;
+
     const interval = setInterval(() => {
       loadConversations();
+      loadUnreadCount();
       if (selectedUser) {
         loadMessages(selectedUser);
       }
-    }, 3000);
+    }, POLL_INTERVAL);
 
     return () => clearInterval(interval);
-  }, [selectedUser]);
+  }, [selectedUser, live]);
 
   const loadConversations = async () => {
     try {
@@ -45,10 +105,12 @@ export default function ChatPage() {
       const data = await messageService.getMessages(userId);
       setMessages(data);
       
-      // Mark unread messages as read
+      // Mark what is on screen as read in one request
       const unreadMessages = data.filter((msg) => !msg.is_read && msg.sender_id === userId);
-      for (const msg of unreadMessages) {
-        await messageService.markAsRead(msg.id);
+      if (unreadMessages.length) {
+        const upTo = Math.max(...unreadMessages.map((msg) => msg.id));
+        const result = await messageService.markConversationAsRead(userId, upTo);
+        setUnreadCount(result.unread_count);
       }
       
       setError(null);
@@ -81,9 +143,11 @@ export default function ChatPage() {
       await messageService.sendMessage(selectedUser, content);
       // Reload messages to show the new message
       await loadMessages(selectedUser);
-      // Reload conversations to update last message
-      await loadConversations();
-      await loadUnreadCount();
+      if (!live) {
+        // Reload conversations to update last message
+        await loadConversations();
+        await loadUnreadCount();
+      }
     } catch (err) {
       setError('Failed to send message');
       console.error(err);
@@ -1,11 +1,30 @@
 import api from './axios';
+import configService from './configService';
+
+// WebSocket endpoint on the API host, e.g. ws://127.0.0.1:8000/ws/messages/
+const socketUrl = () => {
+  const base = new URL(
+    configService.getApiBaseUrl() || import.meta.env.VITE_API_BASE_URL || 'http://127.0.0.1:8000/api/v1/',
+    window.location.origin
+  );
+  const protocol = base.protocol === 'https:' ? 'wss:' : 'ws:';
+  const token = encodeURIComponent(localStorage.getItem('access_token') || '');
+  return `${protocol}//${base.host}/ws/messages/?token=${token}`;
+};
 
 export const messageService = {
-  // Get all conversations (unique users)
+  // Get all conversations (unique users), newest first
   getConversations: async () => {
     try {
-      const response = await api.get('/messages/conversations/');
-      return response.data;
+      // The list is paginated: walk its keyset pages (no COUNT per page)
+      // by following `next` until the last one
+      let response = await api.get('/conversations/', { params: { cursor: '' } });
+      const conversations = [...(response.data.results ?? response.data)];
+      while (response.data.next) {
+        response = await api.get(response.data.next);
+        conversations.push(...response.data.results);
+      }
+      return conversations;
     } catch (error) {
       console.error('Error fetching conversations:', error);
       throw error;
@@ -59,16 +78,38 @@ export const messageService = {
     }
   },
 
-  // Mark all messages from a user as read
-  markConversationAsRead: async (userId, messages) => {
+  // Live updates: new messages, read receipts and unread counts.
+  // Returns a close() function; callers keep polling whenever the socket is down.
+  subscribe: ({ onEvent, onOpen, onClose }) => {
+    let socket;
     try {
-      const unreadMessages = messages.filter(
-        (msg) => !msg.is_read && msg.sender_id === userId
-      );
-      
-      for (const msg of unreadMessages) {
-        await messageService.markAsRead(msg.id);
+      socket = new WebSocket(socketUrl());
+    } catch (error) {
+      console.error('Error opening message socket:', error);
+      onClose?.();
+      return () => {};
+    }
+    socket.onopen = () => onOpen?.();
+    socket.onclose = () => onClose?.();
+    socket.onmessage = (event) => {
+      try {
+        onEvent(JSON.parse(event.data));
+      } catch (error) {
+        console.error('Error handling message event:', error);
       }
+    };
+    return () => {
+      socket.onclose = null;
+      socket.close();
+    };
+  },
+
+  // Mark everything received from a user as read (optionally up to a message id)
+  markConversationAsRead: async (userId, upToMessageId) => {
+    try {
+      const payload = upToMessageId ? { up_to_message_id: upToMessageId } : {};
+      const response = await api.post(`/conversations/${userId}/read/`, payload);
+      return response.data;
     } catch (error) {
       console.error('Error marking conversation as read:', error);
       throw error;